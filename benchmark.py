@@ -0,0 +1,381 @@
+import argparse
+import csv
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+from main import clean_field, read_vacancies_mapped, run_statistics_mode, run_table_mode, HEAD, PROFILER, SHORT_HEAD
+
+DATA_DIR = 'benchmark_data'
+BASELINE_FILE = 'benchmark_baseline.json'
+TOLERANCE = 0.1
+MIN_SECONDS = 0.05
+CURRENCY_WEIGHTS = {'RUR': 0.9, 'USD': 0.04, 'EUR': 0.015, 'KZT': 0.015, 'BYR': 0.01, 'UAH': 0.01, 'UZS': 0.005,
+                    'AZN': 0.005, 'GEL': 0.005, 'KGS': 0.005}
+SALARY_RATES = {'AZN': 35.68, 'BYR': 23.91, 'EUR': 59.90, 'GEL': 21.74, 'KGS': 0.76, 'KZT': 0.13, 'RUR': 1,
+                'UAH': 1.64, 'USD': 60.66, 'UZS': 0.0055}
+CITIES = ['Москва', 'Санкт-Петербург', 'Новосибирск', 'Екатеринбург', 'Казань', 'Нижний Новгород', 'Краснодар',
+          'Самара', 'Ростов-на-Дону', 'Уфа', 'Челябинск', 'Омск', 'Пермь', 'Воронеж', 'Красноярск', 'Волгоград',
+          'Тюмень', 'Ижевск', 'Барнаул', 'Ульяновск', 'Иркутск', 'Хабаровск', 'Ярославль', 'Владивосток', 'Томск',
+          'Оренбург', 'Кемерово', 'Рязань', 'Астрахань', 'Пенза', 'Липецк', 'Тула', 'Киров', 'Чебоксары',
+          'Калининград', 'Курск', 'Сочи', 'Ставрополь', 'Тверь', 'Белгород', 'Минск', 'Алматы', 'Ташкент', 'Киев']
+PROFESSIONS = ['Программист', 'Python-программист', 'Программист 1С', 'Java программист', 'Frontend-разработчик',
+               'Аналитик', 'Системный администратор', 'Тестировщик', 'Менеджер по продажам', 'Бухгалтер',
+               'Водитель', 'Оператор call-центра', 'Продавец-консультант', 'Курьер', 'Инженер-конструктор']
+EXPERIENCE_WEIGHTS = {'noExperience': 0.2, 'between1And3': 0.45, 'between3And6': 0.28, 'moreThan6': 0.07}
+SKILLS = ['Python', 'SQL', 'Git', 'Linux', 'Docker', 'Excel', '1С: Бухгалтерия', 'Java', 'JavaScript', 'HTML',
+          'CSS', 'Английский язык', 'Деловое общение', 'Грамотная речь', 'Работа в команде', 'PostgreSQL',
+          'Django', 'React', 'Kubernetes', 'Активные продажи', 'Водительское удостоверение категории B']
+SENTENCES = ['Мы ищем в команду  опытного специалиста.', 'Официальное трудоустройство по ТК РФ.',
+             'Работа в офисе в центре города,  рядом с метро.', 'Дружный коллектив и наставник на испытательном сроке.',
+             'Оплачиваемое обучение, курсы и конференции за счёт компании.', 'ДМС после испытательного срока.',
+             'Гибкий график, возможна частичная удалёнка.', 'Участие в разработке высоконагруженных сервисов.',
+             'Ведение отчётности и работа с первичной документацией.', 'Своевременная выплата зарплаты 2 раза в месяц.']
+SCENARIOS = {
+    'table_filter_sort': {'mode': 'table', 'filter_param': 'Идентификатор валюты оклада: Рубли',
+                          'sort_param': 'Оклад', 'reverse_sort': 'Да', 'lines_to_print': '1 51', 'colomns': ''},
+    'table_sort': {'mode': 'table', 'filter_param': '', 'sort_param': 'Дата публикации вакансии',
+                   'reverse_sort': 'Нет', 'lines_to_print': '1 51', 'colomns': 'Название, Оклад, Название региона'},
+    'statistics': {'mode': 'statistics', 'vac_name': 'Программист', 'workers': 1},
+    'statistics_parallel': {'mode': 'statistics', 'vac_name': 'Программист', 'workers': os.cpu_count() or 1},
+}
+
+
+def best_time(function, repeat):
+    """ Запускает функцию несколько раз и возвращает лучшее время выполнения
+
+    Args:
+        function: функция без аргументов
+        repeat (int): кол-во запусков
+    Returns:
+        float: лучшее время в секундах
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def benchmark_clean_field(file_name, repeat=3):
+    """ Замеряет скорость очистки полей (clean_field) на строках csv-файла, без учёта чтения файла
+
+    Args:
+        file_name (str): имя csv-файла с данными о вакансиях
+        repeat (int): кол-во запусков
+    Returns:
+        float: кол-во строк в секунду
+    """
+    with open(file_name, encoding='utf-8-sig') as file:
+        rows = list(csv.reader(file))[1:]
+
+    def clean_rows():
+        for row in rows:
+            for value in row:
+                clean_field(value)
+
+    return len(rows) / best_time(clean_rows, repeat)
+
+
+def benchmark_parser(file_name, columns=None, repeat=3):
+    """ Замеряет скорость разбора csv-файла (read_vacancies_mapped) вместе с очисткой полей
+
+    Args:
+        file_name (str): имя csv-файла с данными о вакансиях
+        columns ([str]): нужные столбцы (по умолчанию - все)
+        repeat (int): кол-во запусков
+    Returns:
+        float: кол-во строк в секунду
+    """
+    count = sum(1 for _ in read_vacancies_mapped(file_name, columns))
+    return count / best_time(lambda: sum(1 for _ in read_vacancies_mapped(file_name, columns)), repeat)
+
+
+def benchmark_csv_reader(file_name, columns=None, repeat=3):
+    """ Замеряет скорость разбора csv-файла модулем csv при построчном чтении файла (как read_vacancies) с очисткой
+    только нужных столбцов - с этим сравнивается read_vacancies_mapped
+
+    Args:
+        file_name (str): имя csv-файла с данными о вакансиях
+        columns ([str]): нужные столбцы (по умолчанию - все)
+        repeat (int): кол-во запусков
+    Returns:
+        float: кол-во строк в секунду
+    """
+    def read_rows():
+        count = 0
+        with open(file_name, encoding='utf-8-sig') as file:
+            reader = csv.reader(file)
+            head = list(filter(None, next(reader, [])))
+            indexes = [i for i in range(len(head)) if columns is None or head[i] in columns]
+            for row in reader:
+                row = list(filter(None, row))
+                if len(row) == len(head):
+                    {head[i]: clean_field(row[i]) for i in indexes}
+                    count += 1
+        return count
+
+    return read_rows() / best_time(read_rows, repeat)
+
+
+def make_description(generator):
+    """ Составляет html-описание вакансии из случайных предложений: абзацы, выделение, список, лишние пробелы
+    и переводы строк - всё, что убирает clean_field
+
+    Args:
+        generator (random.Random): генератор случайных чисел
+    Returns:
+        str: описание
+    """
+    paragraphs = ['<p>' + ' '.join(generator.sample(SENTENCES, generator.randint(1, 3))) + '</p>'
+                  for _ in range(generator.randint(1, 3))]
+    items = ''.join('<li>{}</li>\n'.format(sentence) for sentence in generator.sample(SENTENCES, 3))
+    return '<p><strong>Обязанности:</strong></p>\n' + '\n'.join(paragraphs) + '\n<ul>\n' + items + '</ul>'
+
+
+def generate_vacancies(file_name, rows, seed=1):
+    """ Создаёт csv-файл со случайными вакансиями в формате HEAD. Распределения похожи на выгрузку с hh.ru:
+    в основном рубли, города по закону Ципфа с длинным хвостом, html в описаниях, навыки через перевод строки,
+    вакансий с каждым годом больше. У части вакансий не указан верхний порог оклада (такие строки пропускаются
+    при разборе). При одинаковых rows и seed файл получается одинаковым
+
+    Args:
+        file_name (str): имя файла
+        rows (int): кол-во вакансий
+        seed (int): начальное значение генератора случайных чисел
+    """
+    generator = random.Random(seed)
+    cities = CITIES + ['Город {}'.format(i) for i in range(1, 1001)]
+    city_weights = [1 / (rank + 1) ** 1.1 for rank in range(len(cities))]
+    employers = ['ООО "Компания {}"'.format(i) for i in range(1, 5001)]
+    employer_weights = [1 / (rank + 1) for rank in range(len(employers))]
+    years = list(range(2003, 2023))
+    year_weights = [1 + i for i in range(len(years))]
+    descriptions = [make_description(generator) for _ in range(1000)]
+    currencies = list(CURRENCY_WEIGHTS.keys())
+    currency_weights = list(CURRENCY_WEIGHTS.values())
+    experiences = list(EXPERIENCE_WEIGHTS.keys())
+    experience_weights = list(EXPERIENCE_WEIGHTS.values())
+    batch_size = 10000
+
+    with open(file_name, 'w', encoding='utf-8-sig', newline='') as file:
+        writer = csv.writer(file, lineterminator='\r\n')
+        writer.writerow(HEAD)
+        for batch_start in range(0, rows, batch_size):
+            count = min(batch_size, rows - batch_start)
+            batch_cities = generator.choices(cities, city_weights, k=count)
+            batch_employers = generator.choices(employers, employer_weights, k=count)
+            batch_years = generator.choices(years, year_weights, k=count)
+            batch_currencies = generator.choices(currencies, currency_weights, k=count)
+            batch_experiences = generator.choices(experiences, experience_weights, k=count)
+            for i in range(count):
+                currency = batch_currencies[i]
+                salary_from = round(generator.lognormvariate(10.8, 0.5) / SALARY_RATES[currency], -3) or 1000
+                salary_to = salary_from * generator.choice([1, 1.2, 1.5, 2])
+                skills = '\n'.join(generator.sample(SKILLS, generator.randint(1, 8)))
+                published_at = '{}-{:02}-{:02}T{:02}:{:02}:{:02}+0300'.format(
+                    batch_years[i], generator.randint(1, 12), generator.randint(1, 28), generator.randint(0, 23),
+                    generator.randint(0, 59), generator.randint(0, 59))
+                writer.writerow([generator.choice(PROFESSIONS), generator.choice(descriptions), skills,
+                                 batch_experiences[i], 'TRUE' if generator.random() < 0.03 else 'FALSE',
+                                 batch_employers[i], '{:.1f}'.format(salary_from),
+                                 '' if generator.random() < 0.05 else '{:.1f}'.format(salary_to),
+                                 'True' if generator.random() < 0.4 else 'False', currency, batch_cities[i],
+                                 published_at])
+
+
+def get_synthetic_file(rows, seed=1, data_dir=DATA_DIR):
+    """ Возвращает имя файла со случайными вакансиями, создавая его, если его ещё нет
+
+    Args:
+        rows (int): кол-во вакансий
+        seed (int): начальное значение генератора случайных чисел
+        data_dir (str): папка для файлов
+    Returns:
+        str: имя файла
+    """
+    os.makedirs(data_dir, exist_ok=True)
+    file_name = os.path.join(data_dir, 'vacancies_{}_{}.csv'.format(rows, seed))
+    if not os.path.exists(file_name):
+        tmp_name = file_name + '.tmp'
+        generate_vacancies(tmp_name, rows, seed)
+        os.replace(tmp_name, file_name)
+    return file_name
+
+
+def run_scenario(file_name, scenario, output_dir):
+    """ Один раз выполняет сценарий так же, как main.py в соответствующем режиме. Вывод отбрасывается,
+    файлы отчёта пишутся в output_dir
+
+    Args:
+        file_name (str): имя csv-файла с данными о вакансиях
+        scenario (dict): параметры сценария (см. SCENARIOS)
+        output_dir (str): папка для файлов отчёта
+    """
+    output = io.StringIO()
+    if scenario['mode'] == 'table':
+        run_table_mode(file_name, scenario['filter_param'], scenario['sort_param'], scenario['reverse_sort'],
+                       scenario['lines_to_print'], scenario['colomns'], output)
+    else:
+        run_statistics_mode(file_name, scenario['vac_name'], scenario['workers'], output_dir=output_dir,
+                            file=output)
+
+
+def benchmark_scenario(file_name, scenario, repeat=3):
+    """ Замеряет сценарий целиком и по этапам. Общее время - лучшее из repeat запусков без замеров, время этапов -
+    лучшее из repeat запусков с замерами (PROFILER), пиковая память - отдельный запуск с tracemalloc, чтобы
+    он не влиял на время
+
+    Args:
+        file_name (str): имя csv-файла с данными о вакансиях
+        scenario (dict): параметры сценария (см. SCENARIOS)
+        repeat (int): кол-во запусков
+    Returns:
+        dict: кол-во строк, время, строк в секунду, пиковая память и те же величины по этапам
+    """
+    with tempfile.TemporaryDirectory() as output_dir:
+        seconds = best_time(lambda: run_scenario(file_name, scenario, output_dir), repeat)
+        stages = {}
+        for trace_memory in [False] * repeat + [True]:
+            PROFILER.start(trace_memory=trace_memory)
+            try:
+                run_scenario(file_name, scenario, output_dir)
+            finally:
+                PROFILER.stop()
+            for stage in PROFILER.stages:
+                result = stages.setdefault(stage['stage'], {'rows': stage['rows']})
+                if trace_memory:
+                    result['peak_memory'] = stage['peak_memory']
+                elif 'seconds' not in result or stage['seconds'] < result['seconds']:
+                    result['seconds'] = stage['seconds']
+                    result['rows_per_second'] = stage.get('rows_per_second')
+
+    rows = max(stage['rows'] or 0 for stage in stages.values())
+    return {'rows': rows, 'seconds': seconds, 'rows_per_second': rows / seconds,
+            'peak_memory': max(stage.get('peak_memory', 0) for stage in stages.values()), 'stages': stages}
+
+
+def find_regressions(result, baseline, tolerance=TOLERANCE):
+    """ Сравнивает результаты с базовыми: регрессия - если строк в секунду стало меньше или пиковая память стала
+    больше, чем допускает tolerance. Проверяются сценарий целиком и каждый этап. Скорость этапов короче
+    MIN_SECONDS не сравнивается - для них разброс замеров больше самого времени
+
+    Args:
+        result (dict): результаты сценария (см. benchmark_scenario)
+        baseline (dict): базовые результаты того же сценария
+        tolerance (float): допустимое относительное отклонение
+    Returns:
+        [str]: описания регрессий
+    """
+    regressions = []
+    pairs = [('всего', result, baseline)]
+    pairs += [(name, stage, baseline['stages'][name]) for name, stage in result['stages'].items()
+              if name in baseline.get('stages', {})]
+    for name, current, base in pairs:
+        if current.get('rows_per_second') and base.get('rows_per_second') and \
+                max(current['seconds'], base['seconds']) >= MIN_SECONDS and \
+                current['rows_per_second'] < base['rows_per_second'] * (1 - tolerance):
+            regressions.append('{}: {:.0f} строк/с вместо {:.0f}'.format(
+                name, current['rows_per_second'], base['rows_per_second']))
+        if current.get('peak_memory') and base.get('peak_memory') and \
+                current['peak_memory'] > base['peak_memory'] * (1 + tolerance):
+            regressions.append('{}: пиковая память {} байт вместо {}'.format(
+                name, current['peak_memory'], base['peak_memory']))
+    return regressions
+
+
+def load_baseline(file_name):
+    """ Загружает базовые результаты
+
+    Args:
+        file_name (str): имя json-файла
+    Returns:
+        dict: результаты по ключам 'сценарий/кол-во строк' (пустой словарь, если файла нет)
+    """
+    if not os.path.exists(file_name):
+        return {}
+    with open(file_name, encoding='utf-8') as file:
+        return json.load(file)
+
+
+def save_results(file_name, results):
+    """ Сохраняет результаты в json-файл
+
+    Args:
+        file_name (str): имя файла
+        results (dict): результаты по ключам 'сценарий/кол-во строк'
+    """
+    with open(file_name, 'w', encoding='utf-8') as file:
+        json.dump(results, file, ensure_ascii=False, indent=2)
+
+
+def get_arguments():
+    """ Разбирает аргументы командной строки
+
+    Returns:
+        argparse.Namespace: аргументы
+    """
+    parser = argparse.ArgumentParser(description='Замеры скорости и памяти режимов main.py')
+    parser.add_argument('file_name', nargs='?',
+                        help='csv-файл с вакансиями (по умолчанию - случайные вакансии, см. --rows)')
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000],
+                        help='кол-во случайных вакансий, можно несколько (от 10 тыс. до 10 млн)')
+    parser.add_argument('--seed', type=int, default=1, help='начальное значение генератора случайных вакансий')
+    parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS),
+                        help='сценарии для замеров')
+    parser.add_argument('--repeat', type=int, default=3, help='кол-во запусков каждого сценария')
+    parser.add_argument('--baseline', default=BASELINE_FILE, help='json-файл с базовыми результатами')
+    parser.add_argument('--record', action='store_true', help='записать результаты как базовые')
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE, help='допустимое отклонение от базовых')
+    parser.add_argument('--output', help='json-файл для результатов')
+    parser.add_argument('--micro', action='store_true', help='замерить также clean_field и разбор csv')
+    parser.add_argument('--generate-only', action='store_true', help='только создать файлы случайных вакансий')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    arguments = get_arguments()
+    if arguments.file_name:
+        files = [(os.path.basename(arguments.file_name), arguments.file_name)]
+    else:
+        files = [(str(rows), get_synthetic_file(rows, arguments.seed)) for rows in arguments.rows]
+    if arguments.generate_only:
+        sys.exit()
+
+    baseline = load_baseline(arguments.baseline)
+    results = {}
+    regressions_count = 0
+    for data_name, file_name in files:
+        if arguments.micro:
+            print('{}: clean_field: {:.0f} строк/с'.format(data_name, benchmark_clean_field(file_name)))
+            for title, columns in (('всех столбцов', None), ('столбцов статистики', SHORT_HEAD)):
+                print('{}: разбор {}: {:.0f} строк/с, модулем csv из файла: {:.0f} строк/с'.format(
+                    data_name, title, benchmark_parser(file_name, columns), benchmark_csv_reader(file_name, columns)))
+        for scenario_name in arguments.scenarios:
+            key = scenario_name + '/' + data_name
+            result = benchmark_scenario(file_name, SCENARIOS[scenario_name], arguments.repeat)
+            results[key] = result
+            print('{}: {} строк, {:.3f} с, {:.0f} строк/с, пиковая память {:.1f} МиБ'.format(
+                key, result['rows'], result['seconds'], result['rows_per_second'], result['peak_memory'] / 2 ** 20))
+            for name, stage in result['stages'].items():
+                print('    {}: {:.3f} с, пиковая память {:.1f} МиБ'.format(
+                    name, stage['seconds'], stage.get('peak_memory', 0) / 2 ** 20))
+            if key in baseline and not arguments.record:
+                regressions = find_regressions(result, baseline[key], arguments.tolerance)
+                regressions_count += len(regressions)
+                for regression in regressions:
+                    print('    РЕГРЕССИЯ ' + regression)
+
+    if arguments.output:
+        save_results(arguments.output, results)
+    if arguments.record:
+        baseline.update(results)
+        save_results(arguments.baseline, baseline)
+    sys.exit(1 if regressions_count else 0)
@@ -1,20 +1,35 @@
+import argparse
+import array
+import asyncio
+import bisect
+import codecs
+import collections
+import contextlib
+import copy
+import cProfile
 import csv
+import datetime
+import functools
+import hashlib
+import heapq
+import io
+import json
+import mmap
+import os
+import pathlib
 import re
-import openpyxl
-from openpyxl.styles import Border, Side, NamedStyle, Font
+import shutil
+import sys
+import time
+import tracemalloc
+import urllib.parse
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 import numpy as np
-import matplotlib.pyplot as plt
-import pdfkit
-from jinja2 import Template
-from jinja2 import Environment, FileSystemLoader
-from var_dump import var_dump
 from prettytable import PrettyTable
 from prettytable import ALL
-import doctest
 
 SHORT_HEAD = ['name', 'salary_from', 'salary_to', 'salary_currency', 'area_name', 'published_at']
-YEARS_NULL_DICT = {2007: 0, 2008: 0, 2009: 0, 2010: 0, 2011: 0, 2012: 0, 2013: 0, 2014: 0, 2015: 0, 2016: 0, 2017: 0,
-                   2018: 0, 2019: 0, 2020: 0, 2021: 0, 2022: 0}
 CURRENCY_TO_RUB = {"AZN": 35.68, "BYR": 23.91, "EUR": 59.90, "GEL": 21.74, "KGS": 0.76, "KZT": 0.13, "RUR": 1,
                    "UAH": 1.64, "USD": 60.66, "UZS": 0.0055}
 HEAD = ['name', 'description', 'key_skills', 'experience_id', 'premium', 'employer_name', 'salary_from',
@@ -38,6 +53,61 @@ CURRENCY = {"AZN": "Манаты", "BYR": "Белорусские рубли", "
 CURRENCY_BACK = {"Манаты": "AZN", "Белорусские рубли": "BYR", "Евро": "EUR", "Грузинский лари": "GEL",
                  "Киргизский сом": "KGS", "Тенге": "KZT", "Рубли": "RUR", "Гривны": "UAH", "Доллары": "USD",
                  "Узбекский сум": "UZS"}
+COLUMNS_BY_RUS_HEAD = {'Название': ['name'], 'Описание': ['description'], 'Навыки': ['key_skills'],
+                       'Опыт работы': ['experience_id'], 'Премиум-вакансия': ['premium'],
+                       'Компания': ['employer_name'], 'Название региона': ['area_name'],
+                       'Дата публикации вакансии': ['published_at'],
+                       'Оклад': ['salary_from', 'salary_to', 'salary_gross', 'salary_currency'],
+                       'Нижний порог оклада': ['salary_from', 'salary_to', 'salary_gross', 'salary_currency'],
+                       'Верхний порог оклада': ['salary_from', 'salary_to', 'salary_gross', 'salary_currency'],
+                       'С учётом налогов': ['salary_from', 'salary_to', 'salary_gross', 'salary_currency'],
+                       'Идентификатор валюты оклада': ['salary_from', 'salary_to', 'salary_gross',
+                                                       'salary_currency']}
+CURRENCY_CODES = list(CURRENCY_TO_RUB.keys())
+EXPERIENCE_CODES = list(WORK_EXPERIENCE.keys())
+HTML_TAG_PATTERN = re.compile('<.*?>')
+DIRTY_FIELD_PATTERN = re.compile(r'<|\s\s|[^\S ]|^\s|\s$')
+BLOCK_SIZE = 1024 * 1024
+CHUNK_SIZE = 64 * 1024 * 1024
+DATES_BATCH_SIZE = 1024 * 1024
+SPLIT_RECORD_SIZE = 4 * 1024
+RECORD_SAMPLE_SIZE = 64 * 1024
+SORT_KEYS = {'Название': lambda vac: vac.name,
+             'Описание': lambda vac: vac.description,
+             'Компания': lambda vac: vac.employer_name,
+             'Название региона': lambda vac: vac.area_name,
+             'Премиум-вакансия': lambda vac: vac.premium,
+             'Опыт работы': lambda vac: WORK_EXPERIENCE_FOR_SORT[vac.experience_id],
+             'Навыки': lambda vac: len(vac.key_skills),
+             'Оклад': lambda vac: vac.salary.get_convert_salary(),
+             'Дата публикации вакансии': lambda vac: vac.published_at}
+TRANSLATED_SORT_KEYS = ('Опыт работы', 'Премиум-вакансия', 'Дата публикации вакансии')
+TABLE_ATTRIBUTES = {'Название': 'name', 'Описание': 'description', 'Опыт работы': 'experience_id',
+                    'Премиум-вакансия': 'premium', 'Компания': 'employer_name', 'Название региона': 'area_name'}
+PAGE_SIZE = 50
+QUERY_OR = ' | '
+QUERY_AND = ' & '
+QUERY_SEPARATOR_PATTERN = re.compile('(' + re.escape(QUERY_OR) + '|' + re.escape(QUERY_AND) + ')')
+DATE_PATTERN = re.compile(r'\d\d\.\d\d\.\d{4}')
+CONDITION_RANK = {'Название': 0, 'Компания': 0, 'Дата публикации вакансии': 1, 'Оклад': 2, 'Название региона': 3,
+                  'Навыки': 3, 'Опыт работы': 4, 'Идентификатор валюты оклада': 4, 'Премиум-вакансия': 5,
+                  'Описание': 6}
+TEXT_ATTRIBUTES = {'Название': 'name', 'Компания': 'employer_name', 'Название региона': 'area_name',
+                   'Описание': 'description'}
+HASH_SAMPLE_SIZE = 1024 * 1024
+CACHE_SUFFIX = '.cache.npz'
+CACHE_FORMAT_VERSION = 1
+STATE_SUFFIX = '.state.json'
+A4_SIZE = (8.27, 11.69)
+PDF_SHORT_TABLE_ROWS = 25
+PDF_PAGE_TABLE_ROWS = 50
+TEMPLATE_DIR = os.path.dirname(os.path.abspath(__file__))
+WKHTMLTOPDF_WINDOWS_PATH = r'C:\Program Files\wkhtmltopdf\bin\wkhtmltopdf.exe'
+TOP_CITIES_COUNT = 10
+PERIOD_GRANULARITIES = ('year', 'month', 'week')
+QUERY_CACHE_SIZE = 256
+RESULTS_SUFFIX = '.results.json'
+REPORT_FILE_NAMES = {'xlsx': 'report.xlsx', 'png': 'graph.png', 'pdf': 'report.pdf'}
 
 
 def clean_int_point(number):
@@ -68,6 +138,93 @@ def clean_int(number):
     return number
 
 
+def get_sort_limit(lines_to_print):
+    """ Определяет, сколько первых строк отсортированной таблицы нужно для печати диапазона
+
+    Args:
+     lines_to_print (str): номера строк вида '10 20' (пустая строка или одно число - до конца таблицы)
+    Returns:
+        int or None: кол-во первых строк, None - нужны все строки
+    """
+    if ' ' in lines_to_print:
+        start, end = lines_to_print.split(' ')
+        if int(start) >= 1:
+            return max(int(end) - 1, 0)
+    return None
+
+
+def get_table_fields(colomns):
+    """ Определяет столбцы таблицы в порядке RUS_HEAD_FOR_PRINT
+
+    Args:
+     colomns (str): название столбцов через запятую (пустая строка - все)
+    Returns:
+        [str]: столбцы таблицы, первым всегда идёт '№'
+    """
+    if colomns == '':
+        return RUS_HEAD_FOR_PRINT
+    colomns = colomns.split(', ')
+    return [field for field in RUS_HEAD_FOR_PRINT if field == '№' or field in colomns]
+
+
+def get_table_cell(i, vacancy, field):
+    """ Форматирует значение одной ячейки таблицы
+
+    Args:
+     i (int): позиция вакансии в таблице
+     vacancy (VacancyForTable): вакансия
+     field (str): столбец таблицы
+    Returns:
+        str: значение ячейки
+    """
+    if field == '№':
+        return str(i + 1)
+    if field == 'Навыки':
+        return '\n'.join(vacancy.key_skills)
+    if field == 'Оклад':
+        return vacancy.salary.string_for_table if vacancy.salary is not None else ''
+    if field == 'Дата публикации вакансии':
+        return convert_data(vacancy.published_at) if vacancy.published_at is not None else ''
+    return getattr(vacancy, TABLE_ATTRIBUTES[field]) or ''
+
+
+def get_date_key(published_at):
+    """ Преобразует дату публикации в число для сравнения дат
+
+    Args:
+     published_at (str): дата вида '2022-07-05T18:19:30+0300'
+    Returns:
+        int: дата вида 20220705
+    """
+    return int(published_at[:4] + published_at[5:7] + published_at[8:10])
+
+
+def split_query(filter_param):
+    """ Делит строку запроса на группы условий: группы соединены ' | ' (ИЛИ), условия в группе - ' & ' (И).
+    Часть строки без ': ' - не новое условие, а продолжение значения предыдущего условия вместе с разделителем,
+    поэтому значения с ' & ' и ' | ' (например 'Компания: Procter & Gamble') не нужно экранировать
+
+    Args:
+     filter_param (str): строка запроса, например 'Название: ^Программист & Оклад: 50000..150000 | Компания: X'
+    Returns:
+        [[str]]: группы условий вида 'Параметр: значение'
+
+    >>> split_query('Компания: Procter & Gamble | Название: Аналитик & Оклад: 100000')
+    [['Компания: Procter & Gamble'], ['Название: Аналитик', 'Оклад: 100000']]
+    """
+    parts = QUERY_SEPARATOR_PATTERN.split(filter_param)
+    groups = [[parts[0]]]
+    for k in range(1, len(parts), 2):
+        separator, part = parts[k], parts[k + 1]
+        if ': ' not in part:
+            groups[-1][-1] += separator + part
+        elif separator == QUERY_OR:
+            groups.append([part])
+        else:
+            groups[-1].append(part)
+    return groups
+
+
 def convert_data(string):
     """ Преобразует дату в читаемый вид для корректного отображения
 
@@ -82,6 +239,19 @@ def convert_data(string):
     return day + '.' + month + '.' + year
 
 
+def calculate_salary(vacancy):
+    """ Считает среднюю зарплату одной вакансии в рублях
+
+    Args:
+     vacancy (Vacancy): вакансия
+    Returns:
+         int: средняя зарплата вакансии
+    """
+    return CURRENCY_CONVERTER.convert(int(clean_int_point(vacancy.salary_from)),
+                                      int(clean_int_point(vacancy.salary_to)), vacancy.salary_currency,
+                                      vacancy.published_at)
+
+
 def calculate_salary_rating(vacancies):
     """ Считает среднюю зарплату из списка вакансий с учётом разных валют
 
@@ -94,63 +264,713 @@ def calculate_salary_rating(vacancies):
         return 0
     medium_salary = 0
     for vacancy in vacancies:
-        coef = CURRENCY_TO_RUB[vacancy.salary_currency]
-        medium_salary += (int(clean_int_point(vacancy.salary_from)) + int(
-            clean_int_point(vacancy.salary_to))) * coef // 2
+        medium_salary += calculate_salary(vacancy)
     return medium_salary // len(vacancies)
 
 
+def read_vacancies(file_name):
+    """ Построчно читает csv-файл и по одной возвращает вакансии в виде словарей, не храня весь файл в памяти
+
+    Args:
+        file_name (str): имя csv-файла с данными о вакансиях
+    Yields:
+        dict: словарь с данными о вакансии
+    """
+    is_head = True
+    with open(file_name, encoding='utf-8-sig') as file:
+        reader = csv.reader(file)
+        for row in reader:
+            row = list(filter(None, row))
+            if is_head:
+                is_head = False
+                head = row
+            elif len(head) == len(row):
+                yield make_vacancy_dict(head, row)
+
+
+def make_vacancy_dict(head, row):
+    """ Очищает значения строки csv-файла от html-тегов и лишних пробелов и собирает из них словарь вакансии
+
+    Args:
+        head ([str]): заголовок csv-файла
+        row ([str]): строка csv-файла
+    Returns:
+        dict: словарь с данными о вакансии
+    """
+    vacancy_dict = dict.fromkeys(head)
+    for i in range(len(head)):
+        vacancy_dict[head[i]] = clean_field(row[i])
+    return vacancy_dict
+
+
+def clean_field(value):
+    """ Убирает из значения поля html-теги и лишние пробелы, заменяет переводы строк на '###'.
+    Поля без '<' и без лишних пробельных символов (большинство чисел, дат и кодов) возвращаются без изменений.
+
+    Args:
+        value (str): значение поля csv-файла
+    Returns:
+        str: очищенное значение
+    """
+    if DIRTY_FIELD_PATTERN.search(value) is None:
+        return value
+    return " ".join(HTML_TAG_PATTERN.sub('', value).replace('\n', '###').split())
+
+
+def count_quotes(file, start, end):
+    """ Считает кол-во кавычек в байтовом диапазоне файла
+
+    Args:
+        file: файл, открытый в режиме 'rb'
+        start (int): начало диапазона
+        end (int): конец диапазона
+    Returns:
+        int: кол-во символов '"' в диапазоне
+    """
+    quotes = 0
+    file.seek(start)
+    while start < end:
+        block = file.read(min(BLOCK_SIZE, end - start))
+        if not block:
+            break
+        quotes += block.count(b'"')
+        start += len(block)
+    return quotes
+
+
+def find_record_end(file, pos, quotes):
+    """ Ищет начало следующей записи csv-файла: первый перевод строки после pos, перед которым чётное кол-во
+    кавычек, то есть стоящий вне поля в кавычках (переводы строк внутри полей пропускаются)
+
+    Args:
+        file: файл, открытый в режиме 'rb'
+        pos (int): позиция, с которой начинается поиск
+        quotes (int): кол-во кавычек в файле до позиции pos
+    Returns:
+        int: позиция начала следующей записи (или размер файла)
+        int: кол-во кавычек в файле до этой позиции
+    """
+    file.seek(pos)
+    while True:
+        block = file.read(BLOCK_SIZE)
+        if not block:
+            return pos, quotes
+        start = 0
+        while True:
+            newline = block.find(b'\n', start)
+            if newline == -1:
+                quotes += block.count(b'"', start)
+                pos += len(block)
+                break
+            quotes += block.count(b'"', start, newline)
+            start = newline + 1
+            if quotes % 2 == 0:
+                return pos + start, quotes
+
+
+def split_csv_file(file_name, chunk_count):
+    """ Делит csv-файл на байтовые диапазоны, границы которых совпадают с границами записей
+
+    Args:
+        file_name (str): имя csv-файла с данными о вакансиях
+        chunk_count (int): желаемое кол-во диапазонов
+    Returns:
+        [str]: заголовок csv-файла
+        [(int, int)]: список диапазонов (начало, конец) без строки заголовка
+    """
+    size = os.path.getsize(file_name)
+    with open(file_name, 'rb') as file:
+        header_end, quotes = find_record_end(file, 0, 0)
+        if header_end == 0:
+            return [], []
+        file.seek(0)
+        head = list(filter(None, next(csv.reader([file.read(header_end).decode('utf-8-sig')]))))
+
+        bounds = []
+        start = header_end
+        for i in range(1, chunk_count):
+            target = header_end + (size - header_end) * i // chunk_count
+            if target <= start:
+                continue
+            quotes += count_quotes(file, start, target)
+            end, quotes = find_record_end(file, target, quotes)
+            bounds.append((start, end))
+            start = end
+        if start < size:
+            bounds.append((start, size))
+    return head, bounds
+
+
+class MappedCsv(object):
+    """ Класс для чтения csv-файла через mmap: границы записей ищутся прямо в отображённом в память файле,
+    а поля декодируются только по запросу
+    Attributes:
+        file_name (str): имя csv-файла
+        size (int): размер файла в байтах
+        data (mmap.mmap or bytes): содержимое файла
+        start (int): начало данных (после BOM)
+        head ([str]): заголовок csv-файла
+        data_start (int): начало первой записи после заголовка
+    """
+
+    def __init__(self, file_name):
+        """инициализирует объект типа MappedCsv
+        Args:
+            file_name (str): имя csv-файла
+        """
+        self.file_name = file_name
+        self.file = open(file_name, 'rb')
+        self.size = os.fstat(self.file.fileno()).st_size
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if self.size != 0 else b''
+        self.start = len(codecs.BOM_UTF8) if self.data[:len(codecs.BOM_UTF8)] == codecs.BOM_UTF8 else 0
+        self.data_start = self.find_record_end(self.start)
+        header = self.data[self.start:self.data_start].decode('utf-8')
+        self.head = list(filter(None, next(csv.reader(io.StringIO(header, newline=None)), [])))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Закрывает отображение и файл
+        """
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self.file.close()
+
+    def count_lines(self):
+        """ Считает кол-во строк файла по переводам строк ('\n', '\r\n' и '\r') в отображённом буфере,
+        не декодируя его
+
+        Returns:
+            int: кол-во строк
+        """
+        lines = 0
+        for pos in range(self.start, self.size, BLOCK_SIZE):
+            block = self.data[pos:pos + BLOCK_SIZE]
+            lines += block.count(b'\n') + block.count(b'\r') - block.count(b'\r\n')
+            if block.endswith(b'\r') and self.data[pos + BLOCK_SIZE:pos + BLOCK_SIZE + 1] == b'\n':
+                lines -= 1
+        if self.size > self.start and self.data[self.size - 1:self.size] not in (b'\n', b'\r'):
+            lines += 1
+        return lines
+
+    def find_record_end(self, pos, end=None, quotes=0):
+        """ Ищет конец записи, начинающейся с pos: перевод строки, перед которым в записи чётное кол-во кавычек
+
+        Args:
+            pos (int): начало записи (или позиция внутри записи, см. quotes)
+            end (int): граница поиска (по умолчанию - конец файла)
+            quotes (int): кол-во кавычек в записи до позиции pos
+        Returns:
+            int: позиция начала следующей записи
+        """
+        if end is None:
+            end = self.size
+        while pos < end:
+            newline = self.data.find(b'\n', pos, end)
+            newline = end if newline == -1 else newline + 1
+            quotes += self.data[pos:newline].count(b'"')
+            pos = newline
+            if quotes % 2 == 0:
+                break
+        return pos
+
+    def records(self, start=None, end=None):
+        """ По одной возвращает записи (в байтах) из диапазона файла
+
+        Args:
+            start (int): начало диапазона, граница записи (по умолчанию - первая запись после заголовка)
+            end (int): конец диапазона, граница записи (по умолчанию - конец файла)
+        Yields:
+            bytes: запись вместе с переводом строки
+        """
+        data = self.data
+        pos = self.data_start if start is None else start
+        end = self.size if end is None else end
+        while pos < end:
+            next_pos = data.find(b'\n', pos, end)
+            next_pos = end if next_pos == -1 else next_pos + 1
+            record = data[pos:next_pos]
+            if record.count(b'"') % 2 != 0:
+                next_pos = self.find_record_end(pos, end)
+                record = data[pos:next_pos]
+            yield record
+            pos = next_pos
+
+    def get_average_record_size(self, start=None, end=None):
+        """ Оценивает средний размер записи в диапазоне по записям из первых RECORD_SAMPLE_SIZE байт диапазона
+
+        Args:
+            start (int): начало диапазона, граница записи (по умолчанию - первая запись после заголовка)
+            end (int): конец диапазона, граница записи (по умолчанию - конец файла)
+        Returns:
+            float: средний размер записи в байтах (0 - если в диапазоне нет записей)
+        """
+        count = 0
+        size = 0
+        for record in self.records(start, end):
+            count += 1
+            size += len(record)
+            if size >= RECORD_SAMPLE_SIZE:
+                break
+        return size / count if count else 0
+
+    def rows(self, start=None, end=None):
+        """ По одной возвращает строки из диапазона файла, разобранные модулем csv. Диапазон декодируется блоками
+        примерно по BLOCK_SIZE байт, границы блоков совпадают с границами записей (как в records)
+
+        Args:
+            start (int): начало диапазона, граница записи (по умолчанию - первая запись после заголовка)
+            end (int): конец диапазона, граница записи (по умолчанию - конец файла)
+        Yields:
+            [str]: значения полей строки
+        """
+        pos = self.data_start if start is None else start
+        end = self.size if end is None else end
+        while pos < end:
+            block_end = min(pos + BLOCK_SIZE, end)
+            if block_end < end:
+                block_end = self.find_record_end(block_end, end, self.data[pos:block_end].count(b'"'))
+            yield from csv.reader(io.StringIO(self.data[pos:block_end].decode('utf-8'), newline=None))
+            pos = block_end
+
+
+def split_record(record):
+    """ Делит запись csv-файла на поля, не декодируя их. Поля в кавычках возвращаются вместе с кавычками.
+
+    Args:
+        record (bytes): запись
+    Returns:
+        [bytes] or None: поля записи, None - если запись нужно разобрать модулем csv (нестандартные кавычки
+                         или одиночный '\r')
+    """
+    if record.endswith(b'\r\n'):
+        record = record[:-2]
+    elif record.endswith(b'\n'):
+        record = record[:-1]
+    if b'"' not in record:
+        if b'\r' in record:
+            return None
+        return record.split(b',')
+
+    fields = []
+    pos = 0
+    length = len(record)
+    while True:
+        if record.startswith(b'"', pos):
+            close = record.find(b'"', pos + 1)
+            while close != -1 and record.startswith(b'"', close + 1):
+                close = record.find(b'"', close + 2)
+            if close == -1:
+                return None
+            fields.append(record[pos:close + 1])
+            pos = close + 1
+            if pos == length:
+                return fields
+            if not record.startswith(b',', pos):
+                return None
+            pos += 1
+        else:
+            comma = record.find(b',', pos)
+            field = record[pos:length if comma == -1 else comma]
+            if b'"' in field or b'\r' in field:
+                return None
+            fields.append(field)
+            if comma == -1:
+                return fields
+            pos = comma + 1
+
+
+def decode_field(field):
+    """ Декодирует поле, полученное из split_record, так же, как это сделал бы модуль csv при чтении в текстовом
+    режиме
+
+    Args:
+        field (bytes): поле
+    Returns:
+        str: значение поля
+    """
+    if field.startswith(b'"'):
+        value = field[1:-1].decode('utf-8').replace('""', '"')
+    else:
+        value = field.decode('utf-8')
+    if '\r' in value:
+        value = value.replace('\r\n', '\n').replace('\r', '\n')
+    return value
+
+
+def read_vacancies_mapped(file_name, columns=None, start=None, end=None, head=None, clean=clean_field):
+    """ Читает csv-файл через mmap и по одной возвращает вакансии в виде словарей. Очищаются только нужные
+    столбцы, остальные только проверяются на пустоту.
+    Обычно записи разбираются модулем csv блоками из отображённого буфера (MappedCsv.rows) - на коротких записях
+    это быстрее всего. Если нужны не все столбцы, а записи в среднем длиннее SPLIT_RECORD_SIZE (например, длинные
+    описания), записи делятся на поля в байтах (split_record) и ненужные поля не декодируются совсем.
+
+    Args:
+        file_name (str): имя csv-файла с данными о вакансиях
+        columns ([str]): нужные столбцы (по умолчанию - все)
+        start (int): начало диапазона, граница записи (по умолчанию - начало файла)
+        end (int): конец диапазона, граница записи (по умолчанию - конец файла)
+        head ([str]): названия столбцов по порядку (по умолчанию - заголовок файла)
+        clean: функция очистки значения поля (str - не очищать)
+    Yields:
+        dict: словарь с данными о вакансии (только нужные столбцы)
+    """
+    with MappedCsv(file_name) as mapped:
+        coll_number = len(mapped.head)
+        if head is None:
+            head = mapped.head
+        indexes = [i for i in range(len(head)) if columns is None or head[i] in columns]
+        if columns is not None and mapped.get_average_record_size(start, end) >= SPLIT_RECORD_SIZE:
+            for record in mapped.records(start, end):
+                yield from parse_record(record, head, coll_number, indexes, clean)
+            return
+        for row in mapped.rows(start, end):
+            if '' in row:
+                row = [value for value in row if value]
+            if coll_number == len(row):
+                yield {head[i]: clean(row[i]) for i in indexes}
+
+
+def parse_record(record, head, coll_number, indexes, clean=clean_field):
+    """ Разбирает одну запись csv-файла. Строки с пустыми полями и с неверным кол-вом полей пропускаются.
+
+    Args:
+        record (bytes): запись
+        head ([str]): названия столбцов по порядку
+        coll_number (int): кол-во столбцов в заголовке файла
+        indexes ([int]): номера нужных столбцов
+        clean: функция очистки значения поля
+    Yields:
+        dict: словарь с данными о вакансии (только нужные столбцы)
+    """
+    fields = split_record(record)
+    if fields is None:
+        for row in csv.reader(io.StringIO(record.decode('utf-8'), newline=None)):
+            row = list(filter(None, row))
+            if coll_number == len(row):
+                yield {head[i]: clean(row[i]) for i in indexes}
+        return
+    if b'' in fields or b'""' in fields:
+        fields = [field for field in fields if field and field != b'""']
+    if coll_number == len(fields):
+        yield {head[i]: clean(decode_field(fields[i])) for i in indexes}
+
+
+def get_required_columns(filter_param, sort_param, colomns):
+    """ Определяет, какие столбцы csv-файла нужны для фильтрации, сортировки и печати таблицы
+
+    Args:
+        filter_param (str): параметр фильтрации
+        sort_param (str): параметр сортировки
+        colomns (str): название столбцов через запятую, которые нужно вывести (пустая строка - все)
+    Returns:
+        set or None: названия нужных столбцов из HEAD, None - если нужны все столбцы
+    """
+    if colomns == '':
+        return None
+    rus_names = colomns.split(', ') + sort_param.split(', ')
+    for group in split_query(filter_param):
+        for condition in group:
+            if ': ' in condition:
+                rus_names.append(condition[:condition.index(':')])
+    columns = set()
+    for rus_name in rus_names:
+        columns.update(COLUMNS_BY_RUS_HEAD.get(rus_name, []))
+    return columns
+
+
+def count_lines(file_name):
+    """ Считает кол-во строк файла через mmap
+
+    Args:
+        file_name (str): имя файла
+    Returns:
+        int: кол-во строк
+    """
+    with MappedCsv(file_name) as mapped:
+        return mapped.count_lines()
+
+
+def collect_chunk_statistics(file_name, start, end, vac_name, granularity='year'):
+    """ Считает частичную статистику по одному диапазону файла (выполняется в отдельном процессе)
+
+    Args:
+        file_name (str): имя csv-файла с данными о вакансиях
+        start (int): начало диапазона
+        end (int): конец диапазона
+        vac_name (str): название профессии, для которой будет отдельная статистика
+        granularity (str): период статистики: 'year', 'month' или 'week'
+    Returns:
+        StatisticsAccumulator: частичная статистика (без вызова finish)
+    """
+    statistics = StatisticsAccumulator(vac_name, granularity)
+    for vac_dict in read_vacancies_mapped(file_name, SHORT_HEAD, start, end):
+        statistics.add(Vacancy(vac_dict))
+    return statistics
+
+
+def collect_statistics(file_name, vac_name, granularity='year'):
+    """ Считает статистику по вакансиям за один проход по файлу (потоковый режим)
+
+    Args:
+        file_name (str): имя csv-файла с данными о вакансиях
+        vac_name (str): название профессии, для которой будет отдельная статистика
+        granularity (str): период статистики: 'year', 'month' или 'week'
+    Returns:
+        StatisticsAccumulator: накопленная статистика, готовая для Report
+    """
+    statistics = StatisticsAccumulator(vac_name, granularity)
+    for vac_dict in read_vacancies_mapped(file_name, SHORT_HEAD):
+        statistics.add(Vacancy(vac_dict))
+    statistics.finish()
+    return statistics
+
+
+def collect_professions_statistics(file_name, vac_names, granularity='year'):
+    """ Считает статистику сразу для нескольких профессий за один проход по файлу
+
+    Args:
+        file_name (str): имя csv-файла с данными о вакансиях
+        vac_names ([str]): названия профессий
+        granularity (str): период статистики: 'year', 'month' или 'week'
+    Returns:
+        ProfessionsAccumulator: накопленная статистика (см. ProfessionsAccumulator.get_statistics)
+    """
+    statistics = ProfessionsAccumulator(vac_names, granularity)
+    for vac_dict in read_vacancies_mapped(file_name, SHORT_HEAD):
+        statistics.add(Vacancy(vac_dict))
+    statistics.finish()
+    return statistics
+
+
+def generate_reports(file_name, vac_names, output_dir='.', granularity='year', regions=None):
+    """ Формирует отчёты (xlsx, png и pdf) для каждой профессии из списка, разбирая файл один раз.
+    Файлы называются по профессии: '<профессия>.xlsx', '<профессия>.png', '<профессия>.pdf'.
+
+    Args:
+        file_name (str): имя csv-файла с данными о вакансиях
+        vac_names ([str]): названия профессий
+        output_dir (str): папка для отчётов
+        granularity (str): период статистики: 'year', 'month' или 'week'
+        regions ({str: str}): регионы городов (см. read_regions), None - статистика по городам
+    Returns:
+        [Report]: отчёты в порядке vac_names
+    """
+    statistics = collect_professions_statistics(file_name, vac_names, granularity)
+    reports = []
+    for k in range(len(vac_names)):
+        profession_statistics = statistics.get_statistics(k)
+        if regions is not None:
+            profession_statistics = profession_statistics.group_cities(regions)
+        base_name = get_safe_file_name(vac_names[k])
+        reports.append((Report(profession_statistics, vac_names[k]),
+                        {stage: base_name + '.' + stage for stage in REPORT_FILE_NAMES}))
+    ReportPipeline(output_dir, os.cpu_count()).run_many(reports)
+    return [report for report, _ in reports]
+
+
+def get_safe_file_name(name):
+    """ Заменяет в строке символы, которые нельзя использовать в имени файла
+
+    Args:
+        name (str): строка, например название профессии
+    Returns:
+        str: имя файла
+    """
+    return re.sub(r'[\\/:*?"<>|]', '_', name) or '_'
+
+
+def collect_statistics_incremental(file_name, vac_name, granularity='year'):
+    """ Считает статистику, дочитывая только строки, дописанные в конец файла с прошлого запуска. Суммы и количества
+    сохраняются в json-файле рядом с csv-файлом вместе с позицией, до которой файл уже прочитан. Если файл был
+    не дописан, а изменён (не совпадают заголовок или последние байты перед этой позицией), или изменились курсы
+    валют, статистика считается заново.
+    Незаконченная последняя строка (без перевода строки) учитывается в результате, но не в сохранённом состоянии.
+
+    Args:
+        file_name (str): имя csv-файла с данными о вакансиях
+        vac_name (str): название профессии, для которой будет отдельная статистика
+        granularity (str): период статистики: 'year', 'month' или 'week'
+    Returns:
+        StatisticsAccumulator: накопленная статистика, готовая для Report (совпадает с collect_statistics)
+    """
+    state_name = file_name + STATE_SUFFIX
+    states = {}
+    if os.path.exists(state_name):
+        with open(state_name, encoding='utf-8') as file:
+            states = json.load(file)
+
+    with MappedCsv(file_name) as mapped:
+        state_key = vac_name if granularity == 'year' else vac_name + '/' + granularity
+        state = states.get(state_key)
+        if (state is not None and mapped.data_start <= state['offset'] <= mapped.size and
+                state['checkpoint'] == get_checkpoint_hash(mapped, state['offset']) and
+                state.get('rates') == CURRENCY_CONVERTER.fingerprint):
+            statistics = StatisticsAccumulator.from_dict(state['statistics'])
+            offset = state['offset']
+        else:
+            statistics = StatisticsAccumulator(vac_name, granularity)
+            offset = mapped.data_start
+
+        head = mapped.head
+        indexes = [i for i in range(len(head)) if head[i] in SHORT_HEAD]
+        saved_statistics = None
+        for record in mapped.records(offset):
+            if not record.endswith(b'\n'):
+                saved_statistics = statistics.to_dict()
+            else:
+                offset += len(record)
+            for vac_dict in parse_record(record, head, len(head), indexes):
+                statistics.add(Vacancy(vac_dict))
+
+        states[state_key] = {'offset': offset, 'checkpoint': get_checkpoint_hash(mapped, offset),
+                             'rates': CURRENCY_CONVERTER.fingerprint,
+                             'statistics': saved_statistics or statistics.to_dict()}
+    tmp_name = state_name + '.tmp'
+    with open(tmp_name, 'w', encoding='utf-8') as file:
+        json.dump(states, file, ensure_ascii=False)
+    os.replace(tmp_name, state_name)
+
+    statistics.finish()
+    return statistics
+
+
+def collect_statistics_cached(file_name, vac_name, granularity='year'):
+    """ Считает статистику по столбцам датасета (см. load_vacancy_columns), запоминая готовые результаты в файле
+    рядом с csv-файлом (QueryCache). Повторный запуск для той же профессии и периода не пересчитывает статистику,
+    пока не изменились файл или курсы валют
+
+    Args:
+        file_name (str): имя csv-файла с данными о вакансиях
+        vac_name (str): название профессии, для которой будет отдельная статистика
+        granularity (str): период статистики: 'year', 'month' или 'week'
+    Returns:
+        StatisticsAccumulator: накопленная статистика, готовая для Report (совпадает с collect_statistics)
+    """
+    cache = QueryCache(file_name=file_name + RESULTS_SUFFIX)
+    key = get_query_key('statistics', file_name, {'vac_name': vac_name, 'granularity': granularity})
+    fingerprint = [get_file_fingerprint(file_name), CURRENCY_CONVERTER.fingerprint]
+    found, state = cache.get(key, fingerprint)
+    statistics = None
+    if found:
+        try:
+            statistics = StatisticsAccumulator.from_dict(state)
+            statistics.finish()
+        except (KeyError, TypeError, ValueError):
+            statistics = None
+    if statistics is None:
+        statistics = load_vacancy_columns(file_name).collect_statistics(vac_name, granularity)
+        cache.put(key, fingerprint, statistics.to_dict())
+    cache.save()
+    return statistics
+
+
+def get_checkpoint_hash(mapped, offset):
+    """ Считает хэш заголовка и последних HASH_SAMPLE_SIZE байт перед позицией - по нему проверяется, что уже
+    прочитанная часть файла не изменилась
+
+    Args:
+        mapped (MappedCsv): файл
+        offset (int): позиция
+    Returns:
+        str: хэш
+    """
+    checkpoint_hash = hashlib.blake2b(mapped.data[:mapped.data_start])
+    checkpoint_hash.update(mapped.data[max(offset - HASH_SAMPLE_SIZE, mapped.data_start):offset])
+    return checkpoint_hash.hexdigest()
+
+
+def collect_statistics_parallel(file_name, vac_name, workers=None, granularity='year'):
+    """ Считает статистику по вакансиям в нескольких процессах: файл делится на диапазоны по границам записей,
+    каждый диапазон обрабатывается отдельно, затем частичные результаты объединяются в порядке следования в файле.
+    Результат совпадает с collect_statistics.
+
+    Args:
+        file_name (str): имя csv-файла с данными о вакансиях
+        vac_name (str): название профессии, для которой будет отдельная статистика
+        workers (int): кол-во процессов (по умолчанию - кол-во ядер)
+        granularity (str): период статистики: 'year', 'month' или 'week'
+    Returns:
+        StatisticsAccumulator: накопленная статистика, готовая для Report
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    chunk_count = max(workers, os.path.getsize(file_name) // CHUNK_SIZE + 1)
+    bounds = split_csv_file(file_name, chunk_count)[1]
+
+    statistics = StatisticsAccumulator(vac_name, granularity)
+    with ProcessPoolExecutor(max_workers=workers, initializer=set_currency_converter,
+                             initargs=(CURRENCY_CONVERTER,)) as executor:
+        futures = [executor.submit(collect_chunk_statistics, file_name, start, end, vac_name, granularity)
+                   for start, end in bounds]
+        for future in futures:
+            statistics.merge(future.result())
+    statistics.finish()
+    return statistics
+
+
 class DataSetForTable(object):
     """ Класс для представления датасета, на основе которого построится таблица
 
     Attributes:
         file_name (str): имя csv-файла, в котором хранятся сведения о вакансиях
         vacancies_objects ([Vacancy]): массив объектов типа Vacancy, все вакансии в датасете
+        all_vacancies ([Vacancy]): все вакансии датасета до фильтрации
+        index (VacancyIndex or None): вторичные индексы для фильтрации (см. build_indexes)
     """
-    def __init__(self, file_name):
+    def __init__(self, file_name, columns=None):
         """Инициализирует dataset
 
         Args:
              file_name (str): имя csv-файла, в котором хранятся сведения о вакансиях
+             columns (set): столбцы, которые нужно разобрать (по умолчанию - все), см. get_required_columns
         """
-        list_vac_dict = self.csv_parser(file_name)
+        list_vac_dict = self.csv_parser(file_name, columns)
 
         self.file_name = file_name
-        if not list_vac_dict:
-            self.vacancies_objects = []
-        else:
-            self.vacancies_objects = [VacancyForTable(vac_dict) for vac_dict in list_vac_dict]
+        with PROFILER.stage('build', len(list_vac_dict)):
+            if not list_vac_dict:
+                self.vacancies_objects = []
+            else:
+                self.vacancies_objects = [VacancyForTable(vac_dict) for vac_dict in list_vac_dict]
+        self.all_vacancies = self.vacancies_objects
+        self.index = None
 
-    def csv_parser(self, file_name):
-        """ Читает файл, распарсивает его, записывает данные в список словарей
+    def build_indexes(self):
+        """ Строит вторичные индексы по всем вакансиям датасета. После этого фильтрация по названию, компании,
+        региону, опыту, премиальности, валюте, окладу и навыкам не просматривает все вакансии.
+        Индексы строятся по исходным (непереведённым) значениям, поэтому вызывать нужно до translate.
+        """
+        self.index = VacancyIndex(self.all_vacancies)
+
+    def reset_filter(self):
+        """ Отменяет фильтрацию: возвращает в vacancies_objects все вакансии датасета
+        """
+        self.vacancies_objects = self.all_vacancies
+
+    def csv_parser(self, file_name, columns=None):
+        """ Читает файл, распарсивает его, записывает данные в список словарей. Столбцы, которые не входят
+        в columns, не декодируются и не очищаются.
+        Если включены замеры (PROFILER), разбор и очистка полей выполняются отдельными проходами, чтобы их время
+        можно было замерить по отдельности
 
         Args:
             file_name(str): имя csv-файла, в котором хранятся сведения о вакансиях
+            columns (set): нужные столбцы (по умолчанию - все)
         Returns:
             [dict]: список словарей(каждый словарь - вакансия)
         """
-        is_head = True
-        rows = []
-        with open(file_name, encoding='utf-8-sig') as file:
-            reader = csv.reader(file)
-            for row in reader:
-                row = list(filter(None, row))
-                if is_head:
-                    is_head = False
-                    head = row
-                    coll_number = len(head)
-                elif coll_number == len(row):
-                    rows.append(row)
-        list_vac_dict = []
-        for row in rows:
-            vacancy_dict = dict.fromkeys(HEAD)
-            for i in range(len(HEAD)):
-                key = HEAD[i]
-                value = " ".join(re.sub(re.compile('<.*?>'), '', row[i]).replace('\n', '###')
-                                 .replace('\r\n', '').split())
-                vacancy_dict[key] = value
-            list_vac_dict.append(vacancy_dict)
-        return list_vac_dict
+        if not PROFILER.enabled:
+            return list(read_vacancies_mapped(file_name, columns, head=HEAD))
+        with PROFILER.stage('parse') as stage:
+            list_vac_dict = list(read_vacancies_mapped(file_name, columns, head=HEAD, clean=str))
+            stage['rows'] = len(list_vac_dict)
+        with PROFILER.stage('normalize', len(list_vac_dict)):
+            return [{name: clean_field(value) for name, value in vac_dict.items()} for vac_dict in list_vac_dict]
 
     def filter(self, filter_param):
         """ Фильтрует вакансии по введённому параметру. Если он пустой, то фильтрация не производится.
@@ -163,6 +983,12 @@ class DataSetForTable(object):
         index = filter_param.index(':')
         param_name = filter_param[:index]
         param_value = filter_param[index + 2:]
+        if self.index is not None and self.vacancies_objects is self.all_vacancies:
+            positions = self.index.find(param_name, param_value)
+            if positions is not None:
+                self.vacancies_objects = [self.all_vacancies[i] for i in positions]
+                return
+
         if param_name == 'Название':
             for vacancy in self.vacancies_objects:
                 if vacancy.name == param_value:
@@ -193,7 +1019,7 @@ class DataSetForTable(object):
                     filtered_vacancy.append(vacancy)
         elif param_name == 'Оклад':
             for vacancy in self.vacancies_objects:
-                if int(vacancy.salary.salary_from) <= int(param_value) <= int(vacancy.salary.salary_to):
+                if vacancy.salary.salary_from_number <= int(param_value) <= vacancy.salary.salary_to_number:
                     filtered_vacancy.append(vacancy)
         elif param_name == 'Дата публикации вакансии':
             for vacancy in self.vacancies_objects:
@@ -212,14 +1038,35 @@ class DataSetForTable(object):
 
         self.vacancies_objects = filtered_vacancy
 
-    def translate(self):
+    def query(self, filter_param):
+        """ Фильтрует вакансии по запросу из нескольких условий (см. Query). Изменяет атрибут vacancies_objects.
+        Если построены индексы и вакансии ещё не отфильтрованы, кандидаты выбираются по индексам.
+
+        Args:
+            filter_param (str): строка запроса
+        """
+        query = Query(filter_param)
+        if self.index is not None and self.vacancies_objects is self.all_vacancies:
+            self.vacancies_objects = query.execute(self.all_vacancies, self.index)
+        else:
+            self.vacancies_objects = query.execute(self.vacancies_objects)
+
+    def translate(self, positions=None):
         """ Переводит поля experience_id, premium, salary.salary_gross и преобразует дату к виду 'YYYY.MM.DD HH:MM:SS'
         Изменяет атрибут vacancies_objects.
+        Args:
+            positions (range or [int]): позиции вакансий, которые нужно перевести (по умолчанию - все)
         """
-        for vacancy in self.vacancies_objects:
-            vacancy.experience_id = WORK_EXPERIENCE[vacancy.experience_id]
-            vacancy.premium = BOOL_TRANSLATE[vacancy.premium]
-            vacancy.salary.salary_gross = BOOL_TRANSLATE[vacancy.salary.salary_gross]
+        vacancies = self.vacancies_objects if positions is None else [self.vacancies_objects[i] for i in positions]
+        for vacancy in vacancies:
+            if vacancy.experience_id is not None:
+                vacancy.experience_id = WORK_EXPERIENCE[vacancy.experience_id]
+            if vacancy.premium is not None:
+                vacancy.premium = BOOL_TRANSLATE[vacancy.premium]
+            if vacancy.salary is not None:
+                vacancy.salary.salary_gross = BOOL_TRANSLATE[vacancy.salary.salary_gross]
+            if vacancy.published_at is None:
+                continue
 
             year = vacancy.published_at[:4]
             month = vacancy.published_at[5:7]
@@ -229,80 +1076,119 @@ class DataSetForTable(object):
             sec = vacancy.published_at[17:19]
             vacancy.published_at = year + '.' + month + '.' + day + ' ' + hour + ':' + min + ':' + sec
 
-    def sort(self, sort_param, is_reverse_sort):
-        """ Сортирует вакансии по определённому параметру
+    def sort(self, sort_param, is_reverse_sort, limit=None):
+        """ Сортирует вакансии по одному или нескольким параметрам (через запятую, например 'Оклад, Название').
+        Ключ сортировки считается один раз для каждой вакансии. Если задан limit, выбираются только первые limit
+        вакансий (частичная сортировка через кучу), остальные отбрасываются.
         Изменяет атрибут vacancies_objects.
         Args:
             sort_param (str): параметр сортировки
             is_reverse_sort (bool): обратный порядок сортировки
+            limit (int): сколько первых вакансий нужно (по умолчанию - все)
+        """
+        positions = self.get_sort_order(sort_param, is_reverse_sort, limit)
+        if positions is not None:
+            self.vacancies_objects = [self.vacancies_objects[i] for i in positions]
+
+    def get_sort_order(self, sort_param, is_reverse_sort, limit=None):
+        """ Считает порядок сортировки вакансий, не меняя vacancies_objects (см. sort)
+        Args:
+            sort_param (str): параметр сортировки
+            is_reverse_sort (bool): обратный порядок сортировки
+            limit (int): сколько первых вакансий нужно (по умолчанию - все)
+        Returns:
+            [int] or None: позиции вакансий в vacancies_objects в порядке сортировки (None - сортировать не по чему)
         """
-        if sort_param == 'Название':
-            self.vacancies_objects = sorted(self.vacancies_objects, key=lambda vac: vac.name, reverse=is_reverse_sort)
-        elif sort_param == 'Описание':
-            self.vacancies_objects = sorted(self.vacancies_objects, key=lambda vac: vac.description,
-                                            reverse=is_reverse_sort)
-        elif sort_param == 'Компания':
-            self.vacancies_objects = sorted(self.vacancies_objects, key=lambda vac: vac.employer_name,
-                                            reverse=is_reverse_sort)
-        elif sort_param == 'Название региона':
-            self.vacancies_objects = sorted(self.vacancies_objects, key=lambda vac: vac.area_name,
-                                            reverse=is_reverse_sort)
-        elif sort_param == 'Премиум-вакансия':
-            self.vacancies_objects = sorted(self.vacancies_objects, key=lambda vac: vac.premium,
-                                            reverse=is_reverse_sort)
-        elif sort_param == 'Опыт работы':
-            self.vacancies_objects = sorted(self.vacancies_objects,
-                                            key=lambda vac: WORK_EXPERIENCE_FOR_SORT[vac.experience_id],
-                                            reverse=is_reverse_sort)
-        elif sort_param == 'Навыки':
-            self.vacancies_objects = sorted(self.vacancies_objects, key=lambda vac: len(vac.key_skills),
-                                            reverse=is_reverse_sort)
-        elif sort_param == 'Оклад':
-            self.vacancies_objects = sorted(self.vacancies_objects, key=lambda vac: vac.salary.get_convert_salary(),
-                                            reverse=is_reverse_sort)
-        elif sort_param == 'Дата публикации вакансии':
-            self.vacancies_objects = sorted(self.vacancies_objects, key=lambda vac: vac.published_at,
-                                            reverse=is_reverse_sort)
-
-    def print_table(self, lines_to_print, colomns):
-        """ Печатает таблицу с определёнными строками и столбцами
+        key_functions = [SORT_KEYS[name] for name in sort_param.split(', ') if name in SORT_KEYS]
+        if not key_functions:
+            return None
+        if len(key_functions) == 1:
+            keys = [key_functions[0](vacancy) for vacancy in self.vacancies_objects]
+        else:
+            keys = [tuple(key_function(vacancy) for key_function in key_functions)
+                    for vacancy in self.vacancies_objects]
+
+        positions = range(len(keys))
+        if limit is not None and limit < len(keys):
+            if is_reverse_sort:
+                return heapq.nlargest(limit, positions, key=keys.__getitem__)
+            return heapq.nsmallest(limit, positions, key=keys.__getitem__)
+        return sorted(positions, key=keys.__getitem__, reverse=is_reverse_sort)
+
+    def print_table(self, lines_to_print, colomns, file=None):
+        """ Печатает таблицу с определёнными строками и столбцами. Форматируются только выводимые строки и столбцы.
         Args:
             lines_to_print (str): номера строк, которые необходимо вывести вида '10 20'(Если пустая строка - печатается
                                  всё).
             colomns (str): название столбцов через запятую, которые нужно вывести(Если пустая строка - печатается всё).
+            file: файл для вывода (по умолчанию - sys.stdout)
         """
-        table = PrettyTable()
-        table._max_width = {'№': 20, 'Название': 20, 'Описание': 20, 'Навыки': 20, 'Опыт работы': 20,
-                            'Премиум-вакансия': 20, 'Компания': 20, 'Оклад': 20, 'Название региона': 20,
-                            'Дата публикации вакансии': 20}
-        table.hrules = ALL
-        table.align = 'l'
-        table.field_names = RUS_HEAD_FOR_PRINT
-        for i in range(len(self.vacancies_objects)):
-            vacancy = self.vacancies_objects[i]
-            row = [str(i + 1), vacancy.name, vacancy.description, '\n'.join(vacancy.key_skills), vacancy.experience_id,
-                   vacancy.premium, vacancy.employer_name, vacancy.salary.string_for_table, vacancy.area_name,
-                   convert_data(vacancy.published_at)]
-            for j in range(len(row)):
-                item = row[j]
-                if len(item) > 100:
-                    row[j] = item[:100] + '...'
-            table.add_row(row)
+        table = self.make_table(self.get_table_positions(lines_to_print), get_table_fields(colomns))
+        print(table.get_string(), file=file)
 
-        if colomns == '':
-            colomns = table.field_names
-        else:
-            colomns = colomns.split(', ')
-            colomns.insert(0, '№')
-        if lines_to_print == '':
-            table = table.get_string(fields=colomns)
-        elif ' ' in lines_to_print:
-            lines_to_print = lines_to_print.split(' ')
-            table = table.get_string(start=int(lines_to_print[0]) - 1, end=int(lines_to_print[1]) - 1, fields=colomns)
-        else:
-            table = table.get_string(start=int(lines_to_print) - 1, fields=colomns)
+    def iter_table_pages(self, lines_to_print, colomns, page_size=PAGE_SIZE):
+        """ По одной возвращает страницы таблицы: каждая страница форматируется только тогда, когда до неё дошла
+        очередь, поэтому первая страница готова сразу, независимо от размера датасета
+        Args:
+            lines_to_print (str): номера строк вида '10 20' (пустая строка - все)
+            colomns (str): название столбцов через запятую (пустая строка - все)
+            page_size (int): кол-во строк на странице
+        Yields:
+            str: страница таблицы
+        """
+        positions = self.get_table_positions(lines_to_print)
+        fields = get_table_fields(colomns)
+        for start in range(0, len(positions), page_size):
+            yield self.make_table(positions[start:start + page_size], fields).get_string()
+
+    def write_table_pages(self, file, lines_to_print, colomns, page_size=PAGE_SIZE):
+        """ Постранично записывает таблицу в файл (например, sys.stdout)
+        Args:
+            file: файл, открытый на запись
+            lines_to_print (str): номера строк вида '10 20' (пустая строка - все)
+            colomns (str): название столбцов через запятую (пустая строка - все)
+            page_size (int): кол-во строк на странице
+        """
+        for page in self.iter_table_pages(lines_to_print, colomns, page_size):
+            file.write(page + '\n')
+            file.flush()
+
+    def get_table_positions(self, lines_to_print):
+        """ Определяет номера вакансий, которые попадут в таблицу
+        Args:
+            lines_to_print (str): номера строк вида '10 20' (пустая строка - все, одно число - до конца)
+        Returns:
+            range: позиции вакансий в vacancies_objects
+        """
+        positions = range(len(self.vacancies_objects))
+        if lines_to_print == '':
+            return positions
+        if ' ' in lines_to_print:
+            lines_to_print = lines_to_print.split(' ')
+            return positions[int(lines_to_print[0]) - 1:int(lines_to_print[1]) - 1]
+        return positions[int(lines_to_print) - 1:]
 
-        print(table)
+    def make_table(self, positions, fields):
+        """ Создаёт таблицу из вакансий на указанных позициях, только с указанными столбцами
+        Args:
+            positions (range): позиции вакансий в vacancies_objects
+            fields ([str]): столбцы таблицы
+        Returns:
+            PrettyTable: таблица
+        """
+        table = PrettyTable()
+        table._max_width = {field: 20 for field in fields}
+        table.hrules = ALL
+        table.align = 'l'
+        table.field_names = fields
+        for i in positions:
+            row = [get_table_cell(i, self.vacancies_objects[i], field) for field in fields]
+            for j in range(len(row)):
+                item = row[j]
+                if len(item) > 100:
+                    row[j] = item[:100] + '...'
+            table.add_row(row)
+        return table
 
 
 class VacancyForTable(object):
@@ -317,22 +1203,40 @@ class VacancyForTable(object):
         salary(SalaryForTable): зарплата
         area_name(str): название города, населённого пункта
         published_at(str): дата публикации
+    Столбцы, которые не были разобраны (см. get_required_columns), равны None, навыки - пустому списку
     """
+    __slots__ = ('name', 'description', 'key_skills', 'experience_id', 'premium', 'employer_name', 'salary',
+                 'area_name', 'published_at')
+
     def __init__(self, vac_dict):
         """ Инициализирует вакансию, путём конвертирования значений словаря в атрибуты вакансии
         Args:
             vac_dict(dict): словарь вакансии
         """
-        self.name = vac_dict['name']
-        self.description = vac_dict['description']
-        self.key_skills = vac_dict['key_skills'].split('###')
-        self.experience_id = vac_dict['experience_id']
-        self.premium = vac_dict['premium']
-        self.employer_name = vac_dict['employer_name']
-        self.salary = SalaryForTable(vac_dict['salary_from'], vac_dict['salary_to'], vac_dict['salary_gross'],
-                                     vac_dict['salary_currency'])
-        self.area_name = vac_dict['area_name']
-        self.published_at = vac_dict['published_at']
+        self.name = vac_dict.get('name')
+        self.description = vac_dict.get('description')
+        self.key_skills = vac_dict['key_skills'].split('###') if 'key_skills' in vac_dict else []
+        self.experience_id = vac_dict.get('experience_id')
+        self.premium = vac_dict.get('premium')
+        self.employer_name = vac_dict.get('employer_name')
+        if 'salary_from' in vac_dict:
+            self.salary = SalaryForTable(vac_dict['salary_from'], vac_dict['salary_to'], vac_dict['salary_gross'],
+                                         vac_dict['salary_currency'])
+        else:
+            self.salary = None
+        self.area_name = vac_dict.get('area_name')
+        self.published_at = vac_dict.get('published_at')
+
+    def copy(self):
+        """ Создаёт копию вакансии с отдельным объектом зарплаты, чтобы копию можно было перевести (translate),
+        не меняя исходную вакансию
+        Returns:
+            VacancyForTable: копия
+        """
+        vacancy = copy.copy(self)
+        if self.salary is not None:
+            vacancy.salary = copy.copy(self.salary)
+        return vacancy
 
 
 class SalaryForTable(object):
@@ -343,8 +1247,12 @@ class SalaryForTable(object):
         salary_to(str): верхняя граница зп
         salary_gross(str): вычет налогов
         salary_currency(str): валюта
+        salary_from_number(int): нижняя граница зп числом
+        salary_to_number(int): верхняя граница зп числом
         string_for_table(str): строка для отображения зп в таблице
     """
+    __slots__ = ('salary_from', 'salary_to', 'salary_gross', 'salary_currency', 'salary_from_number',
+                 'salary_to_number', 'string_for_table')
 
     def __init__(self, salary_from, salary_to, salary_gross, salary_currency):
         """Инициализирует зарплату
@@ -358,6 +1266,8 @@ class SalaryForTable(object):
         self.salary_to = salary_to
         self.salary_gross = salary_gross
         self.salary_currency = salary_currency
+        self.salary_from_number = int(clean_int_point(salary_from))
+        self.salary_to_number = int(clean_int_point(salary_to))
         self.string_for_table = self.get_string_for_table()
 
     def get_convert_salary(self):
@@ -366,10 +1276,8 @@ class SalaryForTable(object):
         Returns:
             int: сконвертированная зп в рублях
         """
-        currency_to_rub = {"AZN": 35.68, "BYR": 23.91, "EUR": 59.90, "GEL": 21.74, "KGS": 0.76, "KZT": 0.13, "RUR": 1,
-                           "UAH": 1.64, "USD": 60.66, "UZS": 0.0055}
-        coef = currency_to_rub[self.salary_currency]
-        return (int(clean_int_point(self.salary_from)) * coef + int(clean_int_point(self.salary_to)) * coef) // 2
+        coef = CURRENCY_CONVERTER.rates[self.salary_currency]
+        return (self.salary_from_number * coef + self.salary_to_number * coef) // 2
 
     def get_string_for_table(self):
         """генерирует строку для отображения зп в таблице
@@ -386,6 +1294,417 @@ class SalaryForTable(object):
         return salary
 
 
+class VacancyIndex(object):
+    """Класс для вторичных индексов датасета таблицы, строится один раз и используется для многих фильтров
+    Attributes:
+        hash_indexes ({str: {str: [int]}}): хэш-индексы: параметр фильтрации -> значение -> позиции вакансий
+        skills_index ({str: set}): инвертированный индекс: навык -> позиции вакансий с этим навыком
+        salary_index (SalaryIntervalIndex or None): индекс интервалов зп, None - если зп не разбиралась
+        salary_starts ([(int, int)]): (нижняя граница зп, позиция) по возрастанию
+        salary_ends ([(int, int)]): (верхняя граница зп, позиция) по возрастанию
+        dates ([(int, int)]): (дата публикации вида 20220705, позиция) по возрастанию
+    """
+
+    def __init__(self, vacancies):
+        """инициализирует объект типа VacancyIndex
+        Args:
+            vacancies ([VacancyForTable]): вакансии, позиции в индексах - позиции в этом списке
+        """
+        self.hash_indexes = {'Название': {}, 'Компания': {}, 'Название региона': {}, 'Опыт работы': {},
+                             'Премиум-вакансия': {}, 'Идентификатор валюты оклада': {}}
+        self.skills_index = {}
+        intervals = []
+        for i in range(len(vacancies)):
+            vacancy = vacancies[i]
+            self.hash_indexes['Название'].setdefault(vacancy.name, []).append(i)
+            self.hash_indexes['Компания'].setdefault(vacancy.employer_name, []).append(i)
+            self.hash_indexes['Название региона'].setdefault(vacancy.area_name, []).append(i)
+            self.hash_indexes['Опыт работы'].setdefault(vacancy.experience_id, []).append(i)
+            premium = vacancy.premium.lower() if vacancy.premium is not None else None
+            self.hash_indexes['Премиум-вакансия'].setdefault(premium, []).append(i)
+            for skill in vacancy.key_skills:
+                self.skills_index.setdefault(skill, set()).add(i)
+            if vacancy.salary is not None:
+                currency_positions = self.hash_indexes['Идентификатор валюты оклада']
+                currency_positions.setdefault(vacancy.salary.salary_currency, []).append(i)
+                if vacancy.salary.salary_from_number <= vacancy.salary.salary_to_number:
+                    intervals.append((vacancy.salary.salary_from_number, vacancy.salary.salary_to_number, i))
+        self.salary_index = SalaryIntervalIndex(intervals) if intervals else None
+        self.salary_starts = sorted((interval[0], interval[2]) for interval in intervals)
+        self.salary_ends = sorted((interval[1], interval[2]) for interval in intervals)
+        self.dates = sorted((get_date_key(vacancy.published_at), i) for i, vacancy in enumerate(vacancies)
+                            if vacancy.published_at is not None)
+
+    def find(self, param_name, param_value):
+        """Ищет вакансии, подходящие под фильтр, по индексам
+        Args:
+            param_name (str): название параметра фильтрации
+            param_value (str): значение параметра фильтрации
+        Returns:
+            [int] or None: позиции подходящих вакансий по возрастанию, None - если по параметру нет индекса
+        """
+        if param_name == 'Опыт работы':
+            return self.hash_indexes[param_name].get(WORK_EXPERIENCE_BACK[param_value], [])
+        if param_name == 'Премиум-вакансия':
+            return self.hash_indexes[param_name].get(BOOL_TRANSLATE_BACK[param_value].lower(), [])
+        if param_name == 'Идентификатор валюты оклада':
+            return self.hash_indexes[param_name].get(CURRENCY_BACK[param_value], [])
+        if param_name in self.hash_indexes:
+            return self.hash_indexes[param_name].get(param_value, [])
+        if param_name == 'Оклад' and self.salary_index is not None:
+            return sorted(self.salary_index.find(int(param_value)))
+        if param_name == 'Навыки':
+            skill_sets = sorted((self.skills_index.get(skill, set()) for skill in param_value.split(', ')), key=len)
+            return sorted(skill_sets[0].intersection(*skill_sets[1:]))
+        return None
+
+    def count(self, param_name, param_value):
+        """Оценивает кол-во вакансий, подходящих под фильтр, по размерам списков в индексах, не собирая позиции
+        (см. find)
+        Args:
+            param_name (str): название параметра фильтрации
+            param_value (str): значение параметра фильтрации
+        Returns:
+            int or None: кол-во вакансий (для навыков - оценка сверху), None - если по параметру нет индекса
+        """
+        if param_name == 'Опыт работы':
+            return len(self.hash_indexes[param_name].get(WORK_EXPERIENCE_BACK[param_value], []))
+        if param_name == 'Премиум-вакансия':
+            return len(self.hash_indexes[param_name].get(BOOL_TRANSLATE_BACK[param_value].lower(), []))
+        if param_name == 'Идентификатор валюты оклада':
+            return len(self.hash_indexes[param_name].get(CURRENCY_BACK[param_value], []))
+        if param_name in self.hash_indexes:
+            return len(self.hash_indexes[param_name].get(param_value, []))
+        if param_name == 'Оклад' and self.salary_index is not None:
+            return self.count_salary_range(int(param_value), int(param_value))
+        if param_name == 'Навыки':
+            return min(len(self.skills_index.get(skill, ())) for skill in param_value.split(', '))
+        return None
+
+    def count_salary_range(self, low, high):
+        """Оценивает сверху кол-во вакансий, интервал зп которых пересекается с [low, high] (см. find_salary_range):
+        меньшее из кол-ва интервалов, которые начинаются не позже high, и интервалов, которые кончаются не раньше low
+        Args:
+            low (int or None): нижняя граница (None - без ограничения)
+            high (int or None): верхняя граница (None - без ограничения)
+        Returns:
+            int or None: оценка кол-ва вакансий, None - если зп не разбиралась
+        """
+        if self.salary_index is None:
+            return None
+        count = len(self.salary_starts)
+        if high is not None:
+            count = bisect.bisect_right(self.salary_starts, (high, len(self.salary_starts)))
+        if low is not None:
+            count = min(count, len(self.salary_ends) - bisect.bisect_left(self.salary_ends, (low, -1)))
+        return count
+
+    def count_date_range(self, low, high):
+        """Считает кол-во вакансий, опубликованных в промежутке дат (см. find_date_range)
+        Args:
+            low (int or None): первая дата вида 20220705 (None - без ограничения)
+            high (int or None): последняя дата вида 20220705 (None - без ограничения)
+        Returns:
+            int: кол-во вакансий
+        """
+        start = 0 if low is None else bisect.bisect_left(self.dates, (low, -1))
+        end = len(self.dates) if high is None else bisect.bisect_right(self.dates, (high, len(self.dates)))
+        return max(end - start, 0)
+
+    def count_text(self, param_name, value, is_prefix):
+        """Считает кол-во вакансий по началу или подстроке текстового поля (см. find_text), не собирая позиции
+        Args:
+            param_name (str): название параметра ('Название', 'Компания', 'Название региона')
+            value (str): начало или подстрока
+            is_prefix (bool): искать по началу строки (иначе - по подстроке)
+        Returns:
+            int: кол-во вакансий
+        """
+        return sum(len(key_positions) for key, key_positions in self.hash_indexes[param_name].items()
+                   if key is not None and (key.startswith(value) if is_prefix else value in key))
+
+    def find_salary_range(self, low, high):
+        """Ищет вакансии, интервал зп которых пересекается с [low, high]
+        Args:
+            low (int or None): нижняя граница (None - без ограничения)
+            high (int or None): верхняя граница (None - без ограничения)
+        Returns:
+            [int] or None: позиции вакансий по возрастанию, None - если зп не разбиралась
+        """
+        if self.salary_index is None:
+            return None
+        if low is None and high is None:
+            return sorted(position for _, position in self.salary_starts)
+        if low is None:
+            end = bisect.bisect_right(self.salary_starts, (high, len(self.salary_starts)))
+            return sorted(position for _, position in self.salary_starts[:end])
+        if high is None:
+            start = bisect.bisect_left(self.salary_ends, (low, -1))
+            return sorted(position for _, position in self.salary_ends[start:])
+        positions = self.salary_index.find(low)
+        start = bisect.bisect_right(self.salary_starts, (low, len(self.salary_starts)))
+        end = bisect.bisect_right(self.salary_starts, (high, len(self.salary_starts)))
+        positions.extend(position for _, position in self.salary_starts[start:end])
+        return sorted(positions)
+
+    def find_date_range(self, low, high):
+        """Ищет вакансии, опубликованные в промежутке дат
+        Args:
+            low (int or None): первая дата вида 20220705 (None - без ограничения)
+            high (int or None): последняя дата вида 20220705 (None - без ограничения)
+        Returns:
+            [int]: позиции вакансий по возрастанию
+        """
+        start = 0 if low is None else bisect.bisect_left(self.dates, (low, -1))
+        end = len(self.dates) if high is None else bisect.bisect_right(self.dates, (high, len(self.dates)))
+        return sorted(position for _, position in self.dates[start:end])
+
+    def find_text(self, param_name, value, is_prefix):
+        """Ищет вакансии по началу или подстроке текстового поля, просматривая только различные значения поля
+        Args:
+            param_name (str): название параметра ('Название', 'Компания', 'Название региона')
+            value (str): начало или подстрока
+            is_prefix (bool): искать по началу строки (иначе - по подстроке)
+        Returns:
+            [int]: позиции вакансий по возрастанию
+        """
+        positions = []
+        for key, key_positions in self.hash_indexes[param_name].items():
+            if key is not None and (key.startswith(value) if is_prefix else value in key):
+                positions.extend(key_positions)
+        return sorted(positions)
+
+
+class QueryCondition(object):
+    """Класс для одного условия запроса
+    Attributes:
+        param_name (str): название параметра
+        kind (str): вид условия: 'equal' - равенство (как в DataSetForTable.filter), 'prefix' - начало строки
+                    (значение начинается с '^'), 'substring' - подстрока (значение начинается с '~'), 'range' -
+                    промежуток для окладов и дат (значение вида 'от..до', любую границу можно опустить)
+        value (str): значение параметра
+        low (int or None): нижняя граница промежутка
+        high (int or None): верхняя граница промежутка
+    """
+
+    def __init__(self, condition):
+        """инициализирует объект типа QueryCondition
+        Args:
+            condition (str): условие вида 'Параметр: значение'
+        """
+        index = condition.index(':')
+        self.param_name = condition[:index]
+        self.value = condition[index + 2:]
+        self.kind = 'equal'
+        self.low = None
+        self.high = None
+        if self.param_name in TEXT_ATTRIBUTES and self.value[:1] in ('^', '~'):
+            self.kind = 'prefix' if self.value[0] == '^' else 'substring'
+            self.value = self.value[1:]
+        elif self.param_name == 'Оклад':
+            self.kind = 'range'
+            low, high = self.value.split('..') if '..' in self.value else (self.value, self.value)
+            self.low = int(low) if low != '' else None
+            self.high = int(high) if high != '' else None
+        elif self.param_name == 'Дата публикации вакансии':
+            self.kind = 'range'
+            low, high = self.value.split('..') if '..' in self.value else (self.value, self.value)
+            self.low = int(low[6:10] + low[3:5] + low[:2]) if low != '' else None
+            self.high = int(high[6:10] + high[3:5] + high[:2]) if high != '' else None
+
+    def matches(self, vacancy):
+        """Проверяет, подходит ли вакансия под условие
+        Args:
+            vacancy (VacancyForTable): вакансия с непереведёнными значениями
+        Returns:
+            bool: подходит ли вакансия
+        """
+        if self.param_name in TEXT_ATTRIBUTES:
+            text = getattr(vacancy, TEXT_ATTRIBUTES[self.param_name])
+            if self.kind == 'prefix':
+                return text.startswith(self.value)
+            if self.kind == 'substring':
+                return self.value in text
+            return text == self.value
+        if self.param_name == 'Опыт работы':
+            return vacancy.experience_id == WORK_EXPERIENCE_BACK[self.value]
+        if self.param_name == 'Премиум-вакансия':
+            return vacancy.premium.lower() == BOOL_TRANSLATE_BACK[self.value].lower()
+        if self.param_name == 'Идентификатор валюты оклада':
+            return vacancy.salary.salary_currency == CURRENCY_BACK[self.value]
+        if self.param_name == 'Оклад':
+            return (vacancy.salary.salary_from_number <= vacancy.salary.salary_to_number and
+                    (self.low is None or self.low <= vacancy.salary.salary_to_number) and
+                    (self.high is None or vacancy.salary.salary_from_number <= self.high))
+        if self.param_name == 'Дата публикации вакансии':
+            date = get_date_key(vacancy.published_at)
+            return (self.low is None or self.low <= date) and (self.high is None or date <= self.high)
+        if self.param_name == 'Навыки':
+            return all(skill in vacancy.key_skills for skill in self.value.split(', '))
+        return False
+
+    def estimate(self, index):
+        """Оценивает по индексам, сколько вакансий подходит под условие, не собирая их позиции (см. find)
+        Args:
+            index (VacancyIndex): индексы датасета
+        Returns:
+            int or None: оценка кол-ва вакансий, None - если условие нельзя проверить по индексам
+        """
+        if self.kind in ('prefix', 'substring') and self.param_name in index.hash_indexes:
+            return index.count_text(self.param_name, self.value, self.kind == 'prefix')
+        if self.param_name == 'Оклад':
+            return index.count_salary_range(self.low, self.high)
+        if self.param_name == 'Дата публикации вакансии':
+            return index.count_date_range(self.low, self.high)
+        if self.kind == 'equal':
+            return index.count(self.param_name, self.value)
+        return None
+
+    def find(self, index):
+        """Ищет подходящие вакансии по индексам
+        Args:
+            index (VacancyIndex): индексы датасета
+        Returns:
+            [int] or None: позиции вакансий по возрастанию, None - если условие нельзя проверить по индексам
+        """
+        if self.kind in ('prefix', 'substring') and self.param_name in index.hash_indexes:
+            return index.find_text(self.param_name, self.value, self.kind == 'prefix')
+        if self.param_name == 'Оклад':
+            return index.find_salary_range(self.low, self.high)
+        if self.param_name == 'Дата публикации вакансии':
+            return index.find_date_range(self.low, self.high)
+        if self.kind == 'equal':
+            return index.find(self.param_name, self.value)
+        return None
+
+
+class Query(object):
+    """Класс для запроса из нескольких условий: группы условий, соединённых И, объединены через ИЛИ
+    Attributes:
+        groups ([[QueryCondition]]): группы условий
+    """
+
+    def __init__(self, filter_param):
+        """инициализирует объект типа Query
+        Args:
+            filter_param (str): строка запроса (см. split_query)
+        """
+        self.groups = [[QueryCondition(condition) for condition in group] for group in split_query(filter_param)]
+
+    def execute(self, vacancies, index=None):
+        """Выполняет запрос. В каждой группе сначала выбирается самое избирательное условие (то, под которое
+        по оценке из индексов подходит меньше всего вакансий: размер списка в хэш-индексе, ширина промежутка в
+        отсортированных границах), по индексам собираются позиции только для него, остальные условия проверяются
+        только для найденных вакансий и только пока все выполняются.
+        Args:
+            vacancies ([VacancyForTable]): вакансии
+            index (VacancyIndex or None): индексы, построенные по этому же списку вакансий
+        Returns:
+            [VacancyForTable]: подходящие вакансии в исходном порядке
+        """
+        return [vacancies[i] for i in self.find(vacancies, index)]
+
+    def find(self, vacancies, index=None):
+        """Выполняет запрос и возвращает позиции подходящих вакансий (см. execute)
+        Args:
+            vacancies ([VacancyForTable]): вакансии
+            index (VacancyIndex or None): индексы, построенные по этому же списку вакансий
+        Returns:
+            [int]: позиции подходящих вакансий по возрастанию
+        """
+        if len(self.groups) == 1:
+            return list(self.find_group(self.groups[0], vacancies, index))
+        positions = set()
+        for group in self.groups:
+            positions.update(self.find_group(group, vacancies, index))
+        return sorted(positions)
+
+    def find_group(self, group, vacancies, index):
+        """Ищет вакансии, подходящие под все условия группы
+        Args:
+            group ([QueryCondition]): условия группы
+            vacancies ([VacancyForTable]): вакансии
+            index (VacancyIndex or None): индексы
+        Yields:
+            int: позиции подходящих вакансий по возрастанию
+        """
+        candidates = range(len(vacancies))
+        rest = sorted(group, key=lambda condition: CONDITION_RANK.get(condition.param_name, 0))
+        if index is not None:
+            estimates = [(condition.estimate(index), condition) for condition in group]
+            estimates = [(count, condition) for count, condition in estimates if count is not None]
+            if estimates:
+                best = min(estimates, key=lambda item: item[0])[1]
+                candidates = best.find(index)
+                rest = [condition for condition in rest if condition is not best]
+        for i in candidates:
+            vacancy = vacancies[i]
+            if all(condition.matches(vacancy) for condition in rest):
+                yield i
+
+
+class SalaryIntervalIndex(object):
+    """Класс для индекса интервалов зп (центрированное дерево интервалов): поиск вакансий, у которых
+    нижняя граница <= оклад <= верхняя граница, за O(log n + кол-во найденных)
+    Attributes:
+        center (int): центр узла
+        by_start ([(int, int, int)]): интервалы, содержащие центр, по возрастанию нижней границы
+        by_end ([(int, int, int)]): интервалы, содержащие центр, по убыванию верхней границы
+        left (SalaryIntervalIndex or None): интервалы левее центра
+        right (SalaryIntervalIndex or None): интервалы правее центра
+    """
+
+    def __init__(self, intervals):
+        """инициализирует объект типа SalaryIntervalIndex
+        Args:
+            intervals ([(int, int, int)]): непустой список интервалов (нижняя граница, верхняя граница, позиция),
+                                           нижняя граница не больше верхней
+        """
+        starts = sorted(interval[0] for interval in intervals)
+        self.center = starts[len(starts) // 2]
+        left = []
+        right = []
+        overlap = []
+        for interval in intervals:
+            if interval[1] < self.center:
+                left.append(interval)
+            elif interval[0] > self.center:
+                right.append(interval)
+            else:
+                overlap.append(interval)
+        self.by_start = sorted(overlap, key=lambda interval: interval[0])
+        self.by_end = sorted(overlap, key=lambda interval: interval[1], reverse=True)
+        self.left = SalaryIntervalIndex(left) if left else None
+        self.right = SalaryIntervalIndex(right) if right else None
+
+    def find(self, salary):
+        """Ищет интервалы, содержащие оклад
+        Args:
+            salary (int): оклад
+        Returns:
+            [int]: позиции вакансий (в произвольном порядке)
+        """
+        positions = []
+        node = self
+        while node is not None:
+            if salary < node.center:
+                for interval in node.by_start:
+                    if interval[0] > salary:
+                        break
+                    positions.append(interval[2])
+                node = node.left
+            elif salary > node.center:
+                for interval in node.by_end:
+                    if interval[1] < salary:
+                        break
+                    positions.append(interval[2])
+                node = node.right
+            else:
+                positions.extend(interval[2] for interval in node.by_start)
+                node = None
+        return positions
+
+
 class DataSet(object):
     """Класс для представления датасета
     Attributes:
@@ -393,8 +1712,8 @@ class DataSet(object):
         vacancies_objects ([Vacancy]): список вакансий
         years_list ([Year]): список годов
         cities_list ([City]): список городов
-        cities_sort_by_salary ([City]): список городов, сортированных по зп по убыванию
-        cities_sort_by_part ([City]): список городов, сортированных по кол-ву вакансий по убыванию
+        cities_sort_by_salary ([City]): TOP_CITIES_COUNT городов с самой высокой зп, по убыванию
+        cities_sort_by_part ([City]): TOP_CITIES_COUNT городов с самой большой долей вакансий, по убыванию
     """
     def __init__(self, file_name, vac_name):
         """инициализирует объект датасет
@@ -413,18 +1732,20 @@ class DataSet(object):
 
         self.years_list, self.cities_list = self.collect_years(vac_name)
         for year in self.years_list:
+            year.count = len(year.vacancies)
+            year.param_count = len(year.param_vacancies)
             year.salary_rating = calculate_salary_rating(year.vacancies)
             year.param_salary_rating = calculate_salary_rating(year.param_vacancies)
         count_vac = len(self.vacancies_objects)
         low_line = count_vac // 100
         for city in self.cities_list:
             count_vac_by_city = len(city.vacancies)
+            city.count = count_vac_by_city
             if count_vac_by_city > low_line:
                 city.part = count_vac_by_city / count_vac
                 city.medium_salary = calculate_salary_rating(city.vacancies)
 
-        self.cities_sort_by_salary = sorted(self.cities_list, key=lambda city: city.medium_salary, reverse=True)
-        self.cities_sort_by_part = sorted(self.cities_list, key=lambda city: city.part, reverse=True)
+        self.cities_sort_by_salary, self.cities_sort_by_part = get_top_cities(self.cities_list, TOP_CITIES_COUNT)
 
     def csv_parser(self, file_name):
         """Читает файл, записывает данные в список словарей
@@ -434,26 +1755,7 @@ class DataSet(object):
         Returns:
             [dict]: список словарей, где каждый словарь хранит в себе данные о вакансиях
         """
-        is_head = True
-        # coll_number = len(SHORT_HEAD)
-        list_vac_dict = []
-        with open(file_name, encoding='utf-8-sig') as file:
-            reader = csv.reader(file)
-            for row in reader:
-                row = list(filter(None, row))
-                if is_head:
-                    is_head = False
-                    head = row
-                elif len(head) == len(row):
-                    vacancy_dict = dict.fromkeys(head)
-                    for i in range(len(head)):
-                        key = head[i]
-                        value = " ".join(re.sub(re.compile('<.*?>'), '', row[i]).replace('\n', '###')
-                                         .replace('\r\n', '').split())
-                        vacancy_dict[key] = value
-                    list_vac_dict.append(vacancy_dict)
-
-        return list_vac_dict
+        return list(read_vacancies(file_name))
 
     def collect_years(self, vac_name):
         """Распределяет вакансии по годам и городам
@@ -461,23 +1763,28 @@ class DataSet(object):
         Args:
             vac_name: имя csv-файла с данными о вакансиях
         Returns:
-            [Year]: список годов
+            [Year]: список годов от первого до последнего года в данных
             [City]: список городов
         """
-        years_list = [Year(number) for number in range(2007, 2023)]
-        cities_list = []
-        city_names = []
+        years = {}
+        cities = {}
         for vacancy in self.vacancies_objects:
             vac_year = int(vacancy.published_at[:4])
-            years_list[vac_year - 2007].vacancies.append(vacancy)
+            year = years.get(vac_year)
+            if year is None:
+                year = years[vac_year] = Year(vac_year)
+            year.vacancies.append(vacancy)
             if vac_name in vacancy.name:
-                years_list[vac_year - 2007].param_vacancies.append(vacancy)
-            if vacancy.area_name not in city_names:
-                city_names.append(vacancy.area_name)
-                cities_list.append(City(vacancy.area_name))
-            cities_list[city_names.index(vacancy.area_name)].vacancies.append(vacancy)
+                year.param_vacancies.append(vacancy)
+            city = cities.get(vacancy.area_name)
+            if city is None:
+                city = cities[vacancy.area_name] = City(vacancy.area_name)
+            city.vacancies.append(vacancy)
 
-        return years_list, cities_list
+        years_list = []
+        if years:
+            years_list = [years.get(number) or Year(number) for number in range(min(years), max(years) + 1)]
+        return years_list, list(cities.values())
 
 
 class Vacancy(object):
@@ -490,6 +1797,8 @@ class Vacancy(object):
         area_name (str): название компании
         published_at (str): дата публикации
     """
+    __slots__ = ('name', 'salary_from', 'salary_to', 'salary_currency', 'area_name', 'published_at')
+
     def __init__(self, vac_dict):
         """Инициализирует объект типа Vacancy
 
@@ -510,6 +1819,10 @@ class Year(object):
         number (int): номер
         vacancies ([]): список вакансий
         param_vacancies ([]): список вакансий определённой профессии
+        count (int): кол-во вакансий
+        param_count (int): кол-во вакансий определённой профессии
+        salary_sum (int): сумма зп (для потокового подсчёта)
+        param_salary_sum (int): сумма зп для определённой профессии (для потокового подсчёта)
         salary_rating (int): средняя зп
         param_salary_rating (int): средняя зп для определённой профессии
     """
@@ -521,6 +1834,10 @@ class Year(object):
         self.number = number
         self.vacancies = []
         self.param_vacancies = []
+        self.count = 0
+        self.param_count = 0
+        self.salary_sum = 0
+        self.param_salary_sum = 0
         self.salary_rating = 0
         self.param_salary_rating = 0
 
@@ -531,6 +1848,8 @@ class City(object):
         name (str): название
         medium_salary (int): средняя зп по городу
         vacancies ([]): список вакансий
+        count (int): кол-во вакансий
+        salary_sum (int): сумма зп (для потокового подсчёта)
         part (float): доля вакансий этого города ко всем вакансиям
     """
 
@@ -542,306 +1861,2411 @@ class City(object):
         self.name = name
         self.medium_salary = 0
         self.vacancies = []
+        self.count = 0
+        self.salary_sum = 0
         self.part = 0
 
 
-class InputConect(object):
-    """класс для проверки корректности введённых данных
+class StatisticsAccumulator(object):
+    """класс для потокового подсчёта статистики: хранит только суммы и количества по периодам (годам, месяцам или
+    неделям) и городам, поэтому занимаемая память не зависит от размера файла. Суммы по периодам хранятся в
+    списках, где i-й элемент относится к периоду first_period + i; списки растут в обе стороны по мере того, как
+    встречаются более ранние и более поздние даты, поэтому диапазон периодов определяется самими данными
     Attributes:
-        is_empty (bool): если пустой файл
-        is_no_data (bool): если нет данных в файле
-        is_pos_filter (bool): если параметр фильтровки не пустой
-        filter_param (str): параметр фильтрации
-        is_pos_sort (bool): если параметр сортировки не пустой
-        sort_param (str): параметр сортировки
-        is_reverse_sort (bool): если обратная сортировка
-        reverse_sort (str): обратная сортировка(да/нет)
-        is_printable (bool): если можно печатать таблицу
+        vac_name (str): название профессии, для которой будет отдельная статистика
+        granularity (str): период статистики: 'year', 'month' или 'week' (см. get_period)
+        count_vac (int): общее кол-во вакансий
+        first_period (int): номер первого периода в списках сумм
+        counts ([int]): кол-во вакансий по периодам
+        salary_sums ([int or float]): сумма зп по периодам
+        param_counts ([int]): кол-во вакансий определённой профессии по периодам
+        param_salary_sums ([int or float]): сумма зп определённой профессии по периодам
+        years_list ([Year]): список периодов от первого до последнего (заполняется в finish)
+        cities_list ([City]): список городов в порядке появления в файле
+        city_indexes ({str: int}): индекс города в cities_list по его названию
+        cities_sort_by_salary ([City]): top_count городов с самой высокой зп, по убыванию (заполняется в finish)
+        cities_sort_by_part ([City]): top_count городов с самой большой долей вакансий, по убыванию
+                                      (заполняется в finish)
     """
 
-    def __init__(self, file_name, filter_param, sort_param, reverse_sort):
-        """инициализирует объект типа InputConnect
+    def __init__(self, vac_name, granularity='year'):
+        """инициализирует объект типа StatisticsAccumulator
         Args:
-            file_name (str): имя csv-файла
-            filter_param (str): параметр фильтрации
-            sort_param (str): параметр сортировки
-            reverse_sort (str): обратная сортировка(да/нет)
+            vac_name (str or None): название профессии, для которой будет отдельная статистика
+                                    (None - без отдельной статистики)
+            granularity (str): период статистики: 'year', 'month' или 'week'
         """
-        num_lines = sum(1 for line in open(file_name, encoding='utf-8-sig'))
-        self.is_empty = num_lines == 0
-        self.is_no_data = num_lines == 1
-        self.is_pos_filter = filter_param != ''
-        self.filter_param = filter_param
-        self.is_pos_sort = sort_param != ''
-        self.sort_param = sort_param
-        self.is_reverse_sort = reverse_sort == 'Да'
-        self.reverse_sort = reverse_sort
-        self.is_printable = self.chek_errors()
+        if granularity not in PERIOD_GRANULARITIES:
+            raise ValueError('Неизвестный период статистики: ' + str(granularity))
+        self.vac_name = vac_name
+        self.granularity = granularity
+        self.count_vac = 0
+        self.first_period = 0
+        self.counts = []
+        self.salary_sums = []
+        self.param_counts = []
+        self.param_salary_sums = []
+        self.years_list = []
+        self.cities_list = []
+        self.city_indexes = {}
+        self.cities_sort_by_salary = []
+        self.cities_sort_by_part = []
 
-    def chek_errors(self):
-        """ проверяет корректность входных данных
+    def get_period_index(self, period):
+        """Возвращает индекс периода в списках сумм, расширяя списки, если период раньше первого или позже последнего
+        Args:
+            period (int): номер периода (см. get_period)
         Returns:
-            bool: можно ли начинать обработку файла
+            int: индекс периода
         """
-        is_printable = True
-        if self.is_empty:
-            print('Пустой файл')
-            is_printable = False
-        if self.is_no_data:
-            print('Нет данных')
-            is_printable = False
-        if ': ' not in self.filter_param and self.filter_param != '':
-            print('Формат ввода некорректен')
-            is_printable = False
-        elif self.filter_param != '':
-            if self.filter_param[:self.filter_param.index(':')] not in RUS_HEAD:
-                print('Параметр поиска некорректен')
-                is_printable = False
+        if not self.counts:
+            self.first_period = period
+        index = period - self.first_period
+        if index < 0:
+            for values in (self.counts, self.salary_sums, self.param_counts, self.param_salary_sums):
+                values[:0] = [0] * -index
+            self.first_period = period
+            index = 0
+        elif index >= len(self.counts):
+            for values in (self.counts, self.salary_sums, self.param_counts, self.param_salary_sums):
+                values.extend([0] * (index + 1 - len(values)))
+        return index
 
-        if self.sort_param not in RUS_HEAD and self.sort_param != '':
-            is_printable = False
-            print('Параметр сортировки некорректен')
+    def add(self, vacancy, salary=None):
+        """Учитывает вакансию в суммах и количествах по периоду, профессии и городу
+        Args:
+            vacancy (Vacancy): вакансия
+            salary (int): средняя зп вакансии, если уже посчитана (см. calculate_salary)
+        """
+        if salary is None:
+            salary = calculate_salary(vacancy)
+        self.count_vac += 1
 
-        if self.reverse_sort != 'Да' and self.reverse_sort != 'Нет' and self.reverse_sort != '':
-            print('Порядок сортировки задан некорректно')
-            is_printable = False
+        if self.granularity == 'year':
+            period = int(vacancy.published_at[:4])
+        else:
+            period = get_period(vacancy.published_at, self.granularity)
+        index = period - self.first_period
+        if not 0 <= index < len(self.counts):
+            index = self.get_period_index(period)
+        self.counts[index] += 1
+        self.salary_sums[index] += salary
+        if self.vac_name is not None and self.vac_name in vacancy.name:
+            self.param_counts[index] += 1
+            self.param_salary_sums[index] += salary
 
-        return is_printable
+        index = self.city_indexes.get(vacancy.area_name)
+        if index is None:
+            index = self.add_city(vacancy.area_name)
+        city = self.cities_list[index]
+        city.count += 1
+        city.salary_sum += salary
 
+    def add_city(self, name, count=0, salary_sum=0):
+        """Добавляет город в конец cities_list или прибавляет суммы к уже добавленному
+        Args:
+            name (str): название города
+            count (int): кол-во вакансий
+            salary_sum (int or float): сумма зп
+        Returns:
+            int: индекс города в cities_list
+        """
+        index = self.city_indexes.get(name)
+        if index is None:
+            index = len(self.cities_list)
+            self.city_indexes[name] = index
+            self.cities_list.append(City(name))
+        city = self.cities_list[index]
+        city.count += count
+        city.salary_sum += salary_sum
+        return index
 
-class Report(object):
-    """класс для формирования отчётов
-    Attributes:
-        data_set (DataSet): датасет на основе котрого будут формироваться отчёты
-        salary_by_year ({int: int}): словарь с данными о средней зп за каждый год
-        count_salary_by_year ({int: int}): словарь с данными о кол-ве вакансий за каждый год
-        salary_by_year_by_vacancy ({int: int}): словарь с данными о средней зп за каждый год для определённой професии
-        count_salary_by_year_by_vacancy ({int: int}): словарь с данными о кол-ве вакансий за каждый год для
-                                                    определённой професии
-        salary_by_city ({str: int}): словарь с данными о средней зп о каждом городе (топ 10)
-        part_salary_by_city ({str: float}): словарь с данными о доле вакансий о каждом городе (топ 10)
-        procent_salary_by_city ([str]): список  с данными о доле вакансий о каждом городе (топ 10) в виде процентов
-        vac_name (str): название проффесии, для которой будет отдельная статистика
-    """
+    def to_dict(self):
+        """Возвращает суммы и количества в виде словаря для сохранения в json
+        Returns:
+            dict: состояние накопителя
+        """
+        return {'vac_name': self.vac_name, 'granularity': self.granularity, 'count_vac': self.count_vac,
+                'years': [[self.first_period + i, self.counts[i], self.salary_sums[i], self.param_counts[i],
+                           self.param_salary_sums[i]] for i in range(len(self.counts))],
+                'cities': [[city.name, city.count, city.salary_sum] for city in self.cities_list]}
 
-    def __init__(self, data_set, vac_name):
-        """инициализирует объект типа Report
+    @staticmethod
+    def from_dict(state):
+        """Восстанавливает накопитель из словаря, полученного методом to_dict
         Args:
-            data_set (DataSet): датасет на основе котрого будут формироваться отчёты
-            vac_name (str): название проффесии, для которой будет отдельная статистика
+            state (dict): состояние накопителя
+        Returns:
+            StatisticsAccumulator: накопитель
         """
-        self.data_set = data_set
-        self.salary_by_year = {year.number: int(clean_int_point(str(year.salary_rating))) for year in
-                               data_set.years_list if year.salary_rating != 0}
-        self.count_salary_by_year = {year.number: len(year.vacancies) for year in data_set.years_list if
-                                     len(year.vacancies) != 0}
-        self.salary_by_year_by_vacancy = {year.number: year.param_salary_rating for year in data_set.years_list if
-                                          year.param_salary_rating != 0}
-        self.count_salary_by_year_by_vacancy = {year.number: len(year.param_vacancies) for year in data_set.years_list
-                                                if len(year.param_vacancies) != 0}
-        self.salary_by_city = {city.name: int(clean_int_point(str(city.medium_salary))) for city in
-                               data_set.cities_sort_by_salary[:10] if city.medium_salary != 0}
-        self.part_salary_by_city = {city.name: round(city.part, 4) for city in data_set.cities_sort_by_part[:10] if
-                                    round(city.part, 4) != 0}
-        self.procent_salary_by_city = [str(int(n * 10000) / 100) + '%' for n in self.part_salary_by_city.values()]
-        self.vac_name = vac_name
+        statistics = StatisticsAccumulator(state['vac_name'], state.get('granularity', 'year'))
+        statistics.count_vac = state['count_vac']
+        for period, count, salary_sum, param_count, param_salary_sum in state['years']:
+            statistics.add_period(period, count, salary_sum, param_count, param_salary_sum)
+        for name, count, salary_sum in state['cities']:
+            statistics.add_city(name, count, salary_sum)
+        return statistics
 
-    def generate_excel(self):
-        """Генерирует xlsx-файл со статистикой
-        """
-        book = openpyxl.Workbook()
-        sheet1 = book.active
-        sheet1.title = 'Статистика по годам'
-        sheet1['A1'] = 'Год'
-        sheet1['B1'] = 'Средняя зарплата '
-        sheet1['C1'] = 'Средняя зарплата - ' + self.vac_name
-        sheet1['D1'] = 'Количество вакансий '
-        sheet1['E1'] = 'Количество вакансий - ' + self.vac_name
-        sheet1.column_dimensions['A'].width = 5
-        sheet1.column_dimensions['B'].width = len(sheet1['B1'].value)
-        sheet1.column_dimensions['C'].width = len(sheet1['C1'].value)
-        sheet1.column_dimensions['D'].width = len(sheet1['D1'].value)
-        sheet1.column_dimensions['E'].width = len(sheet1['E1'].value)
-
-        thin_side = Side(border_style='thin')
-        thin_borders = Border(top=thin_side, left=thin_side, right=thin_side, bottom=thin_side)
-
-        text_style = NamedStyle(name="text_style")
-        text_style.border = thin_borders
-
-        topic_style = NamedStyle(name="topic_style")
-        topic_style.font = Font(bold=True)
-        topic_style.border = thin_borders
-
-        sheet1['A1'].style = topic_style
-        sheet1['B1'].style = topic_style
-        sheet1['C1'].style = topic_style
-        sheet1['D1'].style = topic_style
-        sheet1['E1'].style = topic_style
-
-        years = list(YEARS_NULL_DICT.keys())
-        for i in range(2, 18):
-            sheet1['A' + str(i)] = years[i - 2]
-            sheet1['A' + str(i)].style = text_style
-
-        for i in range(2, 18):
-            sheet1['B' + str(i)] = self.salary_by_year[i - 2 + 2007]
-            sheet1['B' + str(i)].style = text_style
-
-        for i in range(2, 18):
-            sheet1['C' + str(i)] = self.salary_by_year_by_vacancy[i - 2 + 2007]
-            sheet1['C' + str(i)].style = text_style
-
-        for i in range(2, 18):
-            sheet1['D' + str(i)] = self.count_salary_by_year[i - 2 + 2007]
-            sheet1['D' + str(i)].style = text_style
-
-        for i in range(2, 18):
-            sheet1['E' + str(i)] = self.count_salary_by_year_by_vacancy[i - 2 + 2007]
-            sheet1['E' + str(i)].style = text_style
+    def add_period(self, period, count, salary_sum, param_count, param_salary_sum):
+        """Добавляет готовые суммы и количества к одному периоду
+        Args:
+            period (int): номер периода
+            count (int): кол-во вакансий
+            salary_sum (int or float): сумма зп
+            param_count (int): кол-во вакансий определённой профессии
+            param_salary_sum (int or float): сумма зп определённой профессии
+        """
+        index = self.get_period_index(period)
+        self.counts[index] += count
+        self.salary_sums[index] += salary_sum
+        self.param_counts[index] += param_count
+        self.param_salary_sums[index] += param_salary_sum
 
-        sheet2 = book.create_sheet('Статистика по городам')
-        sheet2['A1'] = 'Город '
-        sheet2['B1'] = 'Уровень зарплат '
-        sheet2['D1'] = 'Город '
-        sheet2['E1'] = 'Доля вакансий '
-        sheet2.column_dimensions['A'].width = max(max([len(n) for n in self.salary_by_city.keys()]) + 1, 7)
-        sheet2.column_dimensions['B'].width = len(sheet2['B1'].value)
-        sheet2.column_dimensions['C'].width = 2
-        sheet2.column_dimensions['D'].width = max(max([len(n) for n in self.part_salary_by_city.keys()]) + 1, 7)
-        sheet2.column_dimensions['E'].width = len(sheet2['E1'].value)
-        sheet2['A1'].style = topic_style
-        sheet2['B1'].style = topic_style
-        sheet2['D1'].style = topic_style
-        sheet2['E1'].style = topic_style
-
-        cities_salaries = list(self.salary_by_city.keys())
-        for i in range(2, 12):
-            sheet2['A' + str(i)] = cities_salaries[i - 2]
-            sheet2['A' + str(i)].style = text_style
-        for i in range(2, 12):
-            sheet2['B' + str(i)] = self.salary_by_city[cities_salaries[i - 2]]
-            sheet2['B' + str(i)].style = text_style
-
-        cities_part = list(self.part_salary_by_city.keys())
-        for i in range(2, 12):
-            sheet2['D' + str(i)] = cities_part[i - 2]
-            sheet2['D' + str(i)].style = text_style
-        for i in range(2, 12):
-            sheet2['E' + str(i)] = self.part_salary_by_city[cities_part[i - 2]]
-            sheet2['E' + str(i)].style = text_style
-            sheet2['E' + str(i)].number_format = '0.00%'
-
-        book.save("report.xlsx")
-
-    def generate_image(self):
-        """Генерирует png-файл со статистикой(диаграммы и графики)
+    def merge(self, other):
+        """Добавляет к накопленной статистике частичную статистику, посчитанную по следующему участку файла
+        Args:
+            other (StatisticsAccumulator): частичная статистика
         """
+        self.count_vac += other.count_vac
+        for i in range(len(other.counts)):
+            self.add_period(other.first_period + i, other.counts[i], other.salary_sums[i], other.param_counts[i],
+                            other.param_salary_sums[i])
+        for other_city in other.cities_list:
+            self.add_city(other_city.name, other_city.count, other_city.salary_sum)
 
-        yearsX = list(self.salary_by_year.keys())
-        years1 = [n - 0.2 for n in yearsX]
-        years2 = [n + 0.2 for n in yearsX]
+    def finish(self, top_count=TOP_CITIES_COUNT):
+        """Собирает периоды в years_list, считает средние зп и доли вакансий по накопленным суммам, выбирает лучшие
+        города
+        Args:
+            top_count (int): кол-во городов в cities_sort_by_salary и cities_sort_by_part
+        """
+        self.collect_periods()
+        low_line = self.count_vac // 100
+        for city in self.cities_list:
+            if city.count > low_line:
+                city.part = city.count / self.count_vac
+                city.medium_salary = city.salary_sum // city.count
 
-        fig, axes = plt.subplots(2, 2)
+        self.cities_sort_by_salary, self.cities_sort_by_part = get_top_cities(self.cities_list, top_count)
 
-        axes[0][0].set_title('Уровень зарплат по годам', {'fontsize': 8})
-        axes[0][0].set_xticks(yearsX)
-        axes[0][0].tick_params(axis='x', rotation=90, labelsize=8)
-        axes[0][0].tick_params(axis='y', labelsize=8)
-        axes[0][0].bar(years1, list(self.salary_by_year.values()), label='средняя з/п', width=0.4)
-        axes[0][0].bar(years2, list(self.salary_by_year_by_vacancy.values()),
-                       label='з/п ' + str(self.vac_name), width=0.4)
-        axes[0][0].grid(axis='y')
-        axes[0][0].legend(fontsize=8)
+    def group_cities(self, regions, level=1):
+        """Возвращает статистику, в которой города объединены в регионы: суммы и количества городов одного региона
+        складываются, доли и средние зп считаются уже по регионам. Города, которых нет в regions, остаются как есть
+        Args:
+            regions ({str: str}): родительский регион каждого города (и региона - для следующих уровней)
+            level (int): на сколько уровней подняться по иерархии регионов
+        Returns:
+            StatisticsAccumulator: статистика по регионам, готовая для Report
+        """
+        statistics = StatisticsAccumulator(self.vac_name, self.granularity)
+        statistics.count_vac = self.count_vac
+        statistics.first_period = self.first_period
+        statistics.counts = list(self.counts)
+        statistics.salary_sums = list(self.salary_sums)
+        statistics.param_counts = list(self.param_counts)
+        statistics.param_salary_sums = list(self.param_salary_sums)
+        for city in self.cities_list:
+            statistics.add_city(get_region(city.name, regions, level), city.count, city.salary_sum)
+        statistics.finish()
+        return statistics
 
-        axes[0][1].set_title('Количество вакансий по годам', {'fontsize': 8})
-        axes[0][1].set_xticks(yearsX)
-        axes[0][1].tick_params(axis='x', rotation=90, labelsize=8)
-        axes[0][1].tick_params(axis='y', labelsize=8)
-        axes[0][1].bar(years1, list(self.count_salary_by_year.values()), label='количество вакансий ', width=0.4)
-        axes[0][1].bar(years2, list(self.count_salary_by_year_by_vacancy.values()),
-                       label='количество вакансий ' + str(self.vac_name),
-                       width=0.4)
-        axes[0][1].grid(axis='y')
-        axes[0][1].legend(fontsize=8)
+    def collect_periods(self):
+        """Собирает years_list из списков сумм: по объекту Year на каждый период от первого до последнего, включая
+        периоды без вакансий
+        """
+        self.years_list = []
+        for i in range(len(self.counts)):
+            year = Year(get_period_label(self.first_period + i, self.granularity))
+            year.count = self.counts[i]
+            year.salary_sum = self.salary_sums[i]
+            year.param_count = self.param_counts[i]
+            year.param_salary_sum = self.param_salary_sums[i]
+            year.salary_rating = year.salary_sum // year.count if year.count != 0 else 0
+            year.param_salary_rating = year.param_salary_sum // year.param_count if year.param_count != 0 else 0
+            self.years_list.append(year)
 
-        axes[1][0].barh(range(10), list(reversed(list(self.salary_by_city.values()))),
-                        tick_label=list(reversed(list(self.salary_by_city.keys()))))
-        axes[1][0].grid(axis='x')
-        axes[1][0].set_title('Уровень зарплат по городам', {'fontsize': 6})
-        axes[1][0].tick_params(axis='both', labelsize=6)
 
-        self.part_salary_by_city.update({'Другие': 1 - sum(list(self.part_salary_by_city.values()))})
-        axes[1][1].pie(list(self.part_salary_by_city.values()), labels=list(self.part_salary_by_city.keys()),
-                       textprops={'fontsize': 6})
-        axes[1][1].set_title('Доля вакансий по городам', {'fontsize': 6})
+def get_top_cities(cities, top_count):
+    """ Выбирает города с самой высокой средней зп и с самой большой долей вакансий через кучу, без полной
+    сортировки всех городов. Порядок такой же, как у первых top_count элементов устойчивой сортировки по убыванию
 
-        fig.tight_layout()
-        plt.savefig('graph.png')
-
-    def generate_pdf(self, image_name):
-        """Генерирует pdf-файл со статистикой
-        Args:
-            image_name (str): имя png-файла с графиками 
-        """
-        env = Environment(loader=FileSystemLoader('.'))
-        template = env.get_template("template.html")
-
-        pdf_template = template.render({'vac_name': self.vac_name,
-                                        'image_file': image_name,
-                                        'years': list(YEARS_NULL_DICT.keys()),
-                                        'salary_by_year': self.salary_by_year,
-                                        'count_salary_by_year': self.count_salary_by_year,
-                                        'salary_by_year_by_vacancy': self.salary_by_year_by_vacancy,
-                                        'count_salary_by_year_by_vacancy': self.count_salary_by_year_by_vacancy,
-                                        'cities_salaries': list(self.salary_by_city.keys()),
-                                        'salary_by_city': self.salary_by_city,
-                                        'cities_part': list(self.part_salary_by_city.keys()),
-                                        'part_salary_by_city': self.procent_salary_by_city
-                                        })
-
-        config = pdfkit.configuration(wkhtmltopdf=r'C:\Program Files\wkhtmltopdf\bin\wkhtmltopdf.exe')
-        options = {'enable-local-file-access': None}
-        pdfkit.from_string(pdf_template, 'report.pdf', configuration=config, options=options)
-
-
-workMode = input('Вакансии или статистика?(укажите одно из двух): ')
-if workMode.lower() == 'вакансии':
-    file_name = 'vacancies (2).csv'  # input('Введите название файла: ')
-    filter_param = ''  # input('Введите параметр фильтрации: ')
-    sort_param = 'Оклад'  # input('Введите параметр сортировки: ')
-    reverse_sort = 'Да'  # input('Обратный порядок сортировки (Да / Нет): ')
-    lines_to_print = ''  # input('Введите диапазон вывода: ')
-    colomns = ''  # input('Введите требуемые столбцы: ')
+    Args:
+        cities ([City]): города с посчитанными medium_salary и part
+        top_count (int): кол-во городов
+    Returns:
+        [City]: города с самой высокой зп, по убыванию
+        [City]: города с самой большой долей вакансий, по убыванию
+    """
+    return (heapq.nlargest(top_count, cities, key=lambda city: city.medium_salary),
+            heapq.nlargest(top_count, cities, key=lambda city: city.part))
 
-    input_connect = InputConect(file_name, filter_param, sort_param, reverse_sort)
-    if input_connect.is_printable:
-        data_set = DataSetForTable(file_name)
-        if input_connect.is_pos_filter:
-            data_set.filter(input_connect.filter_param)
-        if not data_set.vacancies_objects:
-            print('Ничего не найдено')
-        else:
-            data_set.translate()
-            if input_connect.is_pos_sort:
-                data_set.sort(input_connect.sort_param, input_connect.is_reverse_sort)
-            data_set.print_table(lines_to_print, colomns)
-elif workMode.lower() == 'статистика':
-    file_name = 'vacancies_by_year.csv'  # input('Введите название файла: ')
-    vac_name = 'Программист'  # input('Введите название профессии: ')
-
-    data_set = DataSet(file_name, vac_name)
-    new_report = Report(data_set, vac_name)
-
-    print(new_report.salary_by_year)
-    print(new_report.salary_by_year_by_vacancy)
-    print(new_report.count_salary_by_year)
-    print(new_report.count_salary_by_year_by_vacancy)
-    print(new_report.salary_by_city)
-    print(new_report.part_salary_by_city)
-
-    new_report.generate_excel()
-    new_report.generate_image()
-    new_report.generate_pdf("graph.png")
-else:
-    console.log('Вы ввели что-то не то')
+
+def get_region(name, regions, level=1):
+    """ Поднимается по иерархии регионов от города на заданное кол-во уровней
+
+    Args:
+        name (str): название города
+        regions ({str: str}): родительский регион каждого города или региона
+        level (int): кол-во уровней
+    Returns:
+        str: название региона (или самого верхнего найденного уровня)
+
+    >>> get_region('Казань', {'Казань': 'Татарстан', 'Татарстан': 'Приволжский ФО'}, 2)
+    'Приволжский ФО'
+    >>> get_region('Сочи', {'Казань': 'Татарстан'})
+    'Сочи'
+    """
+    for _ in range(level):
+        parent = regions.get(name)
+        if parent is None:
+            break
+        name = parent
+    return name
+
+
+def read_regions(file_name):
+    """ Читает иерархию регионов из csv-файла со столбцами: название города или региона, родительский регион.
+    Первая строка - заголовок
+
+    Args:
+        file_name (str): имя csv-файла
+    Returns:
+        {str: str}: родительский регион каждого города или региона
+    """
+    with open(file_name, encoding='utf-8-sig', newline='') as file:
+        rows = csv.reader(file)
+        next(rows, None)
+        return {row[0]: row[1] for row in rows if len(row) >= 2 and row[0] and row[1]}
+
+
+def get_period(published_at, granularity):
+    """ Возвращает номер периода, к которому относится дата публикации. Номера соседних периодов отличаются на 1
+
+    Args:
+        published_at (str): дата вида '2022-07-05T18:19:30+0300'
+        granularity (str): 'year' - год (2022), 'month' - месяц (год * 12 + номер месяца - 1),
+                           'week' - неделя с понедельника (номер от 01.01.0001)
+    Returns:
+        int: номер периода
+
+    >>> get_period('2022-07-05T18:19:30+0300', 'year')
+    2022
+    >>> get_period('2022-07-05T18:19:30+0300', 'month')
+    24270
+    >>> get_period_label(get_period('2022-07-05T18:19:30+0300', 'week'), 'week')
+    '2022-07-04'
+    """
+    year = int(published_at[:4])
+    if granularity == 'year':
+        return year
+    month = int(published_at[5:7])
+    if granularity == 'month':
+        return year * 12 + month - 1
+    return (datetime.date(year, month, int(published_at[8:10])).toordinal() - 1) // 7
+
+
+def get_period_label(period, granularity):
+    """ Возвращает подпись периода для отчётов
+
+    Args:
+        period (int): номер периода (см. get_period)
+        granularity (str): 'year', 'month' или 'week'
+    Returns:
+        int or str: год (2022), месяц ('2022-07') или дата понедельника недели ('2022-07-04')
+
+    >>> get_period_label(24270, 'month')
+    '2022-07'
+    """
+    if granularity == 'year':
+        return period
+    if granularity == 'month':
+        return '{}-{:02d}'.format(period // 12, period % 12 + 1)
+    return datetime.date.fromordinal(period * 7 + 1).isoformat()
+
+
+class ProfessionsAccumulator(object):
+    """класс для потокового подсчёта статистики сразу для нескольких профессий: общая статистика по периодам
+    и городам считается один раз, для каждой профессии отдельно - только суммы и количества по периодам
+    Attributes:
+        vac_names ([str]): названия профессий
+        matcher (ProfessionMatcher): поиск названий профессий в названии вакансии
+        statistics (StatisticsAccumulator): общая статистика по периодам и городам
+        param_counts ([{int: int}]): кол-во вакансий каждой профессии по номерам периодов
+        param_salary_sums ([{int: int or float}]): сумма зп каждой профессии по номерам периодов
+    """
+
+    def __init__(self, vac_names, granularity='year'):
+        """инициализирует объект типа ProfessionsAccumulator
+        Args:
+            vac_names ([str]): названия профессий
+            granularity (str): период статистики: 'year', 'month' или 'week'
+        """
+        self.vac_names = vac_names
+        self.matcher = ProfessionMatcher(vac_names)
+        self.statistics = StatisticsAccumulator(None, granularity)
+        self.param_counts = [collections.Counter() for _ in vac_names]
+        self.param_salary_sums = [collections.Counter() for _ in vac_names]
+
+    def add(self, vacancy):
+        """Учитывает вакансию в общей статистике и в статистике всех профессий, название которых в ней встречается
+        Args:
+            vacancy (Vacancy): вакансия
+        """
+        salary = calculate_salary(vacancy)
+        self.statistics.add(vacancy, salary)
+        found = self.matcher.find(vacancy.name)
+        if found:
+            period = get_period(vacancy.published_at, self.statistics.granularity)
+            for k in found:
+                self.param_counts[k][period] += 1
+                self.param_salary_sums[k][period] += salary
+
+    def finish(self, top_count=TOP_CITIES_COUNT):
+        """Считает общую статистику по накопленным суммам
+        Args:
+            top_count (int): кол-во лучших городов (см. StatisticsAccumulator.finish)
+        """
+        self.statistics.finish(top_count)
+
+    def get_statistics(self, k):
+        """Собирает статистику для одной профессии (города общие для всех профессий)
+        Args:
+            k (int): номер профессии в vac_names
+        Returns:
+            StatisticsAccumulator: статистика, готовая для Report
+        """
+        common = self.statistics
+        statistics = StatisticsAccumulator(self.vac_names[k], common.granularity)
+        statistics.count_vac = common.count_vac
+        statistics.first_period = common.first_period
+        statistics.counts = common.counts
+        statistics.salary_sums = common.salary_sums
+        periods = range(common.first_period, common.first_period + len(common.counts))
+        statistics.param_counts = [self.param_counts[k][period] for period in periods]
+        statistics.param_salary_sums = [self.param_salary_sums[k][period] for period in periods]
+        statistics.collect_periods()
+        statistics.cities_list = common.cities_list
+        statistics.city_indexes = common.city_indexes
+        statistics.cities_sort_by_salary = common.cities_sort_by_salary
+        statistics.cities_sort_by_part = common.cities_sort_by_part
+        return statistics
+
+
+class ProfessionMatcher(object):
+    """класс для поиска сразу нескольких названий профессий в названии вакансии (автомат Ахо-Корасик).
+    Даёт тот же результат, что и проверка 'vac_name in name' для каждой профессии, но за один проход по строке.
+    Результаты запоминаются для каждого названия вакансии, так как названия часто повторяются.
+    Attributes:
+        goto ([{str: int}]): переходы автомата
+        fail ([int]): суффиксные ссылки
+        output ([frozenset]): номера профессий, которые заканчиваются в состоянии
+        always (frozenset): номера профессий с пустым названием (встречаются в любой строке)
+        found_by_name ({str: frozenset}): найденные профессии для уже встречавшихся названий вакансий
+    """
+
+    def __init__(self, vac_names):
+        """инициализирует объект типа ProfessionMatcher
+        Args:
+            vac_names ([str]): названия профессий
+        """
+        self.goto = [{}]
+        outputs = [set()]
+        self.always = frozenset(k for k in range(len(vac_names)) if vac_names[k] == '')
+        self.found_by_name = {}
+        for k in range(len(vac_names)):
+            state = 0
+            for char in vac_names[k]:
+                next_state = self.goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto.append({})
+                    outputs.append(set())
+                    self.goto[state][char] = next_state
+                state = next_state
+            if state != 0:
+                outputs[state].add(k)
+
+        self.fail = [0] * len(self.goto)
+        queue = collections.deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fail = self.fail[state]
+                while fail != 0 and char not in self.goto[fail]:
+                    fail = self.fail[fail]
+                if state != 0 and char in self.goto[fail]:
+                    self.fail[next_state] = self.goto[fail][char]
+                outputs[next_state] |= outputs[self.fail[next_state]]
+        self.output = [frozenset(output) for output in outputs]
+
+    def find(self, name):
+        """Ищет профессии, названия которых встречаются в названии вакансии
+        Args:
+            name (str): название вакансии
+        Returns:
+            frozenset: номера найденных профессий
+        """
+        found = self.found_by_name.get(name)
+        if found is not None:
+            return found
+        found = set(self.always)
+        state = 0
+        for char in name:
+            while state != 0 and char not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(char, 0)
+            if self.output[state]:
+                found |= self.output[state]
+        found = frozenset(found)
+        self.found_by_name[name] = found
+        return found
+
+
+class CurrencyConverter(object):
+    """класс для перевода зарплат в рубли. Хранит постоянные курсы (CURRENCY_TO_RUB) и, если загружены, курсы по
+    месяцам в виде матрицы (валюта, месяц) -> курс. Курс по месяцу берётся, если он известен, иначе - постоянный.
+    Рубли всегда переводятся с целым коэффициентом 1, чтобы суммы в рублях оставались целыми
+    Attributes:
+        rates ({str: float}): постоянные курсы валют
+        rate_array (np.ndarray): постоянные курсы в порядке CURRENCY_CODES (float64)
+        first_month (int): номер первого месяца матрицы (см. get_period)
+        monthly_rates (np.ndarray or None): курсы по месяцам, строки - валюты в порядке CURRENCY_CODES,
+                                            столбцы - месяцы начиная с first_month, NaN - курс неизвестен
+        fingerprint (str): хэш всех курсов (меняется при загрузке других курсов)
+    """
+
+    def __init__(self, rates):
+        """инициализирует объект типа CurrencyConverter
+        Args:
+            rates ({str: float}): постоянные курсы валют (все валюты из CURRENCY_CODES)
+        """
+        self.rates = rates
+        self.rate_array = np.array([rates[code] for code in CURRENCY_CODES], dtype=np.float64)
+        self.first_month = 0
+        self.monthly_rates = None
+        self.fingerprint = self.get_fingerprint()
+
+    def get_fingerprint(self):
+        """Считает хэш постоянных курсов и курсов по месяцам
+        Returns:
+            str: хэш
+        """
+        rates_hash = hashlib.blake2b(self.rate_array.tobytes())
+        if self.monthly_rates is not None:
+            rates_hash.update(str((self.first_month, self.monthly_rates.shape)).encode())
+            rates_hash.update(self.monthly_rates.tobytes())
+        return rates_hash.hexdigest()
+
+    def load_monthly_rates(self, file_name):
+        """Загружает курсы по месяцам из csv-файла. Первый столбец - дата вида '2022-07' (или '2022-07-01'),
+        остальные - курсы валют, названные кодами валют (например 'date,BYR,USD,EUR,KZT,UAH'). Пустая ячейка -
+        курс неизвестен. Валюты, которых нет в файле, и месяцы вне файла считаются по постоянному курсу.
+        Некорректная дата (например, месяц вне 1-12) - ошибка ValueError
+        Args:
+            file_name (str): имя csv-файла с курсами
+        """
+        with open(file_name, encoding='utf-8-sig', newline='') as file:
+            rows = csv.reader(file)
+            head = next(rows)
+            columns = [(k, CURRENCY_CODES.index(head[k])) for k in range(1, len(head)) if head[k] in CURRENCY_CODES]
+            monthly = {}
+            for row in rows:
+                if row and row[0]:
+                    month = int(row[0][5:7])
+                    if not 1 <= month <= 12:
+                        raise ValueError('Некорректный месяц в файле курсов: ' + row[0])
+                    monthly[int(row[0][:4]) * 12 + month - 1] = row
+        if not monthly:
+            self.monthly_rates = None
+        else:
+            self.first_month = min(monthly)
+            self.monthly_rates = np.full((len(CURRENCY_CODES), max(monthly) - self.first_month + 1), np.nan)
+            for month, row in monthly.items():
+                for k, code_index in columns:
+                    if k < len(row) and row[k]:
+                        self.monthly_rates[code_index, month - self.first_month] = float(row[k])
+            self.monthly_rates[CURRENCY_CODES.index('RUR')] = np.nan
+        self.fingerprint = self.get_fingerprint()
+
+    def get_rate(self, currency, published_at=None):
+        """Возвращает курс валюты (за месяц публикации, если курсы по месяцам загружены и курс известен)
+        Args:
+            currency (str): код валюты
+            published_at (str): дата вида '2022-07-05T18:19:30+0300'
+        Returns:
+            int or float: курс
+        """
+        if self.monthly_rates is not None and published_at is not None:
+            index = int(published_at[:4]) * 12 + int(published_at[5:7]) - 1 - self.first_month
+            if 0 <= index < self.monthly_rates.shape[1]:
+                rate = self.monthly_rates[CURRENCY_CODES.index(currency), index]
+                if not np.isnan(rate):
+                    return float(rate)
+        return self.rates[currency]
+
+    def convert(self, salary_from, salary_to, currency, published_at=None):
+        """Считает среднюю зп вакансии в рублях
+        Args:
+            salary_from (int): нижняя граница зп
+            salary_to (int): верхняя граница зп
+            currency (str): код валюты
+            published_at (str): дата публикации (для курсов по месяцам)
+        Returns:
+            int or float: средняя зп в рублях, округлённая вниз
+        """
+        return (salary_from + salary_to) * self.get_rate(currency, published_at) // 2
+
+    def convert_array(self, salary_from, salary_to, currency_codes, months=None):
+        """Считает средние зп многих вакансий в рублях одной операцией над массивами
+        Args:
+            salary_from (np.ndarray): нижняя граница зп
+            salary_to (np.ndarray): верхняя граница зп
+            currency_codes (np.ndarray): коды валют - индексы в CURRENCY_CODES
+            months (np.ndarray): номера месяцев публикации (см. get_period), нужны только для курсов по месяцам
+        Returns:
+            np.ndarray: средние зп (float64), округлённые так же, как в convert
+        """
+        return np.floor((salary_from + salary_to) * self.get_rate_array(currency_codes, months) / 2)
+
+    def get_rate_array(self, currency_codes, months=None):
+        """Возвращает курсы для массива валют (и месяцев)
+        Args:
+            currency_codes (np.ndarray): коды валют - индексы в CURRENCY_CODES
+            months (np.ndarray): номера месяцев
+        Returns:
+            np.ndarray: курсы (float64)
+        """
+        rates = self.rate_array[currency_codes]
+        if self.monthly_rates is None or months is None:
+            return rates
+        indexes = months - self.first_month
+        in_range = (indexes >= 0) & (indexes < self.monthly_rates.shape[1])
+        monthly = np.full(len(rates), np.nan)
+        monthly[in_range] = self.monthly_rates[currency_codes[in_range], indexes[in_range]]
+        return np.where(np.isnan(monthly), rates, monthly)
+
+
+CURRENCY_CONVERTER = CurrencyConverter(CURRENCY_TO_RUB)
+
+
+def set_currency_converter(converter):
+    """ Заменяет курсы валют, которыми пользуется модуль (например, в процессах пула - на курсы главного процесса)
+
+    Args:
+        converter (CurrencyConverter): курсы валют
+    """
+    global CURRENCY_CONVERTER
+    CURRENCY_CONVERTER = converter
+
+
+class VacancyColumns(object):
+    """класс для представления датасета в виде столбцов NumPy вместо отдельных объектов Vacancy: зарплаты хранятся
+    числами, повторяющиеся строки (названия, города, валюты, опыт) - целыми кодами с небольшими таблицами значений
+    Attributes:
+        names ([str]): таблица уникальных названий вакансий
+        name_codes (np.ndarray): коды названий (int32)
+        salary_from (np.ndarray): нижняя граница зп (float64)
+        salary_to (np.ndarray): верхняя граница зп (float64)
+        currency_codes (np.ndarray): коды валют (int8) - индексы в CURRENCY_CODES
+        areas ([str]): таблица городов в порядке появления в файле
+        area_codes (np.ndarray): коды городов (int32)
+        experience_codes (np.ndarray or None): коды опыта работы (int8) - индексы в EXPERIENCE_CODES,
+                                               None, если в файле нет такого столбца
+        published_at (np.ndarray): дата публикации (datetime64[s], местное время публикации)
+        years (np.ndarray): год публикации (int16)
+    """
+
+    def __init__(self, names, name_codes, salary_from, salary_to, currency_codes, areas, area_codes,
+                 experience_codes, published_at):
+        """инициализирует объект типа VacancyColumns
+        Args:
+            names ([str]): таблица уникальных названий вакансий
+            name_codes (np.ndarray): коды названий
+            salary_from (np.ndarray): нижняя граница зп
+            salary_to (np.ndarray): верхняя граница зп
+            currency_codes (np.ndarray): коды валют
+            areas ([str]): таблица городов
+            area_codes (np.ndarray): коды городов
+            experience_codes (np.ndarray or None): коды опыта работы
+            published_at (np.ndarray): дата публикации
+        """
+        self.names = names
+        self.name_codes = name_codes
+        self.salary_from = salary_from
+        self.salary_to = salary_to
+        self.currency_codes = currency_codes
+        self.areas = areas
+        self.area_codes = area_codes
+        self.experience_codes = experience_codes
+        self.published_at = published_at
+        self.years = (published_at.astype('datetime64[Y]').astype(np.int64) + 1970).astype(np.int16)
+
+    def __len__(self):
+        """Возвращает кол-во вакансий
+        Returns:
+            int: кол-во вакансий
+        """
+        return len(self.salary_from)
+
+    def get_salaries(self):
+        """Считает среднюю зп каждой вакансии в рублях одной операцией над массивами
+        Returns:
+            np.ndarray: средние зп (float64), округлённые так же, как в calculate_salary
+        """
+        months = self.get_periods('month') if CURRENCY_CONVERTER.monthly_rates is not None else None
+        return CURRENCY_CONVERTER.convert_array(self.salary_from, self.salary_to, self.currency_codes, months)
+
+    def get_periods(self, granularity):
+        """Возвращает номер периода (см. get_period) каждой вакансии
+        Args:
+            granularity (str): 'year', 'month' или 'week'
+        Returns:
+            np.ndarray: номера периодов (intp)
+        """
+        if granularity == 'year':
+            return self.years.astype(np.intp)
+        if granularity == 'month':
+            return self.published_at.astype('datetime64[M]').astype(np.intp) + 1970 * 12
+        days = self.published_at.astype('datetime64[D]').astype(np.intp)
+        return (days + datetime.date(1970, 1, 1).toordinal() - 1) // 7
+
+    def collect_statistics(self, vac_name, granularity='year'):
+        """Считает статистику по периодам и городам группировкой через np.bincount
+        Args:
+            vac_name (str): название профессии, для которой будет отдельная статистика
+            granularity (str): период статистики: 'year', 'month' или 'week'
+        Returns:
+            StatisticsAccumulator: статистика, готовая для Report (совпадает с collect_statistics)
+        """
+        statistics = StatisticsAccumulator(vac_name, granularity)
+        salaries = self.get_salaries()
+        not_rub = (self.currency_codes != CURRENCY_CODES.index('RUR')).astype(np.float64)
+        is_param = np.array([vac_name in name for name in self.names], dtype=bool)[self.name_codes]
+
+        periods = self.get_periods(granularity)
+        if len(periods):
+            statistics.first_period = int(periods.min())
+            period_indexes = periods - statistics.first_period
+            period_count = int(period_indexes.max()) + 1
+            counts = np.bincount(period_indexes, minlength=period_count)
+            sums = np.bincount(period_indexes, weights=salaries, minlength=period_count)
+            not_rub_counts = np.bincount(period_indexes, weights=not_rub, minlength=period_count)
+            param_counts = np.bincount(period_indexes[is_param], minlength=period_count)
+            param_sums = np.bincount(period_indexes[is_param], weights=salaries[is_param], minlength=period_count)
+            param_not_rub_counts = np.bincount(period_indexes[is_param], weights=not_rub[is_param],
+                                               minlength=period_count)
+            statistics.counts = [int(count) for count in counts]
+            statistics.salary_sums = [get_salary_sum(sums[i], not_rub_counts[i]) for i in range(period_count)]
+            statistics.param_counts = [int(count) for count in param_counts]
+            statistics.param_salary_sums = [get_salary_sum(param_sums[i], param_not_rub_counts[i])
+                                            for i in range(period_count)]
+
+        city_count = len(self.areas)
+        counts = np.bincount(self.area_codes, minlength=city_count)
+        sums = np.bincount(self.area_codes, weights=salaries, minlength=city_count)
+        not_rub_counts = np.bincount(self.area_codes, weights=not_rub, minlength=city_count)
+        for i, area_name in enumerate(self.areas):
+            city = City(area_name)
+            city.count = int(counts[i])
+            city.salary_sum = get_salary_sum(sums[i], not_rub_counts[i])
+            statistics.city_indexes[area_name] = i
+            statistics.cities_list.append(city)
+
+        statistics.count_vac = len(self)
+        statistics.finish()
+        return statistics
+
+
+def get_salary_sum(salary_sum, not_rub_count):
+    """ Приводит сумму зп, посчитанную в NumPy, к типу, который получился бы при подсчёте по одной вакансии:
+    целое число, если все вакансии в рублях, иначе дробное
+
+    Args:
+        salary_sum (np.float64): сумма зп
+        not_rub_count (np.float64): кол-во вакансий не в рублях
+    Returns:
+        int or float: сумма зп
+    """
+    if not_rub_count == 0:
+        return int(salary_sum)
+    return float(salary_sum)
+
+
+def read_vacancy_columns(file_name):
+    """ Читает csv-файл и собирает его в столбцы VacancyColumns, не создавая объектов для каждой вакансии
+
+    Args:
+        file_name (str): имя csv-файла с данными о вакансиях
+    Returns:
+        VacancyColumns: датасет в виде столбцов
+    """
+    names = {}
+    name_codes = array.array('i')
+    salary_from = array.array('d')
+    salary_to = array.array('d')
+    currency_codes = array.array('b')
+    areas = {}
+    area_codes = array.array('i')
+    experience_codes = array.array('b')
+    has_experience = True
+    dates = []
+    dates_batch = []
+
+    for vac_dict in read_vacancies_mapped(file_name, SHORT_HEAD + ['experience_id']):
+        name_codes.append(names.setdefault(vac_dict['name'], len(names)))
+        salary_from.append(float(vac_dict['salary_from']))
+        salary_to.append(float(vac_dict['salary_to']))
+        currency_codes.append(CURRENCY_CODES.index(vac_dict['salary_currency']))
+        area_codes.append(areas.setdefault(vac_dict['area_name'], len(areas)))
+        if has_experience and 'experience_id' in vac_dict:
+            experience_codes.append(EXPERIENCE_CODES.index(vac_dict['experience_id']))
+        else:
+            has_experience = False
+        dates_batch.append(vac_dict['published_at'][:19])
+        if len(dates_batch) == DATES_BATCH_SIZE:
+            dates.append(np.array(dates_batch, dtype='datetime64[s]'))
+            dates_batch = []
+    dates.append(np.array(dates_batch, dtype='datetime64[s]'))
+
+    return VacancyColumns(list(names), np.frombuffer(name_codes, dtype=np.int32),
+                          np.frombuffer(salary_from, dtype=np.float64), np.frombuffer(salary_to, dtype=np.float64),
+                          np.frombuffer(currency_codes, dtype=np.int8), list(areas),
+                          np.frombuffer(area_codes, dtype=np.int32),
+                          np.frombuffer(experience_codes, dtype=np.int8) if has_experience else None,
+                          np.concatenate(dates))
+
+
+def get_file_fingerprint(file_name):
+    """ Считает отпечаток файла: путь, размер, время изменения и хэш содержимого. Для скорости хэшируются
+    не все байты, а начало, середина и конец файла (по HASH_SAMPLE_SIZE байт) вместе с размером
+
+    Args:
+        file_name (str): имя файла
+    Returns:
+        dict: отпечаток файла
+    """
+    stat = os.stat(file_name)
+    content_hash = hashlib.blake2b(str(stat.st_size).encode())
+    with open(file_name, 'rb') as file:
+        for pos in (0, stat.st_size // 2, stat.st_size - HASH_SAMPLE_SIZE):
+            file.seek(max(pos, 0))
+            content_hash.update(file.read(HASH_SAMPLE_SIZE))
+    return {'path': os.path.abspath(file_name), 'size': stat.st_size, 'mtime': stat.st_mtime_ns,
+            'hash': content_hash.hexdigest()}
+
+
+def save_vacancy_columns(columns, cache_name, fingerprint):
+    """ Сохраняет датасет в виде столбцов в бинарный npz-файл вместе с отпечатком исходного csv-файла
+    и версией формата кэша (CACHE_FORMAT_VERSION)
+
+    Args:
+        columns (VacancyColumns): датасет в виде столбцов
+        cache_name (str): имя npz-файла
+        fingerprint (dict): отпечаток исходного csv-файла
+    """
+    has_experience = columns.experience_codes is not None
+    tmp_name = cache_name + '.tmp'
+    with open(tmp_name, 'wb') as file:
+        np.savez(file,
+                 fingerprint=np.array(json.dumps(dict(fingerprint, version=CACHE_FORMAT_VERSION))),
+                 names=np.array(columns.names, dtype=str),
+                 name_codes=columns.name_codes,
+                 salary_from=columns.salary_from,
+                 salary_to=columns.salary_to,
+                 currency_codes=columns.currency_codes,
+                 areas=np.array(columns.areas, dtype=str),
+                 area_codes=columns.area_codes,
+                 has_experience=np.array(has_experience),
+                 experience_codes=columns.experience_codes if has_experience else np.zeros(0, dtype=np.int8),
+                 published_at=columns.published_at)
+    os.replace(tmp_name, cache_name)
+
+
+def load_vacancy_columns(file_name):
+    """ Загружает датасет в виде столбцов из кэша рядом с csv-файлом. Если кэша нет, csv-файл изменился, кэш
+    записан в другой версии формата или его не удалось прочитать (обрезанный или испорченный файл), csv-файл
+    разбирается заново и кэш перезаписывается. Если кэш не удалось записать, столбцы просто не кэшируются
+
+    Args:
+        file_name (str): имя csv-файла с данными о вакансиях
+    Returns:
+        VacancyColumns: датасет в виде столбцов
+    """
+    cache_name = file_name + CACHE_SUFFIX
+    fingerprint = get_file_fingerprint(file_name)
+    if os.path.exists(cache_name):
+        try:
+            with np.load(cache_name) as cache:
+                if json.loads(str(cache['fingerprint'])) == dict(fingerprint, version=CACHE_FORMAT_VERSION):
+                    return VacancyColumns(cache['names'].tolist(), cache['name_codes'], cache['salary_from'],
+                                          cache['salary_to'], cache['currency_codes'], cache['areas'].tolist(),
+                                          cache['area_codes'],
+                                          cache['experience_codes'] if cache['has_experience'] else None,
+                                          cache['published_at'])
+        except (OSError, EOFError, ValueError, KeyError, zipfile.BadZipFile):
+            pass
+
+    columns = read_vacancy_columns(file_name)
+    try:
+        save_vacancy_columns(columns, cache_name, fingerprint)
+    except OSError:
+        with contextlib.suppress(OSError):
+            os.remove(cache_name + '.tmp')
+    return columns
+
+
+class InputConect(object):
+    """класс для проверки корректности введённых данных
+    Attributes:
+        is_empty (bool): если пустой файл
+        is_no_data (bool): если нет данных в файле
+        is_pos_filter (bool): если параметр фильтровки не пустой
+        filter_param (str): параметр фильтрации
+        is_pos_sort (bool): если параметр сортировки не пустой
+        sort_param (str): параметр сортировки
+        is_reverse_sort (bool): если обратная сортировка
+        reverse_sort (str): обратная сортировка(да/нет)
+        is_printable (bool): если можно печатать таблицу
+    """
+
+    def __init__(self, file_name, filter_param, sort_param, reverse_sort):
+        """инициализирует объект типа InputConnect
+        Args:
+            file_name (str): имя csv-файла
+            filter_param (str): параметр фильтрации
+            sort_param (str): параметр сортировки
+            reverse_sort (str): обратная сортировка(да/нет)
+        """
+        num_lines = count_lines(file_name)
+        self.is_empty = num_lines == 0
+        self.is_no_data = num_lines == 1
+        self.is_pos_filter = filter_param != ''
+        self.filter_param = filter_param
+        self.is_pos_sort = sort_param != ''
+        self.sort_param = sort_param
+        self.is_reverse_sort = reverse_sort == 'Да'
+        self.reverse_sort = reverse_sort
+        self.is_printable = self.chek_errors()
+
+    def chek_errors(self):
+        """ проверяет корректность входных данных
+        Returns:
+            bool: можно ли начинать обработку файла
+        """
+        errors = []
+        if self.is_empty:
+            errors.append('Пустой файл')
+        if self.is_no_data:
+            errors.append('Нет данных')
+        errors += get_query_errors(self.filter_param, self.sort_param, self.reverse_sort)
+        for error in errors:
+            print(error)
+        return not errors
+
+
+def get_query_errors(filter_param, sort_param, reverse_sort):
+    """ Проверяет параметры фильтрации и сортировки
+
+    Args:
+        filter_param (str): параметр фильтрации
+        sort_param (str): параметр сортировки
+        reverse_sort (str): обратная сортировка(Да/Нет)
+    Returns:
+        [str]: сообщения об ошибках (пустой список - ошибок нет)
+    """
+    errors = []
+    conditions = [condition for group in split_query(filter_param) for condition in group]
+    if filter_param == '':
+        pass
+    elif any(': ' not in condition for condition in conditions):
+        errors.append('Формат ввода некорректен')
+    elif any(condition[:condition.index(':')] not in RUS_HEAD for condition in conditions):
+        errors.append('Параметр поиска некорректен')
+    elif not all(is_condition_value_valid(condition[:condition.index(':')], condition[condition.index(':') + 2:])
+                 for condition in conditions):
+        errors.append('Значение параметра поиска некорректно')
+
+    if sort_param != '' and any(name not in RUS_HEAD for name in sort_param.split(', ')):
+        errors.append('Параметр сортировки некорректен')
+
+    if reverse_sort != 'Да' and reverse_sort != 'Нет' and reverse_sort != '':
+        errors.append('Порядок сортировки задан некорректно')
+    return errors
+
+
+def is_condition_value_valid(param_name, value):
+    """ Проверяет значение условия фильтрации (см. QueryCondition): оклад - число или промежуток 'от..до' из чисел,
+    дата - 'ДД.ММ.ГГГГ' или промежуток из таких дат, опыт работы, премиальность и валюта - одно из известных значений
+
+    Args:
+        param_name (str): название параметра
+        value (str): значение параметра
+    Returns:
+        bool: корректно ли значение
+
+    >>> is_condition_value_valid('Дата публикации вакансии', '5.7.2022')
+    False
+    >>> is_condition_value_valid('Оклад', '50000..')
+    True
+    >>> is_condition_value_valid('Оклад', '100²')
+    False
+    """
+    if param_name in ('Оклад', 'Дата публикации вакансии'):
+        bounds = value.split('..') if '..' in value else [value, value]
+        if len(bounds) != 2 or bounds == ['', ''] and '..' not in value:
+            return False
+        for bound in bounds:
+            if bound == '':
+                continue
+            if param_name == 'Оклад' and not bound.isdecimal():
+                return False
+            if param_name == 'Дата публикации вакансии':
+                if DATE_PATTERN.fullmatch(bound) is None:
+                    return False
+                try:
+                    datetime.datetime.strptime(bound, '%d.%m.%Y')
+                except ValueError:
+                    return False
+        return True
+    if param_name == 'Опыт работы':
+        return value in WORK_EXPERIENCE_BACK
+    if param_name == 'Премиум-вакансия':
+        return value in BOOL_TRANSLATE_BACK
+    if param_name == 'Идентификатор валюты оклада':
+        return value in CURRENCY_BACK
+    return True
+
+
+@functools.lru_cache(maxsize=None)
+def get_excel_styles():
+    """ Создаёт стили ячеек xlsx-отчёта, одни на процесс. openpyxl импортируется только здесь и в функциях,
+    формирующих xlsx-файлы, чтобы режимы без отчётов не тратили время на его загрузку
+
+    Returns:
+        Border: тонкая рамка ячейки
+        Font: шрифт заголовков
+    """
+    from openpyxl.styles import Border, Side, Font
+    side = Side(border_style='thin')
+    return Border(top=side, left=side, right=side, bottom=side), Font(bold=True)
+
+
+def make_excel_row(sheet, values, font=None):
+    """ Создаёт строку ячеек для листа книги write-only с общей рамкой (и шрифтом) из заранее созданных стилей.
+    Пустые значения (None) остаются ячейками без оформления.
+
+    Args:
+        sheet (WriteOnlyWorksheet): лист
+        values (list): значения ячеек
+        font (Font): шрифт (по умолчанию - обычный)
+    Returns:
+        [WriteOnlyCell or None]: строка для sheet.append
+    """
+    from openpyxl.cell import WriteOnlyCell
+    border = get_excel_styles()[0]
+    row = []
+    for value in values:
+        if value is None:
+            row.append(None)
+            continue
+        cell = WriteOnlyCell(sheet, value)
+        cell.border = border
+        if font is not None:
+            cell.font = font
+        row.append(cell)
+    return row
+
+
+def set_column_widths(sheet, widths):
+    """ Задаёт ширину столбцов листа, начиная со столбца A
+
+    Args:
+        sheet (Worksheet or WriteOnlyWorksheet): лист
+        widths ([int]): ширина каждого столбца
+    """
+    from openpyxl.utils import get_column_letter
+    for k in range(len(widths)):
+        sheet.column_dimensions[get_column_letter(k + 1)].width = widths[k]
+
+
+@functools.lru_cache(maxsize=None)
+def get_template_environment(template_dir=TEMPLATE_DIR):
+    """ Создаёт окружение Jinja для папки с шаблонами, одно на процесс. Скомпилированные шаблоны хранятся в памяти
+    окружения, а их байт-код - ещё и в файловом кэше (во временной папке), поэтому новые процессы тоже не
+    компилируют шаблоны заново.
+
+    Args:
+        template_dir (str): папка с шаблонами
+    Returns:
+        Environment: окружение Jinja
+    """
+    from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+    return Environment(loader=FileSystemLoader(template_dir), bytecode_cache=FileSystemBytecodeCache(),
+                       trim_blocks=True, lstrip_blocks=True)
+
+
+def get_report_template(template_dir=TEMPLATE_DIR, template_name='template.html'):
+    """ Возвращает скомпилированный html-шаблон отчёта из кэша окружения Jinja
+
+    Args:
+        template_dir (str): папка с шаблонами
+        template_name (str): имя файла шаблона
+    Returns:
+        Template: скомпилированный шаблон
+    """
+    return get_template_environment(template_dir).get_template(template_name)
+
+
+def get_wkhtmltopdf_path():
+    """ Ищет программу wkhtmltopdf: сначала в PATH, затем в папке установки по умолчанию в Windows
+
+    Returns:
+        str: путь к wkhtmltopdf
+    """
+    path = shutil.which('wkhtmltopdf')
+    if path is None and os.path.exists(WKHTMLTOPDF_WINDOWS_PATH):
+        path = WKHTMLTOPDF_WINDOWS_PATH
+    if path is None:
+        raise OSError('Не найдена программа wkhtmltopdf')
+    return path
+
+
+def add_pdf_table(fig, rect, head, rows):
+    """ Рисует таблицу с жирной строкой заголовков в заданной области страницы
+
+    Args:
+        fig (Figure): страница
+        rect ((float, float, float, float)): область страницы (left, bottom, width, height) в долях
+        head ([str]): заголовки столбцов
+        rows ([list]): строки таблицы
+    """
+    axes = fig.add_axes(rect)
+    axes.set_axis_off()
+    table = axes.table(cellText=[[str(value) for value in row] for row in rows], colLabels=head, loc='upper center',
+                       cellLoc='center')
+    table.auto_set_font_size(False)
+    table.set_fontsize(8)
+    for (row, _), cell in table.get_celld().items():
+        cell.set_edgecolor('grey')
+        if row == 0:
+            cell.set_height(cell.get_height() * 2)
+            cell.set_text_props(fontweight='bold')
+
+
+class Report(object):
+    """класс для формирования отчётов
+    Attributes:
+        data_set (DataSet or StatisticsAccumulator): датасет на основе котрого будут формироваться отчёты
+        years ([int or str]): все годы (или месяцы, недели) статистики по порядку, включая годы без вакансий
+        salary_by_year ({int: int}): словарь с данными о средней зп за каждый год
+        count_salary_by_year ({int: int}): словарь с данными о кол-ве вакансий за каждый год
+        salary_by_year_by_vacancy ({int: int}): словарь с данными о средней зп за каждый год для определённой професии
+        count_salary_by_year_by_vacancy ({int: int}): словарь с данными о кол-ве вакансий за каждый год для
+                                                    определённой професии
+        salary_by_city ({str: int}): словарь с данными о средней зп о каждом городе (топ 10)
+        part_salary_by_city ({str: float}): словарь с данными о доле вакансий о каждом городе (топ 10)
+        procent_salary_by_city ([str]): список  с данными о доле вакансий о каждом городе (топ 10) в виде процентов
+        vac_name (str): название проффесии, для которой будет отдельная статистика
+    """
+
+    def __init__(self, data_set, vac_name):
+        """инициализирует объект типа Report
+        Args:
+            data_set (DataSet or StatisticsAccumulator): датасет на основе котрого будут формироваться отчёты
+            vac_name (str): название проффесии, для которой будет отдельная статистика
+        """
+        self.data_set = data_set
+        self.years = [year.number for year in data_set.years_list]
+        self.salary_by_year = {year.number: int(clean_int_point(str(year.salary_rating))) for year in
+                               data_set.years_list if year.salary_rating != 0}
+        self.count_salary_by_year = {year.number: year.count for year in data_set.years_list if year.count != 0}
+        self.salary_by_year_by_vacancy = {year.number: year.param_salary_rating for year in data_set.years_list if
+                                          year.param_salary_rating != 0}
+        self.count_salary_by_year_by_vacancy = {year.number: year.param_count for year in data_set.years_list
+                                                if year.param_count != 0}
+        self.salary_by_city = {city.name: int(clean_int_point(str(city.medium_salary))) for city in
+                               data_set.cities_sort_by_salary[:TOP_CITIES_COUNT] if city.medium_salary != 0}
+        self.part_salary_by_city = {city.name: round(city.part, 4) for city in
+                                    data_set.cities_sort_by_part[:TOP_CITIES_COUNT] if round(city.part, 4) != 0}
+        self.procent_salary_by_city = [str(int(n * 10000) / 100) + '%' for n in self.part_salary_by_city.values()]
+        self.vac_name = vac_name
+
+    def generate_excel(self, file_name='report.xlsx', extra_sheets=None):
+        """Генерирует xlsx-файл со статистикой. Книга пишется построчно (write-only), поэтому дополнительные листы
+        могут быть сколь угодно длинными: строки не хранятся в памяти целиком.
+        Args:
+            file_name (str): имя xlsx-файла
+            extra_sheets ({str: ([str], iterable)}): дополнительные листы: название -> (заголовки столбцов, строки)
+        """
+        import openpyxl
+        topic_font = get_excel_styles()[1]
+        book = openpyxl.Workbook(write_only=True)
+
+        sheet1 = book.create_sheet('Статистика по годам')
+        head = ['Год', 'Средняя зарплата ', 'Средняя зарплата - ' + self.vac_name, 'Количество вакансий ',
+                'Количество вакансий - ' + self.vac_name]
+        set_column_widths(sheet1, [5] + [len(name) for name in head[1:]])
+        sheet1.append(make_excel_row(sheet1, head, topic_font))
+        for year in self.years:
+            sheet1.append(make_excel_row(sheet1, [year, self.salary_by_year.get(year, 0),
+                                                  self.salary_by_year_by_vacancy.get(year, 0),
+                                                  self.count_salary_by_year.get(year, 0),
+                                                  self.count_salary_by_year_by_vacancy.get(year, 0)]))
+
+        sheet2 = book.create_sheet('Статистика по городам')
+        set_column_widths(sheet2, [max(max([len(n) for n in self.salary_by_city.keys()], default=0) + 1, 7),
+                                   len('Уровень зарплат '), 2,
+                                   max(max([len(n) for n in self.part_salary_by_city.keys()], default=0) + 1, 7),
+                                   len('Доля вакансий ')])
+        sheet2.append(make_excel_row(sheet2, ['Город ', 'Уровень зарплат ', None, 'Город ', 'Доля вакансий '],
+                                     topic_font))
+        cities_salaries = list(self.salary_by_city.items())[:10]
+        cities_part = list(self.part_salary_by_city.items())[:10]
+        for k in range(max(len(cities_salaries), len(cities_part))):
+            row = list(cities_salaries[k]) if k < len(cities_salaries) else [None, None]
+            row += [None] + (list(cities_part[k]) if k < len(cities_part) else [None, None])
+            cells = make_excel_row(sheet2, row)
+            if cells[4] is not None:
+                cells[4].number_format = '0.00%'
+            sheet2.append(cells)
+
+        for title, (head, rows) in (extra_sheets or {}).items():
+            sheet = book.create_sheet(title)
+            set_column_widths(sheet, [max(len(name) + 1, 7) for name in head])
+            sheet.append(make_excel_row(sheet, head, topic_font))
+            for row in rows:
+                sheet.append(make_excel_row(sheet, row))
+
+        book.save(file_name)
+
+    def generate_image(self, file_name='graph.png'):
+        """Генерирует png-файл со статистикой(диаграммы и графики)
+        Args:
+            file_name (str): имя png-файла
+        """
+        from matplotlib.figure import Figure
+
+        yearsX = range(len(self.years))
+        step = max(1, len(self.years) // 20)
+        years1 = [n - 0.2 for n in yearsX]
+        years2 = [n + 0.2 for n in yearsX]
+
+        fig = Figure()
+        axes = fig.subplots(2, 2)
+
+        axes[0][0].set_title('Уровень зарплат по годам', {'fontsize': 8})
+        axes[0][0].set_xticks(yearsX[::step], self.years[::step])
+        axes[0][0].tick_params(axis='x', rotation=90, labelsize=8)
+        axes[0][0].tick_params(axis='y', labelsize=8)
+        axes[0][0].bar(years1, [self.salary_by_year.get(year, 0) for year in self.years], label='средняя з/п',
+                       width=0.4)
+        axes[0][0].bar(years2, [self.salary_by_year_by_vacancy.get(year, 0) for year in self.years],
+                       label='з/п ' + str(self.vac_name), width=0.4)
+        axes[0][0].grid(axis='y')
+        axes[0][0].legend(fontsize=8)
+
+        axes[0][1].set_title('Количество вакансий по годам', {'fontsize': 8})
+        axes[0][1].set_xticks(yearsX[::step], self.years[::step])
+        axes[0][1].tick_params(axis='x', rotation=90, labelsize=8)
+        axes[0][1].tick_params(axis='y', labelsize=8)
+        axes[0][1].bar(years1, [self.count_salary_by_year.get(year, 0) for year in self.years],
+                       label='количество вакансий ', width=0.4)
+        axes[0][1].bar(years2, [self.count_salary_by_year_by_vacancy.get(year, 0) for year in self.years],
+                       label='количество вакансий ' + str(self.vac_name),
+                       width=0.4)
+        axes[0][1].grid(axis='y')
+        axes[0][1].legend(fontsize=8)
+
+        axes[1][0].barh(range(len(self.salary_by_city)), list(reversed(list(self.salary_by_city.values()))),
+                        tick_label=list(reversed(list(self.salary_by_city.keys()))))
+        axes[1][0].grid(axis='x')
+        axes[1][0].set_title('Уровень зарплат по городам', {'fontsize': 6})
+        axes[1][0].tick_params(axis='both', labelsize=6)
+
+        part_salary_by_city = dict(self.part_salary_by_city)
+        part_salary_by_city.update({'Другие': 1 - sum(list(part_salary_by_city.values()))})
+        axes[1][1].pie(list(part_salary_by_city.values()), labels=list(part_salary_by_city.keys()),
+                       textprops={'fontsize': 6})
+        axes[1][1].set_title('Доля вакансий по городам', {'fontsize': 6})
+
+        fig.tight_layout()
+        fig.savefig(file_name)
+
+    def get_template_data(self, image_name):
+        """Возвращает данные отчёта для html-шаблона. Картинка передаётся абсолютной file://-ссылкой, чтобы её
+        находил и браузер, и wkhtmltopdf, где бы ни лежал html-файл.
+        Args:
+            image_name (str): имя png-файла с графиками
+        Returns:
+            dict: переменные шаблона
+        """
+        return {'vac_name': self.vac_name,
+                'image_file': pathlib.Path(image_name).resolve().as_uri(),
+                'years': self.years,
+                'salary_by_year': self.salary_by_year,
+                'count_salary_by_year': self.count_salary_by_year,
+                'salary_by_year_by_vacancy': self.salary_by_year_by_vacancy,
+                'count_salary_by_year_by_vacancy': self.count_salary_by_year_by_vacancy,
+                'cities_salaries': list(self.salary_by_city.keys()),
+                'salary_by_city': self.salary_by_city,
+                'cities_part': list(self.part_salary_by_city.keys()),
+                'part_salary_by_city': self.procent_salary_by_city
+                }
+
+    def generate_html(self, image_name, file_name='report.html'):
+        """Генерирует html-файл со статистикой по шаблону template.html
+        Args:
+            image_name (str): имя png-файла с графиками
+            file_name (str): имя html-файла
+        """
+        with open(file_name, 'w', encoding='utf-8') as file:
+            file.write(get_report_template().render(self.get_template_data(image_name)))
+
+    def get_pdf_tables(self, data):
+        """Составляет таблицы pdf-отчёта из тех же переменных, что получает html-шаблон, и в том же порядке строк
+        Args:
+            data (dict): переменные шаблона (см. get_template_data)
+        Returns:
+            [str]: заголовок таблицы по годам
+            [list]: строки таблицы по годам
+            [list]: строки таблицы уровня зарплат по городам
+            [list]: строки таблицы долей вакансий по городам
+        """
+        vac_name = data['vac_name']
+        head = ['Год', 'Средняя\nзарплата', 'Средняя зарплата -\n' + vac_name, 'Количество\nвакансий',
+                'Количество вакансий -\n' + vac_name]
+        rows = [[year, data['salary_by_year'].get(year, 0), data['salary_by_year_by_vacancy'].get(year, 0),
+                 data['count_salary_by_year'].get(year, 0), data['count_salary_by_year_by_vacancy'].get(year, 0)]
+                for year in data['years']]
+        salary_rows = [[city, data['salary_by_city'][city]] for city in data['cities_salaries']]
+        part_rows = [list(item) for item in zip(data['cities_part'], data['part_salary_by_city'])]
+        return head, rows, salary_rows, part_rows
+
+    def generate_pdf(self, image_name, file_name='report.pdf', use_wkhtmltopdf=False):
+        """Генерирует pdf-файл со статистикой. По умолчанию pdf рисуется средствами matplotlib в том же процессе,
+        без внешней программы: это не рендеринг template.html, а та же раскладка (заголовок, графики, таблица
+        по годам, таблицы по городам), нарисованная заново. Значения таблиц берутся из тех же переменных шаблона
+        (get_template_data, get_pdf_tables), поэтому совпадают с pdf из шаблона; оформление (шрифты, рамки)
+        задаётся здесь, и правки стилей в template.html на этот pdf не влияют.
+        Длинная таблица по периодам (например, помесячная) разбивается на отдельные страницы
+        по PDF_PAGE_TABLE_ROWS строк. С use_wkhtmltopdf файл, как раньше, получается из html-шаблона программой
+        wkhtmltopdf.
+        Args:
+            image_name (str): имя png-файла с графиками
+            file_name (str): имя pdf-файла
+            use_wkhtmltopdf (bool): использовать wkhtmltopdf
+        """
+        data = self.get_template_data(image_name)
+        if use_wkhtmltopdf:
+            import pdfkit
+            pdf_template = get_report_template().render(data)
+            config = pdfkit.configuration(wkhtmltopdf=get_wkhtmltopdf_path())
+            options = {'enable-local-file-access': None}
+            pdfkit.from_string(pdf_template, file_name, configuration=config, options=options)
+            return
+
+        from matplotlib.backends.backend_pdf import PdfPages
+        from matplotlib.figure import Figure
+        from matplotlib.image import imread
+        with PdfPages(file_name) as pdf:
+            fig = Figure(figsize=A4_SIZE)
+            fig.text(0.5, 0.95, 'Аналитика по зарплатам и городам\nдля профессии ' + data['vac_name'],
+                     ha='center', va='top', fontsize=16, fontweight='bold')
+            axes = fig.add_axes((0.05, 0.2, 0.9, 0.65))
+            axes.imshow(imread(image_name))
+            axes.set_axis_off()
+            pdf.savefig(fig)
+
+            head, rows, salary_rows, part_rows = self.get_pdf_tables(data)
+            fig = Figure(figsize=A4_SIZE)
+            if len(rows) <= PDF_SHORT_TABLE_ROWS:
+                fig.text(0.5, 0.96, 'Статистика по годам', ha='center', va='top', fontsize=14, fontweight='bold')
+                add_pdf_table(fig, (0.05, 0.5, 0.9, 0.43), head, rows)
+            else:
+                for start in range(0, len(rows), PDF_PAGE_TABLE_ROWS):
+                    fig.text(0.5, 0.96, 'Статистика по годам', ha='center', va='top', fontsize=14,
+                             fontweight='bold')
+                    add_pdf_table(fig, (0.05, 0.05, 0.9, 0.88), head, rows[start:start + PDF_PAGE_TABLE_ROWS])
+                    pdf.savefig(fig)
+                    fig = Figure(figsize=A4_SIZE)
+            city_top = 0.44 if len(rows) <= PDF_SHORT_TABLE_ROWS else 0.96
+            fig.text(0.5, city_top, 'Статистика по городам', ha='center', va='top', fontsize=14, fontweight='bold')
+            add_pdf_table(fig, (0.05, city_top - 0.34, 0.43, 0.31), ['Город', 'Уровень зарплат'], salary_rows)
+            add_pdf_table(fig, (0.52, city_top - 0.34, 0.43, 0.31), ['Город', 'Доля вакансий'], part_rows)
+            pdf.savefig(fig)
+
+
+def run_report_stage(report, stage, file_name, image_name=None):
+    """ Формирует один файл отчёта и возвращает время, затраченное на это. Функция на уровне модуля, чтобы её можно
+    было передать в пул процессов.
+
+    Args:
+        report (Report): отчёт
+        stage (str): тип файла: 'xlsx', 'png' или 'pdf'
+        file_name (str): имя файла
+        image_name (str): имя png-файла с графиками (только для pdf)
+    Returns:
+        float: время формирования файла в секундах
+    """
+    start = time.perf_counter()
+    with PROFILER.stage(stage):
+        if stage == 'xlsx':
+            report.generate_excel(file_name)
+        elif stage == 'png':
+            report.generate_image(file_name)
+        else:
+            report.generate_pdf(image_name, file_name)
+    return time.perf_counter() - start
+
+
+class ReportPipeline(object):
+    """Класс для параллельного формирования файлов отчётов. xlsx-файл и png-файл формируются одновременно, pdf-файл -
+    как только готов png-файл, который в него вставляется.
+
+    Attributes:
+        output_dir (str): папка для отчётов
+        workers (int): кол-во потоков или процессов
+        use_processes (bool): использовать пул процессов вместо пула потоков
+        timings ({str: {str: float}}): время формирования каждого файла последнего запуска в секундах, по отчётам
+    """
+
+    def __init__(self, output_dir='.', workers=3, use_processes=False):
+        """Инициализирует объект ReportPipeline
+
+        Args:
+            output_dir (str): папка для отчётов
+            workers (int): кол-во потоков или процессов
+            use_processes (bool): использовать пул процессов вместо пула потоков
+        """
+        self.output_dir = output_dir
+        self.workers = workers
+        self.use_processes = use_processes
+        self.timings = {}
+
+    def run(self, report, file_names=None):
+        """Формирует xlsx, png и pdf файлы одного отчёта
+
+        Args:
+            report (Report): отчёт
+            file_names ({str: str}): имена файлов по типам (по умолчанию - REPORT_FILE_NAMES)
+        Returns:
+            {str: float}: время формирования каждого файла в секундах
+        """
+        self.run_many([(report, file_names or REPORT_FILE_NAMES)])
+        return self.timings[0]
+
+    def run_many(self, reports):
+        """Формирует файлы нескольких отчётов в одном пуле
+
+        Args:
+            reports ([(Report, {str: str})]): отчёты и имена их файлов по типам ('xlsx', 'png', 'pdf')
+        Returns:
+            {int: {str: float}}: время формирования каждого файла в секундах по номерам отчётов
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        paths = [{stage: os.path.normpath(os.path.join(self.output_dir, name)) for stage, name in file_names.items()}
+                 for _, file_names in reports]
+        executor_class = ProcessPoolExecutor if self.use_processes else ThreadPoolExecutor
+        self.timings = {k: {} for k in range(len(reports))}
+        with executor_class(max_workers=self.workers) as executor:
+            futures = {}
+            images = {}
+            for k in range(len(reports)):
+                report = reports[k][0]
+                futures[executor.submit(run_report_stage, report, 'xlsx', paths[k]['xlsx'])] = (k, 'xlsx')
+                images[executor.submit(run_report_stage, report, 'png', paths[k]['png'])] = k
+            for future in as_completed(images):
+                k = images[future]
+                self.timings[k]['png'] = future.result()
+                futures[executor.submit(run_report_stage, reports[k][0], 'pdf', paths[k]['pdf'],
+                                        paths[k]['png'])] = (k, 'pdf')
+            for future in as_completed(futures):
+                k, stage = futures[future]
+                self.timings[k][stage] = future.result()
+        return self.timings
+
+
+class StageProfiler(object):
+    """Класс для замеров этапов обработки: разбора, очистки полей, создания объектов, фильтрации, сортировки,
+    подсчёта статистики, вывода и формирования файлов отчёта. Для каждого этапа записываются время,
+    кол-во обработанных строк, строк в секунду и пиковая память (tracemalloc). Пока замеры не включены (start),
+    stage ничего не записывает.
+    Пиковая память считается по всему процессу, поэтому этапы, выполняемые одновременно в нескольких потоках,
+    мешают друг другу - для замеров файлы отчёта формируются по очереди (см. ReportPipeline с workers=1)
+    Attributes:
+        enabled (bool): включены ли замеры
+        trace_memory (bool): замерять ли пиковую память (tracemalloc заметно замедляет работу)
+        profile_file (str or None): файл для статистики cProfile
+        profile (cProfile.Profile or None): профилировщик cProfile
+        stages ([dict]): записи о завершённых этапах по порядку завершения
+        start_time (float): время включения замеров
+        total_seconds (float or None): общее время замеров (после stop)
+    """
+
+    def __init__(self):
+        """Инициализирует объект StageProfiler (замеры выключены)
+        """
+        self.enabled = False
+        self.trace_memory = False
+        self.profile_file = None
+        self.profile = None
+        self.stages = []
+        self.start_time = None
+        self.total_seconds = None
+
+    def start(self, trace_memory=True, profile_file=None):
+        """Включает замеры
+
+        Args:
+            trace_memory (bool): замерять ли пиковую память
+            profile_file (str): файл, в который при stop сохранится статистика cProfile (None - без cProfile)
+        """
+        self.enabled = True
+        self.trace_memory = trace_memory
+        self.profile_file = profile_file
+        self.stages = []
+        self.total_seconds = None
+        if trace_memory:
+            tracemalloc.start()
+        if profile_file:
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+        self.start_time = time.perf_counter()
+
+    def stop(self):
+        """Выключает замеры и сохраняет статистику cProfile, если она собиралась
+
+        Returns:
+            dict: результаты замеров (см. to_dict)
+        """
+        self.total_seconds = time.perf_counter() - self.start_time
+        result = self.to_dict()
+        if self.profile is not None:
+            self.profile.disable()
+            self.profile.dump_stats(self.profile_file)
+            self.profile = None
+        if self.trace_memory:
+            tracemalloc.stop()
+        self.enabled = False
+        return result
+
+    @contextlib.contextmanager
+    def stage(self, name, rows=None):
+        """Замеряет этап, выполняемый внутри блока with. Кол-во строк можно указать сразу или записать
+        в stage['rows'] внутри блока, если оно станет известно только после выполнения этапа
+
+        Args:
+            name (str): название этапа
+            rows (int): кол-во обработанных строк
+        Yields:
+            dict: запись об этапе
+        """
+        stage = {'stage': name, 'rows': rows}
+        if not self.enabled:
+            yield stage
+            return
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield stage
+        finally:
+            stage['seconds'] = time.perf_counter() - start
+            if stage['rows'] is not None and stage['seconds'] > 0:
+                stage['rows_per_second'] = stage['rows'] / stage['seconds']
+            if self.trace_memory:
+                stage['peak_memory'] = tracemalloc.get_traced_memory()[1]
+            self.stages.append(stage)
+
+    def to_dict(self):
+        """Возвращает результаты замеров
+
+        Returns:
+            dict: этапы и общее время с момента включения замеров в секундах
+        """
+        total_seconds = self.total_seconds
+        if self.enabled and total_seconds is None:
+            total_seconds = time.perf_counter() - self.start_time
+        return {'total_seconds': total_seconds, 'stages': self.stages}
+
+    def save(self, file_name):
+        """Сохраняет результаты замеров в json-файл
+
+        Args:
+            file_name (str): имя файла
+        """
+        with open(file_name, 'w', encoding='utf-8') as file:
+            json.dump(self.to_dict(), file, ensure_ascii=False, indent=2)
+
+
+PROFILER = StageProfiler()
+
+
+class QueryCache(object):
+    """Класс для LRU-кэша результатов запросов: отобранных позиций вакансий, порядков сортировки, статистики.
+    Ключ - вид запроса, путь к файлу и нормализованные параметры (см. get_query_key), вместе с результатом хранится
+    отпечаток файла. Если файл с тех пор изменился, результат считается устаревшим и удаляется при обращении.
+    Когда записей больше max_size, удаляются те, к которым дольше всего не обращались.
+    Файл кэша - json, поэтому отпечатки и результаты, которые сохраняются в файл, должны состоять из словарей,
+    списков, строк и чисел. Файл, который не удалось прочитать, считается пустым кэшем.
+    Attributes:
+        max_size (int): максимальное кол-во записей
+        file_name (str or None): файл, в котором кэш сохраняется между запусками (None - только в памяти)
+        entries (collections.OrderedDict): записи ключ -> (отпечаток файла, результат), от давних к недавним
+        hits (int): кол-во найденных результатов
+        misses (int): кол-во не найденных результатов
+        invalidations (int): кол-во устаревших результатов, удалённых из-за изменения файла
+        is_changed (bool): менялись ли записи с момента загрузки или сохранения
+    """
+
+    def __init__(self, max_size=QUERY_CACHE_SIZE, file_name=None):
+        """Инициализирует объект QueryCache и загружает сохранённые записи, если есть файл кэша
+
+        Args:
+            max_size (int): максимальное кол-во записей
+            file_name (str): файл для сохранения кэша (None - только в памяти)
+        """
+        self.max_size = max_size
+        self.file_name = file_name
+        self.entries = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.is_changed = False
+        if file_name is not None and os.path.exists(file_name):
+            try:
+                with open(file_name, encoding='utf-8') as file:
+                    for key, fingerprint, value in json.load(file):
+                        if not isinstance(key, str):
+                            raise ValueError('Некорректный ключ кэша')
+                        self.entries[key] = (fingerprint, value)
+            except (OSError, ValueError, TypeError):
+                self.entries.clear()
+            self.evict()
+            self.is_changed = False
+
+    def get(self, key, fingerprint):
+        """Ищет результат запроса
+
+        Args:
+            key (str): ключ запроса (см. get_query_key)
+            fingerprint: текущий отпечаток файла
+        Returns:
+            bool: найден ли актуальный результат
+            результат или None
+        """
+        entry = self.entries.get(key)
+        if entry is not None and entry[0] != fingerprint:
+            del self.entries[key]
+            self.invalidations += 1
+            self.is_changed = True
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return False, None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return True, entry[1]
+
+    def put(self, key, fingerprint, value):
+        """Сохраняет результат запроса
+
+        Args:
+            key (str): ключ запроса
+            fingerprint: отпечаток файла, по которому посчитан результат
+            value: результат
+        """
+        self.entries[key] = (fingerprint, value)
+        self.is_changed = True
+        self.entries.move_to_end(key)
+        self.evict()
+
+    def get_or_compute(self, key, fingerprint, compute):
+        """Возвращает результат из кэша или считает и сохраняет его
+
+        Args:
+            key (str): ключ запроса
+            fingerprint: текущий отпечаток файла
+            compute: функция без аргументов, которая считает результат
+        Returns:
+            результат запроса
+        """
+        found, value = self.get(key, fingerprint)
+        if not found:
+            value = compute()
+            self.put(key, fingerprint, value)
+        return value
+
+    def discard_stale(self, fingerprint):
+        """Удаляет записи, посчитанные по другой версии файла
+
+        Args:
+            fingerprint: текущий отпечаток файла
+        """
+        for key in [key for key, (entry_fingerprint, _) in self.entries.items() if entry_fingerprint != fingerprint]:
+            del self.entries[key]
+            self.invalidations += 1
+            self.is_changed = True
+
+    def evict(self):
+        """Удаляет самые давние записи, пока их больше max_size
+        """
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.is_changed = True
+
+    def save(self):
+        """Сохраняет записи в json-файл кэша (если он задан и записи менялись)
+        """
+        if self.file_name is None or not self.is_changed:
+            return
+        tmp_name = self.file_name + '.tmp'
+        with open(tmp_name, 'w', encoding='utf-8') as file:
+            json.dump([[key, fingerprint, value] for key, (fingerprint, value) in self.entries.items()], file,
+                      ensure_ascii=False)
+        os.replace(tmp_name, self.file_name)
+        self.is_changed = False
+
+    def get_stats(self):
+        """Возвращает статистику обращений к кэшу
+
+        Returns:
+            dict: кол-во записей, попаданий, промахов, устаревших записей и доля попаданий
+        """
+        requests = self.hits + self.misses
+        return {'size': len(self.entries), 'hits': self.hits, 'misses': self.misses,
+                'invalidations': self.invalidations, 'hit_rate': self.hits / requests if requests else 0}
+
+
+def get_query_key(kind, file_name, params):
+    """ Составляет ключ кэша запросов: одинаковые по смыслу запросы дают одинаковый ключ. Лишние пробелы по краям
+    убираются, условия внутри группы и группы фильтра упорядочиваются (результат фильтра от порядка не зависит),
+    пустой порядок сортировки считается прямым
+
+    Args:
+        kind (str): вид запроса, например 'filter', 'sort', 'statistics'
+        file_name (str): имя файла с данными
+        params (dict): параметры запроса
+    Returns:
+        str: ключ (json-строка, чтобы ключи можно было сохранить в файл кэша)
+
+    >>> key = get_query_key('filter', 'a.csv', {'filter': 'Компания: X & Название: Y'})
+    >>> key == get_query_key('filter', 'a.csv', {'filter': ' Название: Y & Компания: X '})
+    True
+    """
+    normalized = {}
+    for name, value in params.items():
+        if isinstance(value, str):
+            value = value.strip()
+        if name == 'filter' and value:
+            value = QUERY_OR.join(sorted(set(QUERY_AND.join(sorted(set(group))) for group in split_query(value))))
+        elif name == 'reverse':
+            value = 'Да' if value == 'Да' else 'Нет'
+        normalized[name] = value
+    return json.dumps([kind, os.path.abspath(file_name), sorted(normalized.items())], ensure_ascii=False)
+
+
+def init_query_worker(file_name, converter, cache_size=QUERY_CACHE_SIZE, preload=True, use_cache=False):
+    """ Загружает датасет в процесс пула сервера запросов (вызывается один раз при запуске процесса): вакансии для
+    таблицы с индексами и столбцы для статистики. Результаты запросов процесс хранит в своём кэше
+
+    Args:
+        file_name (str): имя csv-файла с данными о вакансиях
+        converter (CurrencyConverter): курсы валют главного процесса
+        cache_size (int): размер кэша результатов запросов
+        preload (bool): загрузить датасет сразу (иначе - при первом запросе, которому он нужен)
+        use_cache (bool): брать столбцы из кэша рядом с csv-файлом и записывать его (см. load_vacancy_columns),
+            иначе столбцы разбираются из csv-файла и никакие файлы не создаются
+    """
+    set_currency_converter(converter)
+    QUERY_DATA.clear()
+    QUERY_DATA['fingerprint'] = get_file_fingerprint(file_name)
+    QUERY_DATA['file_name'] = file_name
+    QUERY_DATA['use_cache'] = use_cache
+    QUERY_DATA['cache'] = QueryCache(cache_size)
+    if preload:
+        get_query_data_set()
+        get_query_columns()
+
+
+def refresh_query_data():
+    """ Проверяет перед запросом, не изменился ли csv-файл, загруженный в процесс: размер и время изменения
+    сравниваются с отпечатком при каждом вызове, отпечаток пересчитывается, только если они изменились. У изменённого
+    файла вакансии и столбцы загружаются заново (при первом запросе, которому они нужны), а результаты, посчитанные
+    по старому файлу, удаляются из кэша
+    """
+    fingerprint = QUERY_DATA['fingerprint']
+    stat = os.stat(QUERY_DATA['file_name'])
+    if stat.st_size == fingerprint['size'] and stat.st_mtime_ns == fingerprint['mtime']:
+        return
+    fingerprint = QUERY_DATA['fingerprint'] = get_file_fingerprint(QUERY_DATA['file_name'])
+    for name in ('data_set', 'columns'):
+        QUERY_DATA.pop(name, None)
+    QUERY_DATA['cache'].discard_stale(fingerprint)
+
+
+def get_query_data_set():
+    """ Возвращает вакансии загруженного датасета с индексами, при первом вызове загружает их. Вакансии хранятся
+    в одном экземпляре, непереведёнными: переводятся копии, и только для сортировки и вывода (см. translate_query_view)
+
+    Returns:
+        DataSetForTable: датасет
+    """
+    if 'data_set' not in QUERY_DATA:
+        data_set = DataSetForTable(QUERY_DATA['file_name'])
+        data_set.build_indexes()
+        QUERY_DATA['data_set'] = data_set
+    return QUERY_DATA['data_set']
+
+
+def translate_query_view(view, positions=None):
+    """ Возвращает копию выборки, в которой вакансии на позициях positions заменены переведёнными копиями,
+    вакансии загруженного датасета при этом не меняются
+
+    Args:
+        view (DataSetForTable): выборка из загруженного датасета
+        positions (range or [int]): позиции вакансий, которые нужно перевести (по умолчанию - все)
+    Returns:
+        DataSetForTable: выборка с переведёнными вакансиями
+    """
+    translated = copy.copy(view)
+    translated.vacancies_objects = list(view.vacancies_objects)
+    if positions is None:
+        positions = range(len(view.vacancies_objects))
+    for i in positions:
+        translated.vacancies_objects[i] = translated.vacancies_objects[i].copy()
+    translated.translate(positions)
+    return translated
+
+
+def get_query_columns():
+    """ Возвращает столбцы загруженного датасета для статистики, при первом вызове загружает их (из кэша, только
+    если он включён в init_query_worker)
+
+    Returns:
+        VacancyColumns: столбцы
+    """
+    if 'columns' not in QUERY_DATA:
+        if QUERY_DATA['use_cache']:
+            QUERY_DATA['columns'] = load_vacancy_columns(QUERY_DATA['file_name'])
+        else:
+            QUERY_DATA['columns'] = read_vacancy_columns(QUERY_DATA['file_name'])
+    return QUERY_DATA['columns']
+
+
+def get_query_sort_order(view, sort_param, is_reverse_sort, limit=None):
+    """ Считает порядок сортировки выборки из загруженного датасета по переведённым значениям. Копии вакансий
+    переводятся, только если ключ сортировки зависит от перевода (см. TRANSLATED_SORT_KEYS)
+
+    Args:
+        view (DataSetForTable): выборка с непереведёнными вакансиями
+        sort_param (str): параметр сортировки
+        is_reverse_sort (bool): обратный порядок сортировки
+        limit (int): сколько первых вакансий нужно (по умолчанию - все)
+    Returns:
+        [int] or None: позиции вакансий в порядке сортировки (см. DataSetForTable.get_sort_order)
+    """
+    if any(name in TRANSLATED_SORT_KEYS for name in sort_param.split(', ')):
+        view = translate_query_view(view)
+    return view.get_sort_order(sort_param, is_reverse_sort, limit)
+
+
+def find_query_vacancies(params):
+    """ Отбирает и сортирует вакансии загруженного датасета по параметрам запроса так же, как в режиме 'вакансии':
+    фильтрация - по исходным значениям через индексы, сортировка - по переведённым (см. get_query_sort_order)
+
+    Args:
+        params (dict): параметры запроса: 'filter', 'sort', 'reverse' ('Да' / 'Нет'), 'lines'
+    Returns:
+        DataSetForTable: датасет с отобранными непереведёнными вакансиями в vacancies_objects (при сортировке
+                         с ограничением 'lines' - только с первыми из них, которые попадут в таблицу)
+        int: кол-во всех вакансий, подходящих под фильтр
+    """
+    filter_param = params.get('filter', '')
+    sort_param = params.get('sort', '')
+    reverse_sort = params.get('reverse', '')
+    errors = get_query_errors(filter_param, sort_param, reverse_sort)
+    if errors:
+        raise ValueError('; '.join(errors))
+
+    refresh_query_data()
+    data_set = get_query_data_set()
+    file_name = QUERY_DATA['file_name']
+    fingerprint = QUERY_DATA['fingerprint']
+    cache = QUERY_DATA['cache']
+    positions = range(len(data_set.all_vacancies))
+    if filter_param != '':
+        positions = cache.get_or_compute(get_query_key('filter', file_name, {'filter': filter_param}), fingerprint,
+                                         lambda: Query(filter_param).find(data_set.all_vacancies, data_set.index))
+    view = copy.copy(data_set)
+    view.vacancies_objects = [data_set.all_vacancies[i] for i in positions]
+    if sort_param != '':
+        limit = get_sort_limit(params.get('lines', ''))
+        key = get_query_key('sort', file_name, {'filter': filter_param, 'sort': sort_param, 'reverse': reverse_sort,
+                                                'limit': limit})
+        order = cache.get_or_compute(key, fingerprint,
+                                     lambda: get_query_sort_order(view, sort_param, reverse_sort == 'Да', limit))
+        if order is not None:
+            view.vacancies_objects = [view.vacancies_objects[i] for i in order]
+    return view, len(positions)
+
+
+def run_filter_query(params):
+    """ Считает кол-во вакансий, подходящих под фильтр
+
+    Args:
+        params (dict): параметры запроса ('filter')
+    Returns:
+        dict: {'count': кол-во вакансий}
+    """
+    return {'count': find_query_vacancies({'filter': params.get('filter', '')})[1]}
+
+
+def run_table_query(params):
+    """ Строит таблицу вакансий, как в режиме 'вакансии'
+
+    Args:
+        params (dict): параметры запроса: 'filter', 'sort', 'reverse', 'lines', 'columns'
+    Returns:
+        dict: {'count': кол-во найденных вакансий, 'table': таблица или 'Ничего не найдено'}
+    """
+    view, count = find_query_vacancies(params)
+    if not count:
+        return {'count': 0, 'table': 'Ничего не найдено'}
+    positions = view.get_table_positions(params.get('lines', ''))
+    table = translate_query_view(view, positions).make_table(positions, get_table_fields(params.get('columns', '')))
+    return {'count': count, 'table': table.get_string()}
+
+
+def run_statistics_query(params):
+    """ Считает статистику для профессии по загруженным столбцам
+
+    Args:
+        params (dict): параметры запроса: 'vac_name', 'granularity' ('year', 'month' или 'week')
+    Returns:
+        dict: словари отчёта (см. Report)
+    """
+    vac_name = params.get('vac_name', '')
+    granularity = params.get('granularity', 'year')
+    refresh_query_data()
+    key = get_query_key('statistics', QUERY_DATA['file_name'], {'vac_name': vac_name, 'granularity': granularity})
+    return QUERY_DATA['cache'].get_or_compute(key, QUERY_DATA['fingerprint'],
+                                              lambda: get_report_dicts(get_query_report(vac_name, granularity)))
+
+
+def run_statistics_job(params):
+    """ Считает статистику для профессии по загруженным столбцам, как run_statistics_query, и, если задана папка
+    'output_dir', формирует в ней файлы отчёта, как в режиме 'статистика'.
+    Вместо 'vac_name' можно передать список 'vac_names': статистика считается для каждой профессии, файлы отчётов
+    формируются за один проход по файлу (см. generate_reports)
+
+    Args:
+        params (dict): параметры задания: 'vac_name' или 'vac_names', 'granularity', 'output_dir'
+    Returns:
+        dict: словари отчёта (см. Report), для 'vac_names' - {'reports': {профессия: словари отчёта}}
+    """
+    if 'vac_names' in params:
+        return run_professions_job(params)
+    if not params.get('output_dir'):
+        return run_statistics_query(params)
+    refresh_query_data()
+    report = get_query_report(params.get('vac_name', ''), params.get('granularity', 'year'))
+    ReportPipeline(params['output_dir']).run(report)
+    return get_report_dicts(report)
+
+
+def run_professions_job(params):
+    """ Считает статистику для нескольких профессий (см. run_statistics_job)
+
+    Args:
+        params (dict): параметры задания: 'vac_names', 'granularity', 'output_dir'
+    Returns:
+        dict: {'reports': {профессия: словари отчёта}}
+    """
+    vac_names = params['vac_names']
+    granularity = params.get('granularity', 'year')
+    if not isinstance(vac_names, list) or not vac_names or not all(isinstance(name, str) for name in vac_names):
+        raise ValueError('vac_names должен быть непустым списком названий профессий')
+    if granularity not in PERIOD_GRANULARITIES:
+        raise ValueError('Период статистики некорректен')
+    if not params.get('output_dir'):
+        return {'reports': {vac_name: run_statistics_query({'vac_name': vac_name, 'granularity': granularity})
+                            for vac_name in vac_names}}
+    refresh_query_data()
+    reports = generate_reports(QUERY_DATA['file_name'], vac_names, params['output_dir'], granularity)
+    return {'reports': {report.vac_name: get_report_dicts(report) for report in reports}}
+
+
+def get_query_report(vac_name, granularity):
+    """ Считает статистику для профессии по загруженным столбцам
+
+    Args:
+        vac_name (str): название профессии
+        granularity (str): период статистики
+    Returns:
+        Report: отчёт
+    """
+    if granularity not in PERIOD_GRANULARITIES:
+        raise ValueError('Период статистики некорректен')
+    return Report(get_query_columns().collect_statistics(vac_name, granularity), vac_name)
+
+
+def get_report_dicts(report):
+    """ Возвращает словари отчёта для ответа на запрос
+
+    Args:
+        report (Report): отчёт
+    Returns:
+        dict: словари отчёта (см. Report)
+    """
+    return {'years': report.years, 'salary_by_year': report.salary_by_year,
+            'salary_by_year_by_vacancy': report.salary_by_year_by_vacancy,
+            'count_salary_by_year': report.count_salary_by_year,
+            'count_salary_by_year_by_vacancy': report.count_salary_by_year_by_vacancy,
+            'salary_by_city': report.salary_by_city, 'part_salary_by_city': report.part_salary_by_city}
+
+
+def get_query_cache_stats(params):
+    """ Возвращает статистику кэша результатов процесса, который выполнил запрос
+
+    Args:
+        params (dict): параметры запроса (не используются)
+    Returns:
+        dict: статистика кэша (см. QueryCache.get_stats)
+    """
+    return QUERY_DATA['cache'].get_stats()
+
+
+def ping_query_worker():
+    """ Пустая задача, чтобы процесс пула запустился и загрузил датасет до первого запроса
+
+    Returns:
+        int: кол-во загруженных вакансий
+    """
+    return len(get_query_data_set().all_vacancies)
+
+
+class QueryServer(object):
+    """Класс для сервера запросов: датасет один раз загружается в процессы пула и остаётся в памяти, запросы
+    принимаются по HTTP (или через Unix-сокет) и выполняются в пуле. Запрос - GET с параметрами в строке запроса
+    или POST с json-объектом параметров, ответ - json.
+    Пути: /filter (кол-во подходящих вакансий), /table (таблица, как в режиме 'вакансии'),
+    /statistics (статистика по профессии), /cache (статистика кэша результатов)
+    Attributes:
+        file_name (str): имя csv-файла с данными о вакансиях
+        workers (int): кол-во процессов пула
+        cache_size (int): размер кэша результатов запросов в каждом процессе
+        use_cache (bool): брать столбцы для статистики из кэша рядом с csv-файлом (см. load_vacancy_columns)
+        executor (ProcessPoolExecutor or None): пул процессов (создаётся в start)
+    """
+
+    def __init__(self, file_name, workers=1, cache_size=QUERY_CACHE_SIZE, use_cache=False):
+        """Инициализирует объект QueryServer
+
+        Args:
+            file_name (str): имя csv-файла с данными о вакансиях
+            workers (int): кол-во процессов пула
+            cache_size (int): размер кэша результатов запросов в каждом процессе
+            use_cache (bool): брать столбцы для статистики из кэша рядом с csv-файлом и записывать его
+        """
+        self.file_name = file_name
+        self.workers = workers
+        self.cache_size = cache_size
+        self.use_cache = use_cache
+        self.executor = None
+
+    async def start(self, host='127.0.0.1', port=8000, unix_path=None):
+        """Запускает пул, дожидается загрузки датасета и открывает сокет
+
+        Args:
+            host (str): адрес
+            port (int): порт
+            unix_path (str): путь к Unix-сокету (если задан, host и port не используются)
+        Returns:
+            asyncio.Server: сервер
+        """
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=init_query_worker,
+                                            initargs=(self.file_name, CURRENCY_CONVERTER, self.cache_size, True,
+                                                      self.use_cache))
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*[loop.run_in_executor(self.executor, ping_query_worker) for _ in range(self.workers)])
+        if unix_path is not None:
+            return await asyncio.start_unix_server(self.handle, unix_path)
+        return await asyncio.start_server(self.handle, host, port)
+
+    async def serve(self, host='127.0.0.1', port=8000, unix_path=None):
+        """Запускает сервер и обрабатывает запросы, пока его не остановят
+
+        Args:
+            host (str): адрес
+            port (int): порт
+            unix_path (str): путь к Unix-сокету
+        """
+        server = await self.start(host, port, unix_path)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.executor.shutdown()
+
+    async def handle(self, reader, writer):
+        """Читает один HTTP-запрос, выполняет его в пуле и отправляет json-ответ
+
+        Args:
+            reader (asyncio.StreamReader): поток чтения
+            writer (asyncio.StreamWriter): поток записи
+        """
+        try:
+            request_line = (await reader.readline()).decode('latin-1').split()
+            content_length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                if name.strip().lower() == 'content-length':
+                    content_length = int(value)
+            body = await reader.readexactly(content_length) if content_length else b''
+            status, result = await self.run_query(request_line, body)
+        except (ValueError, asyncio.IncompleteReadError) as error:
+            status, result = 400, {'error': str(error)}
+        except Exception as error:
+            status, result = 500, {'error': repr(error)}
+        response = json.dumps(result, ensure_ascii=False).encode('utf-8')
+        writer.write('HTTP/1.1 {} {}\r\nContent-Type: application/json; charset=utf-8\r\nContent-Length: {}\r\n'
+                     'Connection: close\r\n\r\n'.format(status, 'OK' if status == 200 else 'Error',
+                                                        len(response)).encode('latin-1'))
+        writer.write(response)
+        await writer.drain()
+        writer.close()
+
+    async def run_query(self, request_line, body):
+        """Разбирает путь и параметры запроса и выполняет его в пуле. Тело, которое не является json-объектом,
+        считается некорректным запросом (ValueError, ответ 400)
+
+        Args:
+            request_line ([str]): метод, путь и версия HTTP
+            body (bytes): тело запроса
+        Returns:
+            int: HTTP-статус
+            dict: результат
+        """
+        if len(request_line) < 2:
+            raise ValueError('Некорректный запрос')
+        url = urllib.parse.urlsplit(request_line[1])
+        handler = QUERY_HANDLERS.get(url.path)
+        if handler is None:
+            return 404, {'error': 'Неизвестный путь: ' + url.path}
+        params = {name: values[-1] for name, values in urllib.parse.parse_qs(url.query).items()}
+        if body:
+            try:
+                body_params = json.loads(body.decode('utf-8'))
+            except ValueError as error:
+                raise ValueError('Тело запроса - не json: ' + str(error))
+            if not isinstance(body_params, dict):
+                raise ValueError('Тело запроса должно быть json-объектом с параметрами')
+            params.update(body_params)
+        loop = asyncio.get_running_loop()
+        return 200, await loop.run_in_executor(self.executor, handler, params)
+
+
+def run_table_mode(file_name, filter_param, sort_param, reverse_sort, lines_to_print, colomns, file=None,
+                   page_size=0):
+    """ Режим 'вакансии': проверяет параметры, читает файл, фильтрует, сортирует и печатает таблицу вакансий.
+    С page_size таблица печатается постранично (см. DataSetForTable.write_table_pages): первая страница выводится
+    сразу, не дожидаясь форматирования остальных
+
+    Args:
+        file_name (str): имя csv-файла с данными о вакансиях
+        filter_param (str): параметр фильтрации (пустая строка - без фильтрации)
+        sort_param (str): параметр сортировки (пустая строка - без сортировки)
+        reverse_sort (str): обратный порядок сортировки ('Да' / 'Нет')
+        lines_to_print (str): номера строк вида '10 20' (пустая строка - все)
+        colomns (str): название столбцов через запятую (пустая строка - все)
+        file: файл для вывода таблицы (по умолчанию - sys.stdout)
+        page_size (int): кол-во строк на странице (0 - одна таблица)
+    """
+    input_connect = InputConect(file_name, filter_param, sort_param, reverse_sort)
+    if not input_connect.is_printable:
+        return
+    data_set = DataSetForTable(file_name, get_required_columns(filter_param, sort_param, colomns))
+    if input_connect.is_pos_filter:
+        with PROFILER.stage('filter', len(data_set.vacancies_objects)):
+            data_set.query(input_connect.filter_param)
+    if not data_set.vacancies_objects:
+        print('Ничего не найдено', file=file)
+        return
+    with PROFILER.stage('translate', len(data_set.vacancies_objects)):
+        data_set.translate()
+    if input_connect.is_pos_sort:
+        with PROFILER.stage('sort', len(data_set.vacancies_objects)):
+            data_set.sort(input_connect.sort_param, input_connect.is_reverse_sort, get_sort_limit(lines_to_print))
+    with PROFILER.stage('render', len(data_set.vacancies_objects)):
+        if page_size > 0:
+            data_set.write_table_pages(file or sys.stdout, lines_to_print, colomns, page_size)
+        else:
+            data_set.print_table(lines_to_print, colomns, file)
+
+
+def run_statistics_mode(file_name, vac_name, workers=1, use_cache=False, is_incremental=False, granularity='year',
+                        regions_file='', rates_file='', output_dir='.', file=None):
+    """ Режим 'статистика': считает статистику по профессии, печатает её и формирует файлы отчёта
+
+    Args:
+        file_name (str): имя csv-файла с данными о вакансиях
+        vac_name (str): название профессии
+        workers (int): кол-во процессов для подсчёта
+        use_cache (bool): считать по столбцам из кэша и запоминать результаты (см. collect_statistics_cached),
+            workers при этом не используется
+        is_incremental (bool): дочитывать только новые строки (см. collect_statistics_incremental), workers при этом
+            не используется
+        granularity (str): период статистики: 'year', 'month' или 'week'
+        regions_file (str): файл с регионами городов (пустая строка - статистика по городам)
+        rates_file (str): файл с курсами валют по месяцам (пустая строка - постоянные курсы)
+        output_dir (str): папка для файлов отчёта
+        file: файл для вывода статистики (по умолчанию - sys.stdout)
+    Returns:
+        Report: отчёт
+    """
+    if rates_file:
+        CURRENCY_CONVERTER.load_monthly_rates(rates_file)
+
+    with PROFILER.stage('aggregate') as stage:
+        if is_incremental:
+            data_set = collect_statistics_incremental(file_name, vac_name, granularity)
+        elif use_cache:
+            data_set = collect_statistics_cached(file_name, vac_name, granularity)
+        elif workers > 1:
+            data_set = collect_statistics_parallel(file_name, vac_name, workers, granularity)
+        else:
+            data_set = collect_statistics(file_name, vac_name, granularity)
+        if regions_file:
+            data_set = data_set.group_cities(read_regions(regions_file))
+        stage['rows'] = data_set.count_vac
+    with PROFILER.stage('render', data_set.count_vac):
+        new_report = Report(data_set, vac_name)
+        print_report(new_report, file)
+
+    ReportPipeline(output_dir, workers=1 if PROFILER.enabled else 3).run(new_report)
+    return new_report
+
+
+def run_professions_mode(file_name, vac_names, granularity='year', regions_file='', rates_file='', output_dir='.',
+                         file=None):
+    """ Режим 'статистика' для нескольких профессий: считает статистику по всем профессиям за один проход по файлу
+    (см. generate_reports), печатает её и формирует файлы отчёта для каждой профессии
+
+    Args:
+        file_name (str): имя csv-файла с данными о вакансиях
+        vac_names ([str]): названия профессий
+        granularity (str): период статистики: 'year', 'month' или 'week'
+        regions_file (str): файл с регионами городов (пустая строка - статистика по городам)
+        rates_file (str): файл с курсами валют по месяцам (пустая строка - постоянные курсы)
+        output_dir (str): папка для файлов отчёта
+        file: файл для вывода статистики (по умолчанию - sys.stdout)
+    Returns:
+        [Report]: отчёты в порядке vac_names
+    """
+    if rates_file:
+        CURRENCY_CONVERTER.load_monthly_rates(rates_file)
+    reports = generate_reports(file_name, vac_names, output_dir, granularity,
+                               read_regions(regions_file) if regions_file else None)
+    for report in reports:
+        print('Профессия: ' + report.vac_name, file=file)
+        print_report(report, file)
+    return reports
+
+
+def print_report(report, file=None):
+    """ Печатает словари отчёта, как в режиме 'статистика'
+
+    Args:
+        report (Report): отчёт
+        file: файл для вывода (по умолчанию - sys.stdout)
+    """
+    print(report.salary_by_year, file=file)
+    print(report.salary_by_year_by_vacancy, file=file)
+    print(report.count_salary_by_year, file=file)
+    print(report.count_salary_by_year_by_vacancy, file=file)
+    print(report.salary_by_city, file=file)
+    print(report.part_salary_by_city, file=file)
+
+
+def run_batch(jobs_file, file_name, output=None, cache_size=QUERY_CACHE_SIZE, use_cache=False):
+    """ Пакетный режим: выполняет задания из файла JSON Lines (по одному json-объекту в строке) над одним
+    загруженным датасетом. Вид задания - поле 'mode': 'table' и 'filter' (параметры как у сервера запросов),
+    'statistics' (плюс 'output_dir' - папка для файлов отчёта, 'vac_names' - несколько профессий сразу).
+    Вакансии и столбцы для статистики загружаются при первом задании, которому они нужны, одинаковые запросы
+    отвечаются из кэша.
+    Результаты записываются тоже в формате JSON Lines: 'id' задания (или номер строки), результат или 'error'
+    и время выполнения в секундах
+
+    Args:
+        jobs_file (str): файл с заданиями
+        file_name (str): имя csv-файла с данными о вакансиях
+        output: файл для результатов (по умолчанию - sys.stdout)
+        cache_size (int): размер кэша результатов запросов
+        use_cache (bool): брать столбцы для статистики из кэша рядом с csv-файлом (см. load_vacancy_columns)
+    Returns:
+        int: кол-во заданий, завершившихся ошибкой
+    """
+    init_query_worker(file_name, CURRENCY_CONVERTER, cache_size, preload=False, use_cache=use_cache)
+    errors_count = 0
+    with open(jobs_file, encoding='utf-8') as jobs:
+        for number, line in enumerate(jobs, 1):
+            if not line.strip():
+                continue
+            start = time.perf_counter()
+            result = {'id': number}
+            try:
+                job = json.loads(line)
+                result['id'] = job.get('id', number)
+                handler = BATCH_HANDLERS.get(job.get('mode'))
+                if handler is None:
+                    raise ValueError('Неизвестный вид задания: {}'.format(job.get('mode')))
+                result.update(handler(job))
+            except Exception as error:
+                result['error'] = str(error)
+                errors_count += 1
+            result['seconds'] = time.perf_counter() - start
+            print(json.dumps(result, ensure_ascii=False), file=output, flush=True)
+    return errors_count
+
+
+QUERY_DATA = {}
+QUERY_HANDLERS = {'/filter': run_filter_query, '/table': run_table_query, '/statistics': run_statistics_query,
+                  '/cache': get_query_cache_stats}
+BATCH_HANDLERS = {'table': run_table_query, 'filter': run_filter_query, 'statistics': run_statistics_job}
+WORK_MODES = {'вакансии': 'table', 'статистика': 'statistics', 'сервер': 'server'}
+
+
+def get_arguments(args=None):
+    """ Разбирает аргументы командной строки. Без аргументов режим спрашивается у пользователя, как раньше,
+    остальные параметры берутся по умолчанию
+
+    Args:
+        args ([str]): аргументы (по умолчанию - sys.argv[1:])
+    Returns:
+        argparse.Namespace: аргументы, режим - в поле mode
+    """
+    parser = argparse.ArgumentParser(description='Таблица вакансий, статистика по профессии и сервер запросов')
+    parser.add_argument('--stages', default='', help='json-файл для замеров этапов (см. StageProfiler)')
+    parser.add_argument('--profile', default='', help='файл для статистики cProfile')
+    modes = parser.add_subparsers(dest='mode')
+
+    table = modes.add_parser('table', aliases=['вакансии'], help='таблица вакансий')
+    table.set_defaults(mode='table')
+    table.add_argument('file_name', nargs='?', default='vacancies (2).csv', help='csv-файл с вакансиями')
+    table.add_argument('--filter', default='', help="параметр фильтрации, например 'Компания: X & Оклад: 100000'")
+    table.add_argument('--sort', default='Оклад', help='параметр сортировки (пустая строка - без сортировки)')
+    table.add_argument('--reverse', default='Да', help='обратный порядок сортировки (Да / Нет)')
+    table.add_argument('--lines', default='', help="диапазон вывода, например '10 20'")
+    table.add_argument('--columns', default='', help='столбцы через запятую')
+    table.add_argument('--page-size', type=int, default=0,
+                       help='выводить таблицу страницами по столько строк (по умолчанию - одной таблицей)')
+
+    statistics = modes.add_parser('statistics', aliases=['статистика'], help='статистика по профессии и отчёты')
+    statistics.set_defaults(mode='statistics')
+    statistics.add_argument('file_name', nargs='?', default='vacancies_by_year.csv', help='csv-файл с вакансиями')
+    statistics.add_argument('--vac-name', dest='vac_names', nargs='+', default=['Программист'],
+                            help='название профессии, можно несколько (считаются за один проход, отчёты - '
+                                 'в файлах по названиям профессий)')
+    statistics.add_argument('--workers', type=int, default=None,
+                            help='кол-во процессов (по умолчанию - по числу ядер, с --cache и --incremental - 1)')
+    statistics.add_argument('--cache', dest='use_cache', action='store_true',
+                            help='использовать кэш столбцов и результатов (считается в одном процессе)')
+    statistics.add_argument('--incremental', action='store_true',
+                            help='дочитывать только новые строки (считается в одном процессе)')
+    statistics.add_argument('--granularity', choices=PERIOD_GRANULARITIES, default='year', help='период статистики')
+    statistics.add_argument('--regions', default='', help='файл с регионами городов')
+    statistics.add_argument('--rates', default='', help='файл с курсами валют по месяцам')
+    statistics.add_argument('--output-dir', default='.', help='папка для файлов отчёта')
+
+    server = modes.add_parser('server', aliases=['сервер'], help='сервер запросов')
+    server.set_defaults(mode='server')
+    server.add_argument('file_name', nargs='?', default='vacancies (2).csv', help='csv-файл с вакансиями')
+    server.add_argument('--port', type=int, default=8000, help='порт')
+    server.add_argument('--workers', type=int, default=2, help='кол-во процессов')
+    server.add_argument('--cache-size', type=int, default=QUERY_CACHE_SIZE, help='размер кэша результатов')
+    server.add_argument('--cache', dest='use_cache', action='store_true',
+                        help='использовать кэш столбцов рядом с csv-файлом')
+
+    batch = modes.add_parser('batch', aliases=['пакет'], help='задания из файла JSON Lines над одним датасетом')
+    batch.set_defaults(mode='batch')
+    batch.add_argument('jobs_file', help='файл с заданиями')
+    batch.add_argument('file_name', nargs='?', default='vacancies (2).csv', help='csv-файл с вакансиями')
+    batch.add_argument('--output', default='', help='файл для результатов (по умолчанию - вывод на экран)')
+    batch.add_argument('--cache-size', type=int, default=QUERY_CACHE_SIZE, help='размер кэша результатов')
+    batch.add_argument('--cache', dest='use_cache', action='store_true',
+                       help='использовать кэш столбцов рядом с csv-файлом')
+
+    arguments = parser.parse_args(args)
+    if arguments.mode is None:
+        work_mode = input('Вакансии, статистика или сервер?(укажите одно из трёх): ').lower()
+        if work_mode not in WORK_MODES:
+            return None
+        arguments = parser.parse_args([WORK_MODES[work_mode]])
+    if arguments.mode == 'table' and arguments.page_size < 0:
+        parser.error('--page-size не может быть отрицательным')
+    if arguments.mode == 'statistics':
+        is_single_process = arguments.use_cache or arguments.incremental
+        if len(arguments.vac_names) > 1 and (is_single_process or arguments.workers is not None):
+            parser.error('--workers, --cache и --incremental нельзя использовать с несколькими профессиями: '
+                         'они считаются за один проход в одном процессе')
+        if arguments.workers is None:
+            arguments.workers = 1 if is_single_process else os.cpu_count()
+        elif arguments.workers > 1 and is_single_process:
+            parser.error('--workers нельзя использовать вместе с --cache и --incremental: они считают в одном процессе')
+    return arguments
+
+
+def main(args=None):
+    """ Точка входа: выполняет режим, выбранный в аргументах командной строки
+
+    Args:
+        args ([str]): аргументы (по умолчанию - sys.argv[1:])
+    Returns:
+        int: код завершения
+    """
+    arguments = get_arguments(args)
+    if arguments is None:
+        print('Вы ввели что-то не то')
+        return 1
+    if arguments.stages or arguments.profile:
+        PROFILER.start(profile_file=arguments.profile or None)
+
+    exit_code = 0
+    if arguments.mode == 'table':
+        run_table_mode(arguments.file_name, arguments.filter, arguments.sort, arguments.reverse, arguments.lines,
+                       arguments.columns, page_size=arguments.page_size)
+    elif arguments.mode == 'statistics' and len(arguments.vac_names) > 1:
+        run_professions_mode(arguments.file_name, arguments.vac_names, arguments.granularity, arguments.regions,
+                             arguments.rates, arguments.output_dir)
+    elif arguments.mode == 'statistics':
+        run_statistics_mode(arguments.file_name, arguments.vac_names[0], arguments.workers, arguments.use_cache,
+                            arguments.incremental, arguments.granularity, arguments.regions, arguments.rates,
+                            arguments.output_dir)
+    elif arguments.mode == 'server':
+        print('Сервер запросов: http://127.0.0.1:{}/table, /filter, /statistics, /cache'.format(arguments.port))
+        asyncio.run(QueryServer(arguments.file_name, arguments.workers, arguments.cache_size, arguments.use_cache)
+                    .serve(port=arguments.port))
+    else:
+        if arguments.output:
+            with open(arguments.output, 'w', encoding='utf-8') as output:
+                errors_count = run_batch(arguments.jobs_file, arguments.file_name, output, arguments.cache_size,
+                                         arguments.use_cache)
+        else:
+            errors_count = run_batch(arguments.jobs_file, arguments.file_name, cache_size=arguments.cache_size,
+                                     use_cache=arguments.use_cache)
+        exit_code = 1 if errors_count else 0
+
+    if PROFILER.enabled:
+        PROFILER.stop()
+        if arguments.stages:
+            PROFILER.save(arguments.stages)
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,743 @@
+import asyncio
+import csv
+import io
+import json
+import os
+import random
+import re
+import shutil
+import tempfile
+import unittest
+import urllib.parse
+from unittest import mock
+
+import main
+
+
+PARSER_HEAD = 'name,description,salary_from,salary_to,salary_currency,area_name,published_at\n'
+PARSER_ROWS = [
+    'Программист,просто,100,200,RUR,Москва,2022-07-05T18:19:30+0300\n',
+    '"Программист, Python","многострочное\nописание с ""кавычками""",100,200,RUR,Москва,2022-07-05T18:19:30+0300\n',
+    'Тестировщик,<p>с тегами</p>,300,400,USD,Казань,2021-01-01T10:00:00+0300\r\n',
+    'Аналитик,"строки через\r\nCRLF",500,600,EUR,Уфа,2020-02-02T10:00:00+0300\r\n',
+    'Бухгалтер,,700,800,RUR,Пермь,2019-03-03T10:00:00+0300\n',
+    'Бухгалтер,лишнее поле,700,800,RUR,Пермь,2019-03-03T10:00:00+0300,лишнее\n',
+    'Дизайнер,"""в кавычках""",900,1000,RUR,Самара,2018-04-04T10:00:00+0300\n',
+    'Менеджер,пустое в кавычках,"",1000,RUR,Самара,2018-04-04T10:00:00+0300\n',
+    'Оператор,"незакрытая кавычка,1100,1200,RUR,Тула,2017-05-05T10:00:00+0300\nхвост',
+]
+
+STATISTICS_HEAD = 'name,salary_from,salary_to,salary_currency,area_name,published_at\n'
+STATISTICS_ROWS = [
+    'Программист,100000.0,200000.0,RUR,Москва,2020-01-15T10:11:12+0300\n',
+    'Бухгалтер,40000.0,60000.0,RUR,Уфа,2020-06-15T10:11:12+0300\n',
+    '"Программист, Java",3000.0,5000.0,USD,Москва,2021-03-15T10:11:12+0300\n',
+    'Тестировщик,80000.0,90000.0,RUR,Казань,2021-09-15T10:11:12+0300\n',
+    'Программист,120000.0,180000.0,RUR,Казань,2022-02-15T10:11:12+0300\n',
+    'Бухгалтер,50000.0,70000.0,EUR,Москва,2022-11-15T10:11:12+0300\n',
+]
+
+
+def make_table_csv(count, seed=0):
+    """Создаёт csv-файл со всеми столбцами HEAD из count случайных вакансий"""
+    generator = random.Random(seed)
+    lines = [','.join(main.HEAD)]
+    for k in range(count):
+        salary_from = generator.randrange(10, 200) * 1000
+        skills = generator.sample(['Git', 'Linux', 'Python', 'Excel'], generator.randint(1, 3))
+        lines.append(','.join([
+            generator.choice(['Программист', 'Java программист', 'Бухгалтер', 'Тестировщик']),
+            '"<p>Описание  <b>вакансии</b> {}</p>, текст"'.format(k),
+            '"' + '\n'.join(skills) + '"',
+            generator.choice(list(main.WORK_EXPERIENCE)),
+            generator.choice(['True', 'FALSE', 'False']),
+            'Компания {}'.format(generator.randint(1, 5)),
+            str(salary_from),
+            str(salary_from + generator.randrange(0, 100) * 1000),
+            generator.choice(['True', 'False']),
+            generator.choice(['RUR', 'USD', 'EUR']),
+            generator.choice(['Москва', 'Казань', 'Сочи']),
+            '20{:02}-{:02}-{:02}T10:11:12+0300'.format(
+                generator.randint(10, 22), generator.randint(1, 12), generator.randint(1, 28))]))
+    return '\n'.join(lines) + '\n'
+
+
+def read_reference(file_name):
+    """Читает файл модулем csv так же, как исходный read_vacancies"""
+    return list(main.read_vacancies(file_name))
+
+
+class TempDirTestCase(unittest.TestCase):
+    def setUp(self):
+        self.dir_name = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir_name)
+
+    def write_file(self, name, text, mode='w'):
+        file_name = os.path.join(self.dir_name, name)
+        with open(file_name, mode, encoding='utf-8', newline='') as file:
+            file.write(text)
+        return file_name
+
+
+class MappedCsvTest(TempDirTestCase):
+    def test_reference_reader_sees_tricky_rows(self):
+        file_name = self.write_file('vacancies.csv', PARSER_HEAD + ''.join(PARSER_ROWS))
+        with open(file_name, encoding='utf-8-sig') as file:
+            rows = list(csv.reader(file))
+        self.assertIn('многострочное\nописание с "кавычками"', rows[2])
+        self.assertIn('строки через\nCRLF', rows[4])
+
+    def test_mapped_reader_matches_csv_reader(self):
+        for prefix in ('', '\ufeff'):
+            with self.subTest(bom=bool(prefix)):
+                file_name = self.write_file('vacancies.csv', prefix + PARSER_HEAD + ''.join(PARSER_ROWS))
+                self.assertEqual(list(main.read_vacancies_mapped(file_name)), read_reference(file_name))
+
+    def test_mapped_reader_matches_csv_reader_without_cleaning(self):
+        file_name = self.write_file('vacancies.csv', PARSER_HEAD + ''.join(PARSER_ROWS))
+        with open(file_name, encoding='utf-8-sig') as file:
+            rows = [list(filter(None, row)) for row in csv.reader(file)]
+        head = rows[0]
+        expected = [dict(zip(head, row)) for row in rows[1:] if len(row) == len(head)]
+        self.assertEqual(list(main.read_vacancies_mapped(file_name, clean=str)), expected)
+
+    def test_parse_record_of_each_row(self):
+        file_name = self.write_file('vacancies.csv', PARSER_HEAD + ''.join(PARSER_ROWS))
+        with main.MappedCsv(file_name) as mapped:
+            head = mapped.head
+            records = list(mapped.records())
+        self.assertEqual(b''.join(records), ''.join(PARSER_ROWS).encode('utf-8'))
+        parsed = []
+        for record in records:
+            parsed.extend(main.parse_record(record, head, len(head), range(len(head))))
+        self.assertEqual(parsed, read_reference(file_name))
+
+    def test_selected_columns(self):
+        file_name = self.write_file('vacancies.csv', PARSER_HEAD + ''.join(PARSER_ROWS))
+        expected = [{key: vacancy[key] for key in main.SHORT_HEAD} for vacancy in read_reference(file_name)]
+        for split_record_size in (main.SPLIT_RECORD_SIZE, 0):
+            with self.subTest(split_record_size=split_record_size), \
+                    mock.patch.object(main, 'SPLIT_RECORD_SIZE', split_record_size):
+                self.assertEqual(list(main.read_vacancies_mapped(file_name, main.SHORT_HEAD)), expected)
+
+    def test_rows_in_small_blocks(self):
+        file_name = self.write_file('vacancies.csv', PARSER_HEAD + ''.join(PARSER_ROWS[:-1]) + make_table_csv(30))
+        with open(file_name, encoding='utf-8-sig') as file:
+            expected = list(csv.reader(file))[1:]
+        for block_size in (1, 7, 100, main.BLOCK_SIZE):
+            with self.subTest(block_size=block_size), mock.patch.object(main, 'BLOCK_SIZE', block_size), \
+                    main.MappedCsv(file_name) as mapped:
+                self.assertEqual(list(mapped.rows()), expected)
+
+    def test_empty_file(self):
+        file_name = self.write_file('empty.csv', '')
+        self.assertEqual(list(main.read_vacancies_mapped(file_name)), [])
+
+
+class CleanFieldTest(TempDirTestCase):
+    @staticmethod
+    def clean_with_regex(value):
+        """Исходная очистка поля, с которой должна совпадать clean_field"""
+        return ' '.join(re.sub('<.*?>', '', value).replace('\n', '###').replace('\r\n', '').split())
+
+    def test_matches_regex_cleaning(self):
+        values = ['', ' ', 'просто', '100000.0', '2022-07-05T18:19:30+0300', ' с краю', 'с краю ', 'два  пробела',
+                  'a\tb', 'a\nb', 'a\r\nb', 'a\rb', 'a\xa0b', 'a\u2003b', 'a\x1cb', '<', 'a < b', '<p>', '<p>a</p>',
+                  '<p>Описание  <b>вакансии</b></p>\n<ul>\n<li>пункт</li>\n</ul>', 'Git\nLinux\nPython', '\n\n']
+        file_name = self.write_file('vacancies.csv', make_table_csv(20) + PARSER_HEAD + ''.join(PARSER_ROWS))
+        with open(file_name, encoding='utf-8-sig') as file:
+            values.extend(value for row in csv.reader(file) for value in row)
+        for value in values:
+            self.assertEqual(main.clean_field(value), self.clean_with_regex(value), repr(value))
+
+    def test_clean_fields_are_returned_as_is(self):
+        for value in ('Программист', '100000.0', 'a b c'):
+            self.assertIs(main.clean_field(value), value)
+
+
+class SplitCsvFileTest(TempDirTestCase):
+    def test_chunks_match_csv_reader(self):
+        file_name = self.write_file('vacancies.csv', PARSER_HEAD + ''.join(PARSER_ROWS[:-1] * 3 + PARSER_ROWS[-1:]))
+        expected = read_reference(file_name)
+        size = os.path.getsize(file_name)
+        for block_size in (3, 7, main.BLOCK_SIZE):
+            for chunk_count in range(1, 40):
+                with self.subTest(block_size=block_size, chunk_count=chunk_count), \
+                        mock.patch.object(main, 'BLOCK_SIZE', block_size):
+                    head, bounds = main.split_csv_file(file_name, chunk_count)
+                    self.assertEqual(head, PARSER_HEAD.strip().split(','))
+                    self.assertLessEqual(len(bounds), chunk_count)
+                    self.assertEqual(bounds[-1][1], size)
+                    for (_, end), (start, _) in zip(bounds, bounds[1:]):
+                        self.assertEqual(end, start)
+                    vacancies = []
+                    for start, end in bounds:
+                        vacancies.extend(main.read_vacancies_mapped(file_name, None, start, end, head))
+                    self.assertEqual(vacancies, expected)
+
+    def test_find_record_end_skips_quoted_newlines(self):
+        file_name = self.write_file('vacancies.csv', PARSER_HEAD + PARSER_ROWS[1] + PARSER_ROWS[0])
+        head_size = len(PARSER_HEAD.encode('utf-8'))
+        with open(file_name, 'rb') as file:
+            end, quotes = main.find_record_end(file, head_size + 1, 1)
+        self.assertEqual(end, head_size + len(PARSER_ROWS[1].encode('utf-8')))
+        self.assertEqual(quotes, PARSER_ROWS[1].count('"'))
+
+
+class IncrementalStatisticsTest(TempDirTestCase):
+    def assert_same_statistics(self, file_name, granularity='year'):
+        incremental = main.collect_statistics_incremental(file_name, 'Программист', granularity)
+        expected = main.collect_statistics(file_name, 'Программист', granularity)
+        self.assertEqual(incremental.to_dict(), expected.to_dict())
+        self.assertEqual(main.Report(incremental, 'Программист').salary_by_city,
+                         main.Report(expected, 'Программист').salary_by_city)
+
+    def test_rows_appended_after_checkpoint(self):
+        for granularity in ('year', 'month'):
+            with self.subTest(granularity=granularity):
+                file_name = self.write_file(granularity + '.csv', STATISTICS_HEAD + ''.join(STATISTICS_ROWS[:3]))
+                self.assert_same_statistics(file_name, granularity)
+                self.write_file(granularity + '.csv', ''.join(STATISTICS_ROWS[3:5]), 'a')
+                self.assert_same_statistics(file_name, granularity)
+                self.write_file(granularity + '.csv', STATISTICS_ROWS[5][:-1], 'a')
+                self.assert_same_statistics(file_name, granularity)
+                self.write_file(granularity + '.csv', '\n' + STATISTICS_ROWS[0], 'a')
+                self.assert_same_statistics(file_name, granularity)
+
+    def test_rewritten_file_is_read_again(self):
+        file_name = self.write_file('vacancies.csv', STATISTICS_HEAD + ''.join(STATISTICS_ROWS))
+        self.assert_same_statistics(file_name)
+        self.write_file('vacancies.csv', STATISTICS_HEAD + ''.join(reversed(STATISTICS_ROWS)) + STATISTICS_ROWS[0])
+        self.assert_same_statistics(file_name)
+
+
+class VacancyColumnsTest(TempDirTestCase):
+    def test_statistics_match_row_statistics(self):
+        files = [self.write_file('short.csv', STATISTICS_HEAD + ''.join(STATISTICS_ROWS)),
+                 self.write_file('table.csv', make_table_csv(200, seed=3))]
+        for file_name in files:
+            columns = main.read_vacancy_columns(file_name)
+            for granularity in main.PERIOD_GRANULARITIES:
+                with self.subTest(file_name=os.path.basename(file_name), granularity=granularity):
+                    expected = main.collect_statistics(file_name, 'Программист', granularity)
+                    self.assertEqual(columns.collect_statistics('Программист', granularity).to_dict(),
+                                     expected.to_dict())
+        self.assertIsNone(main.read_vacancy_columns(files[0]).experience_codes)
+        self.assertEqual(len(main.read_vacancy_columns(files[1]).experience_codes), 200)
+
+    def assert_same_columns(self, columns, expected):
+        self.assertEqual(columns.names, expected.names)
+        self.assertEqual(columns.areas, expected.areas)
+        for name in ('name_codes', 'salary_from', 'salary_to', 'currency_codes', 'area_codes', 'experience_codes',
+                     'published_at'):
+            self.assertEqual(getattr(columns, name).tolist(), getattr(expected, name).tolist(), name)
+
+    def test_cache_round_trip(self):
+        file_name = self.write_file('vacancies.csv', make_table_csv(50))
+        expected = main.read_vacancy_columns(file_name)
+        self.assert_same_columns(main.load_vacancy_columns(file_name), expected)
+        self.assertTrue(os.path.exists(file_name + main.CACHE_SUFFIX))
+        with mock.patch.object(main, 'read_vacancy_columns') as read:
+            self.assert_same_columns(main.load_vacancy_columns(file_name), expected)
+        read.assert_not_called()
+
+    def test_cache_invalidated_by_changed_file_and_version(self):
+        file_name = self.write_file('vacancies.csv', make_table_csv(50))
+        main.load_vacancy_columns(file_name)
+        self.write_file('vacancies.csv', make_table_csv(60, seed=1))
+        self.assertEqual(len(main.load_vacancy_columns(file_name)), 60)
+        with mock.patch.object(main, 'CACHE_FORMAT_VERSION', main.CACHE_FORMAT_VERSION + 1), \
+                mock.patch.object(main, 'read_vacancy_columns', wraps=main.read_vacancy_columns) as read:
+            self.assertEqual(len(main.load_vacancy_columns(file_name)), 60)
+        read.assert_called_once_with(file_name)
+
+    def test_broken_cache_is_rebuilt(self):
+        file_name = self.write_file('vacancies.csv', make_table_csv(50))
+        cache_name = file_name + main.CACHE_SUFFIX
+        main.load_vacancy_columns(file_name)
+        with open(cache_name, 'rb') as file:
+            content = file.read()
+        expected = main.read_vacancy_columns(file_name)
+        for broken in (b'', b'not a cache', content[:len(content) // 2], content[:-10]):
+            with self.subTest(size=len(broken)):
+                with open(cache_name, 'wb') as file:
+                    file.write(broken)
+                self.assert_same_columns(main.load_vacancy_columns(file_name), expected)
+                with mock.patch.object(main, 'read_vacancy_columns') as read:
+                    self.assert_same_columns(main.load_vacancy_columns(file_name), expected)
+                read.assert_not_called()
+
+    def test_unwritable_cache_is_skipped(self):
+        file_name = self.write_file('vacancies.csv', make_table_csv(20))
+        with mock.patch.object(main, 'save_vacancy_columns', side_effect=PermissionError):
+            self.assertEqual(len(main.load_vacancy_columns(file_name)), 20)
+
+
+class SortTest(TempDirTestCase):
+    def test_top_k_matches_full_sort(self):
+        data_set = main.DataSetForTable(self.write_file('vacancies.csv', make_table_csv(300, seed=4)))
+        data_set.translate()
+        vacancies = data_set.vacancies_objects
+        for sort_param in ('Оклад', 'Опыт работы', 'Премиум-вакансия', 'Навыки', 'Дата публикации вакансии',
+                           'Опыт работы, Оклад', 'Компания, Название региона, Название'):
+            key_functions = [main.SORT_KEYS[name] for name in sort_param.split(', ')]
+            for is_reverse_sort in (False, True):
+                expected = sorted(range(len(vacancies)), reverse=is_reverse_sort,
+                                  key=lambda i: [key_function(vacancies[i]) for key_function in key_functions])
+                for limit in (None, 0, 1, 7, 299, 300, 1000):
+                    with self.subTest(sort_param=sort_param, reverse=is_reverse_sort, limit=limit):
+                        self.assertEqual(data_set.get_sort_order(sort_param, is_reverse_sort, limit),
+                                         expected[:limit])
+
+    def test_sort_keeps_limit_first_vacancies(self):
+        data_set = main.DataSetForTable(self.write_file('vacancies.csv', make_table_csv(100, seed=4)))
+        data_set.translate()
+        expected = sorted(data_set.vacancies_objects, key=main.SORT_KEYS['Оклад'], reverse=True)[:10]
+        data_set.sort('Оклад', True, 10)
+        self.assertEqual(data_set.vacancies_objects, expected)
+
+
+class TablePagesTest(TempDirTestCase):
+    ROW_NUMBER_PATTERN = re.compile(r'^\| (\d+) +\|', re.M)
+
+    def make_data_set(self, count):
+        data_set = main.DataSetForTable(self.write_file('vacancies.csv', make_table_csv(count, seed=8)))
+        data_set.translate()
+        return data_set
+
+    def test_pages_cover_table_rows(self):
+        data_set = self.make_data_set(23)
+        for lines, page_size in (('', 5), ('', 23), ('', 100), ('4 20', 5), ('10', 4), ('30 40', 5)):
+            with self.subTest(lines=lines, page_size=page_size):
+                pages = list(data_set.iter_table_pages(lines, 'Название, Оклад', page_size))
+                expected = [i + 1 for i in data_set.get_table_positions(lines)]
+                numbers = [[int(number) for number in self.ROW_NUMBER_PATTERN.findall(page)] for page in pages]
+                self.assertEqual(sum(numbers, []), expected)
+                self.assertTrue(all(0 < len(page_numbers) <= page_size for page_numbers in numbers))
+                for page in pages:
+                    self.assertIn('Название', page.split('\n')[1])
+
+    def test_write_table_pages(self):
+        data_set = self.make_data_set(12)
+        output = io.StringIO()
+        data_set.write_table_pages(output, '', '', 5)
+        self.assertEqual(output.getvalue(), ''.join(page + '\n' for page in data_set.iter_table_pages('', '', 5)))
+
+    def test_page_size_argument(self):
+        file_name = self.write_file('vacancies.csv', make_table_csv(30, seed=8))
+        with mock.patch('sys.stdout', new_callable=io.StringIO) as output:
+            self.assertEqual(main.main(['table', file_name, '--sort', 'Оклад', '--page-size', '7']), 0)
+        numbers = [int(number) for number in self.ROW_NUMBER_PATTERN.findall(output.getvalue())]
+        self.assertEqual(numbers, list(range(1, 31)))
+        self.assertEqual(output.getvalue().count('| №'), 5)
+        with mock.patch('sys.stdout', new_callable=io.StringIO) as output:
+            main.main(['table', file_name, '--sort', 'Оклад'])
+        self.assertEqual(output.getvalue().count('| №'), 1)
+        with mock.patch('sys.stderr'), self.assertRaises(SystemExit):
+            main.get_arguments(['table', '--page-size', '-1'])
+
+
+class CurrencyConverterTest(TempDirTestCase):
+    def test_monthly_rates(self):
+        file_name = self.write_file('rates.csv', 'date,USD,EUR\n2022-01,70.5,\n2022-03-01,80.0,90.0\n')
+        converter = main.CurrencyConverter(main.CURRENCY_TO_RUB)
+        converter.load_monthly_rates(file_name)
+        self.assertEqual(converter.get_rate('USD', '2022-01-15T10:11:12+0300'), 70.5)
+        self.assertEqual(converter.get_rate('EUR', '2022-01-15T10:11:12+0300'), converter.rates['EUR'])
+        self.assertEqual(converter.get_rate('USD', '2022-02-15T10:11:12+0300'), converter.rates['USD'])
+        self.assertEqual(converter.get_rate('EUR', '2022-03-15T10:11:12+0300'), 90.0)
+
+    def test_month_out_of_range(self):
+        for date in ('2020-13', '2020-00', '2020-1x'):
+            with self.subTest(date=date):
+                file_name = self.write_file('rates.csv', 'date,USD\n2020-12,70.0\n{},80.0\n'.format(date))
+                with self.assertRaises(ValueError):
+                    main.CurrencyConverter(main.CURRENCY_TO_RUB).load_monthly_rates(file_name)
+
+
+class ExcelReportTest(TempDirTestCase):
+    def make_report(self, salary_by_city, part_salary_by_city):
+        statistics = main.StatisticsAccumulator('Программист')
+        statistics.finish()
+        report = main.Report(statistics, 'Программист')
+        report.salary_by_city = salary_by_city
+        report.part_salary_by_city = part_salary_by_city
+        return report
+
+    def read_cities(self, report):
+        import openpyxl
+        file_name = os.path.join(self.dir_name, 'report.xlsx')
+        report.generate_excel(file_name)
+        sheet = openpyxl.load_workbook(file_name)['Статистика по городам']
+        return [[cell.value for cell in row] for row in sheet.iter_rows(min_row=2, max_col=5)], sheet
+
+    def test_without_cities(self):
+        rows, _ = self.read_cities(self.make_report({}, {}))
+        self.assertEqual(rows, [])
+
+    def test_lists_of_different_length(self):
+        rows, sheet = self.read_cities(self.make_report({'Москва': 100, 'Уфа': 50}, {'Москва': 0.5}))
+        self.assertEqual(rows, [['Москва', 100, None, 'Москва', 0.5], ['Уфа', 50, None, None, None]])
+        self.assertEqual(sheet['E2'].number_format, '0.00%')
+        rows, _ = self.read_cities(self.make_report({'Москва': 100}, {'Москва': 0.5, 'Уфа': 0.25}))
+        self.assertEqual(rows, [['Москва', 100, None, 'Москва', 0.5], [None, None, None, 'Уфа', 0.25]])
+
+
+class PdfReportTest(TempDirTestCase):
+    def test_pdf_tables_match_html_template(self):
+        file_name = self.write_file('vacancies.csv', STATISTICS_HEAD + ''.join(STATISTICS_ROWS))
+        report = main.Report(main.collect_statistics(file_name, 'Программист'), 'Программист')
+        data = report.get_template_data(os.path.join(self.dir_name, 'graph.png'))
+        cells = re.findall(r'<td style="border: 1px solid grey;">(.*?)</td>', main.get_report_template().render(data))
+
+        head, rows, salary_rows, part_rows = report.get_pdf_tables(data)
+        self.assertEqual(len(head), 5)
+        expected = [str(value) for row in rows for value in row]
+        for i in range(max(len(salary_rows), len(part_rows))):
+            for table, width in ((salary_rows, 2), (part_rows, 2)):
+                expected.extend(str(value) for value in (table[i] if i < len(table) else [''] * width))
+        self.assertEqual(cells, expected)
+        self.assertEqual([row[0] for row in rows], report.years)
+
+    def test_generate_pdf(self):
+        file_name = self.write_file('vacancies.csv', STATISTICS_HEAD + ''.join(STATISTICS_ROWS))
+        report = main.Report(main.collect_statistics(file_name, 'Программист'), 'Программист')
+        image_name = os.path.join(self.dir_name, 'graph.png')
+        pdf_name = os.path.join(self.dir_name, 'report.pdf')
+        report.generate_image(image_name)
+        report.generate_pdf(image_name, pdf_name)
+        with open(pdf_name, 'rb') as file:
+            self.assertTrue(file.read().startswith(b'%PDF'))
+
+
+class ProfessionMatcherTest(unittest.TestCase):
+    def test_matches_substring_check(self):
+        generator = random.Random(1)
+        vac_names = ['ab', 'b', 'bab', 'abc', '', 'c', 'cab', 'aaa']
+        matcher = main.ProfessionMatcher(vac_names)
+        for _ in range(2000):
+            name = ''.join(generator.choice('abcd') for _ in range(generator.randint(0, 10)))
+            expected = frozenset(k for k in range(len(vac_names)) if vac_names[k] in name)
+            self.assertEqual(matcher.find(name), expected, name)
+            self.assertEqual(matcher.find(name), expected, name)
+
+
+class SalaryIntervalIndexTest(unittest.TestCase):
+    def test_matches_linear_search(self):
+        generator = random.Random(2)
+        for size in (1, 2, 5, 50, 500):
+            intervals = []
+            for position in range(size):
+                salary_from = generator.randint(0, 100)
+                intervals.append((salary_from, salary_from + generator.randint(0, 30), position))
+            index = main.SalaryIntervalIndex(intervals)
+            for salary in range(-1, 132):
+                expected = [interval[2] for interval in intervals if interval[0] <= salary <= interval[1]]
+                self.assertEqual(sorted(index.find(salary)), expected, (size, salary))
+
+
+class QueryTest(TempDirTestCase):
+    QUERIES = [
+        ('Название: Программист', lambda v: v.name == 'Программист'),
+        ('Название: ^Java & Оклад: 50000..120000',
+         lambda v: v.name.startswith('Java') and v.salary.salary_from_number <= 120000 and
+         v.salary.salary_to_number >= 50000),
+        ('Название: ~программист & Название региона: Сочи',
+         lambda v: 'программист' in v.name and v.area_name == 'Сочи'),
+        ('Оклад: 100000 & Идентификатор валюты оклада: Евро',
+         lambda v: v.salary.salary_from_number <= 100000 <= v.salary.salary_to_number and
+         v.salary.salary_currency == 'EUR'),
+        ('Оклад: ..30000 | Оклад: 250000..', lambda v: v.salary.salary_from_number <= 30000 or
+         v.salary.salary_to_number >= 250000),
+        ('Дата публикации вакансии: 01.01.2015..31.12.2016 & Премиум-вакансия: Да',
+         lambda v: '2015' <= v.published_at[:4] <= '2016' and v.premium.lower() == 'true'),
+        ('Навыки: Git, Linux & Компания: Компания 3',
+         lambda v: 'Git' in v.key_skills and 'Linux' in v.key_skills and v.employer_name == 'Компания 3'),
+        ('Опыт работы: Нет опыта & Компания: Procter & Gamble | Компания: Компания 1 & Оклад: 40000',
+         lambda v: v.experience_id == 'noExperience' and v.employer_name == 'Procter & Gamble' or
+         v.employer_name == 'Компания 1' and v.salary.salary_from_number <= 40000 <= v.salary.salary_to_number),
+    ]
+
+    def test_split_query(self):
+        self.assertEqual(main.split_query('Компания: Procter & Gamble | Название: A | B & Оклад: 1..2'),
+                         [['Компания: Procter & Gamble'], ['Название: A | B', 'Оклад: 1..2']])
+
+    def test_matches_linear_scan(self):
+        file_name = self.write_file('vacancies.csv', make_table_csv(600, seed=5))
+        data_set = main.DataSetForTable(file_name)
+        vacancies = data_set.all_vacancies
+        data_set.build_indexes()
+        for filter_param, predicate in self.QUERIES:
+            expected = [i for i, vacancy in enumerate(vacancies) if predicate(vacancy)]
+            query = main.Query(filter_param)
+            self.assertEqual(query.find(vacancies), expected, filter_param)
+            self.assertEqual(query.find(vacancies, data_set.index), expected, filter_param)
+
+    def test_estimate_bounds_found_count(self):
+        file_name = self.write_file('vacancies.csv', make_table_csv(300, seed=6))
+        data_set = main.DataSetForTable(file_name)
+        data_set.build_indexes()
+        for filter_param, _ in self.QUERIES:
+            for condition in [condition for group in main.Query(filter_param).groups for condition in group]:
+                found = condition.find(data_set.index)
+                estimate = condition.estimate(data_set.index)
+                self.assertEqual(estimate is None, found is None, filter_param)
+                if found is not None:
+                    self.assertGreaterEqual(estimate, len(found), filter_param)
+
+
+class CommandLineTest(TempDirTestCase):
+    def test_statistics_arguments(self):
+        arguments = main.get_arguments(['statistics'])
+        self.assertEqual((arguments.workers, arguments.use_cache), (os.cpu_count(), False))
+        arguments = main.get_arguments(['статистика', 'a.csv', '--cache'])
+        self.assertEqual((arguments.file_name, arguments.workers, arguments.use_cache), ('a.csv', 1, True))
+        self.assertEqual(main.get_arguments(['statistics', '--incremental', '--workers', '1']).workers, 1)
+        for args in (['statistics', '--cache', '--workers', '2'], ['statistics', '--incremental', '--workers', '3']):
+            with self.subTest(args=args), mock.patch('sys.stderr'), self.assertRaises(SystemExit):
+                main.get_arguments(args)
+
+    def test_interactive_mode(self):
+        with mock.patch('builtins.input', return_value='Статистика'):
+            arguments = main.get_arguments([])
+        self.assertEqual((arguments.mode, arguments.use_cache), ('statistics', False))
+        with mock.patch('builtins.input', return_value='что-то'):
+            self.assertIsNone(main.get_arguments([]))
+
+    def test_batch(self):
+        file_name = self.write_file('vacancies.csv', make_table_csv(60))
+        jobs = [{'id': 'count', 'mode': 'filter', 'filter': 'Название региона: Москва'},
+                {'mode': 'table', 'filter': 'Название региона: Москва', 'sort': 'Оклад', 'lines': '1 3'},
+                {'id': 'stat', 'mode': 'statistics', 'vac_name': 'Программист'},
+                {'mode': 'unknown'}]
+        jobs_name = self.write_file('jobs.jsonl', '\n'.join(json.dumps(job, ensure_ascii=False) for job in jobs) +
+                                    '\n\nnot json\n')
+        output_name = os.path.join(self.dir_name, 'results.jsonl')
+        self.assertEqual(main.main(['batch', jobs_name, file_name, '--output', output_name]), 1)
+        with open(output_name, encoding='utf-8') as file:
+            results = [json.loads(line) for line in file]
+
+        count = sum(vacancy['area_name'] == 'Москва' for vacancy in read_reference(file_name))
+        self.assertEqual([result['id'] for result in results], ['count', 2, 'stat', 4, 6])
+        self.assertEqual(results[0]['count'], count)
+        self.assertEqual(results[1]['count'], count)
+        self.assertEqual(results[1]['table'].count('Москва'), 2)
+        statistics = main.collect_statistics(file_name, 'Программист')
+        self.assertEqual(results[2]['salary_by_city'], main.Report(statistics, 'Программист').salary_by_city)
+        self.assertIn('error', results[3])
+        self.assertIn('error', results[4])
+        self.assertFalse(os.path.exists(file_name + main.CACHE_SUFFIX))
+
+        with open(output_name, 'w', encoding='utf-8') as output:
+            self.assertEqual(main.run_batch(jobs_name, file_name, output, use_cache=True), 2)
+        self.assertTrue(os.path.exists(file_name + main.CACHE_SUFFIX))
+
+    def test_several_professions(self):
+        file_name = self.write_file('vacancies.csv', STATISTICS_HEAD + ''.join(STATISTICS_ROWS))
+        output_dir = os.path.join(self.dir_name, 'reports')
+        os.mkdir(output_dir)
+        vac_names = ['Программист', 'Бухгалтер']
+        with mock.patch('sys.stdout', new_callable=io.StringIO) as output:
+            self.assertEqual(main.main(['statistics', file_name, '--vac-name'] + vac_names +
+                                       ['--output-dir', output_dir]), 0)
+        for vac_name in vac_names:
+            expected = main.Report(main.collect_statistics(file_name, vac_name), vac_name)
+            self.assertIn('Профессия: ' + vac_name, output.getvalue())
+            self.assertIn(str(expected.salary_by_year_by_vacancy), output.getvalue())
+            for extension in main.REPORT_FILE_NAMES:
+                self.assertTrue(os.path.exists(os.path.join(output_dir, vac_name + '.' + extension)))
+        self.assertEqual(main.get_arguments(['statistics', '--vac-name', 'Программист']).vac_names, ['Программист'])
+        for args in (['--cache'], ['--incremental'], ['--workers', '2']):
+            with self.subTest(args=args), mock.patch('sys.stderr'), self.assertRaises(SystemExit):
+                main.get_arguments(['statistics', '--vac-name', 'A', 'B'] + args)
+
+    def test_batch_several_professions(self):
+        file_name = self.write_file('vacancies.csv', STATISTICS_HEAD + ''.join(STATISTICS_ROWS))
+        output_dir = os.path.join(self.dir_name, 'reports')
+        os.mkdir(output_dir)
+        vac_names = ['Программист', 'Бухгалтер']
+        jobs = [{'mode': 'statistics', 'vac_names': vac_names},
+                {'mode': 'statistics', 'vac_names': vac_names, 'output_dir': output_dir},
+                {'mode': 'statistics', 'vac_names': 'Программист'}]
+        jobs_name = self.write_file('jobs.jsonl', '\n'.join(json.dumps(job, ensure_ascii=False) for job in jobs))
+        output = io.StringIO()
+        self.assertEqual(main.run_batch(jobs_name, file_name, output), 1)
+        results = [json.loads(line) for line in output.getvalue().splitlines()]
+        for result in results[:2]:
+            self.assertEqual(list(result['reports']), vac_names)
+            for vac_name in vac_names:
+                expected = main.Report(main.collect_statistics(file_name, vac_name), vac_name)
+                self.assertEqual(result['reports'][vac_name]['salary_by_year_by_vacancy'],
+                                 {str(year): salary for year, salary in expected.salary_by_year_by_vacancy.items()})
+        self.assertTrue(os.path.exists(os.path.join(output_dir, 'Бухгалтер.pdf')))
+        self.assertIn('error', results[2])
+
+
+class QueryCacheTest(TempDirTestCase):
+    def test_lru_eviction(self):
+        cache = main.QueryCache(max_size=2)
+        cache.put('a', 1, 'A')
+        cache.put('b', 1, 'B')
+        self.assertEqual(cache.get('a', 1), (True, 'A'))
+        cache.put('c', 1, 'C')
+        self.assertEqual(list(cache.entries), ['a', 'c'])
+        self.assertEqual(cache.get('b', 1), (False, None))
+        self.assertEqual(cache.get_or_compute('c', 1, lambda: 'X'), 'C')
+        self.assertEqual(cache.get_stats(), {'size': 2, 'hits': 2, 'misses': 1, 'invalidations': 0,
+                                             'hit_rate': 2 / 3})
+
+    def test_stale_entries(self):
+        cache = main.QueryCache()
+        cache.put('a', 1, 'A')
+        cache.put('b', 2, 'B')
+        self.assertEqual(cache.get('a', 2), (False, None))
+        self.assertNotIn('a', cache.entries)
+        cache.put('c', 3, 'C')
+        cache.discard_stale(3)
+        self.assertEqual(list(cache.entries), ['c'])
+        self.assertEqual(cache.invalidations, 2)
+
+    def test_persistence(self):
+        file_name = os.path.join(self.dir_name, 'results.json')
+        cache = main.QueryCache(file_name=file_name)
+        cache.put('a', {'size': 1}, [1, 2])
+        cache.save()
+        loaded = main.QueryCache(file_name=file_name)
+        self.assertEqual(loaded.get('a', {'size': 1}), (True, [1, 2]))
+        os.remove(file_name)
+        loaded.save()
+        self.assertFalse(os.path.exists(file_name))
+        self.assertEqual(main.QueryCache(max_size=0, file_name=file_name).entries, {})
+        for text in ('garbage', '[1, 2]', '[[1, 2, 3]]', '{}'):
+            with self.subTest(text=text):
+                self.write_file('results.json', text)
+                self.assertEqual(main.QueryCache(file_name=file_name).entries, {})
+
+    def test_query_key(self):
+        key = main.get_query_key('filter', 'a.csv', {'filter': 'Компания: X & Название: Y | Оклад: 10', 'reverse': ''})
+        for params in ({'filter': ' Оклад: 10 | Название: Y & Компания: X', 'reverse': 'Нет'},
+                       {'filter': 'Название: Y & Компания: X & Название: Y | Оклад: 10', 'reverse': 'нет'}):
+            with self.subTest(params=params):
+                self.assertEqual(main.get_query_key('filter', os.path.abspath('a.csv'), params), key)
+        self.assertNotEqual(main.get_query_key('sort', 'a.csv', {'filter': 'Оклад: 10 | Компания: X & Название: Y'}),
+                            main.get_query_key('filter', 'a.csv', {'filter': 'Оклад: 10 | Компания: X & Название: Y'}))
+        self.assertNotEqual(main.get_query_key('filter', 'b.csv', {'filter': 'Оклад: 10'}),
+                            main.get_query_key('filter', 'a.csv', {'filter': 'Оклад: 10'}))
+        self.assertNotEqual(main.get_query_key('filter', 'a.csv', {'filter': 'Оклад: 10 & Компания: X'}),
+                            main.get_query_key('filter', 'a.csv', {'filter': 'Оклад: 10 | Компания: X'}))
+
+
+class QueryDataRefreshTest(TempDirTestCase):
+    def test_changed_file_is_reloaded(self):
+        file_name = self.write_file('vacancies.csv', make_table_csv(40))
+        main.init_query_worker(file_name, main.CURRENCY_CONVERTER)
+        params = {'filter': 'Название региона: Москва', 'sort': 'Оклад', 'reverse': 'Да', 'lines': '1 5'}
+        for step in range(3):
+            with self.subTest(step=step):
+                vacancies = read_reference(file_name)
+                count = sum(vacancy['area_name'] == 'Москва' for vacancy in vacancies)
+                self.assertEqual(main.run_filter_query(params), {'count': count})
+                self.assertEqual(main.run_table_query(params)['count'], count)
+                statistics = main.collect_statistics(file_name, 'Программист')
+                self.assertEqual(main.run_statistics_query({'vac_name': 'Программист'})['count_salary_by_year'],
+                                 main.Report(statistics, 'Программист').count_salary_by_year)
+                self.assertEqual(main.run_filter_query(params), {'count': count})
+                self.assertEqual(main.get_query_cache_stats({})['invalidations'], 3 * step)
+                self.write_file('vacancies.csv', make_table_csv(20, seed=step + 1).split('\n', 1)[1], 'a')
+
+
+class QueryTableTest(TempDirTestCase):
+    def test_tables_match_table_mode(self):
+        file_name = self.write_file('vacancies.csv', make_table_csv(120, seed=7))
+        main.init_query_worker(file_name, main.CURRENCY_CONVERTER)
+        for sort_param in ('', 'Оклад', 'Опыт работы', 'Дата публикации вакансии', 'Премиум-вакансия, Название'):
+            for lines in ('', '3 12'):
+                params = {'filter': 'Название: ~программист', 'sort': sort_param, 'reverse': 'Да', 'lines': lines,
+                          'columns': ''}
+                output = io.StringIO()
+                main.run_table_mode(file_name, params['filter'], sort_param, 'Да', lines, '', output)
+                with self.subTest(sort_param=sort_param, lines=lines):
+                    self.assertEqual(main.run_table_query(params)['table'] + '\n', output.getvalue())
+        self.assertNotIn('translated', main.QUERY_DATA)
+        for vacancy in main.QUERY_DATA['data_set'].all_vacancies:
+            self.assertIn(vacancy.experience_id, main.WORK_EXPERIENCE)
+            self.assertIn(vacancy.salary.salary_gross, main.BOOL_TRANSLATE)
+
+
+class QueryServerTest(TempDirTestCase):
+    def run_requests(self, file_name, requests, **kwargs):
+        """Запускает сервер на Unix-сокете и по очереди отправляет запросы (метод, путь, тело)"""
+        socket_name = os.path.join(self.dir_name, 'server.sock')
+
+        async def send(method, path, body):
+            reader, writer = await asyncio.open_unix_connection(socket_name)
+            writer.write('{} {} HTTP/1.1\r\nContent-Length: {}\r\n\r\n'.format(method, path, len(body))
+                         .encode('latin-1') + body)
+            head, _, content = (await reader.read()).partition(b'\r\n\r\n')
+            writer.close()
+            return int(head.split()[1]), json.loads(content.decode('utf-8'))
+
+        async def run():
+            server = main.QueryServer(file_name, 1, **kwargs)
+            unix_server = await server.start(unix_path=socket_name)
+            try:
+                return [await send(*request) for request in requests]
+            finally:
+                unix_server.close()
+                await unix_server.wait_closed()
+                server.executor.shutdown()
+
+        return asyncio.run(run())
+
+    def test_endpoints(self):
+        file_name = self.write_file('vacancies.csv', make_table_csv(80))
+        table_params = {'filter': 'Название региона: Москва', 'sort': 'Оклад', 'reverse': 'Да', 'lines': '1 4',
+                        'columns': 'Название, Оклад'}
+        responses = self.run_requests(file_name, [
+            ('GET', '/filter?' + urllib.parse.urlencode({'filter': 'Название региона: Москва'}), b''),
+            ('POST', '/table', json.dumps(table_params).encode('utf-8')),
+            ('GET', '/statistics?' + urllib.parse.urlencode({'vac_name': 'Программист'}), b''),
+            ('GET', '/filter?' + urllib.parse.urlencode({'filter': 'Название региона: Москва'}), b''),
+            ('GET', '/cache', b''),
+            ('POST', '/table', json.dumps({'sort': 'Нет такого'}).encode('utf-8')),
+            ('GET', '/nope', b'')])
+
+        count = sum(vacancy['area_name'] == 'Москва' for vacancy in read_reference(file_name))
+        self.assertEqual(responses[0], (200, {'count': count}))
+        status, result = responses[1]
+        self.assertEqual((status, result['count']), (200, count))
+        main.init_query_worker(file_name, main.CURRENCY_CONVERTER, preload=False)
+        self.assertEqual(result, main.run_table_query(table_params))
+        self.assertIn('Оклад', result['table'])
+        statistics = main.collect_statistics(file_name, 'Программист')
+        self.assertEqual(responses[2][1]['salary_by_city'], main.Report(statistics, 'Программист').salary_by_city)
+        self.assertEqual(responses[3], responses[0])
+        self.assertEqual(responses[4][0], 200)
+        self.assertGreaterEqual(responses[4][1]['hits'], 1)
+        self.assertEqual(responses[5], (400, {'error': 'Параметр сортировки некорректен'}))
+        self.assertEqual(responses[6][0], 404)
+        self.assertFalse(os.path.exists(file_name + main.CACHE_SUFFIX))
+
+    def test_columns_cache_is_opt_in(self):
+        file_name = self.write_file('vacancies.csv', make_table_csv(10))
+        self.run_requests(file_name, [('GET', '/cache', b'')], use_cache=True)
+        self.assertTrue(os.path.exists(file_name + main.CACHE_SUFFIX))
+
+    def test_bad_request_bodies(self):
+        file_name = self.write_file('vacancies.csv', make_table_csv(10))
+        responses = self.run_requests(file_name, [
+            ('POST', '/filter', b'[1]'),
+            ('POST', '/filter', b'"text"'),
+            ('POST', '/filter', b'{"filter": '),
+            ('POST', '/filter', b'\xff'),
+            ('POST', '/filter', json.dumps({'filter': 'Название региона: Москва'}).encode('utf-8'))])
+        for status, result in responses[:4]:
+            self.assertEqual(status, 400)
+            self.assertIn('Тело запроса', result['error'])
+        self.assertEqual(responses[4][0], 200)
+
+
+if __name__ == '__main__':
+    unittest.main()